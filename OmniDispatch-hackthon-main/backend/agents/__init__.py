@@ -1,6 +1,12 @@
 """
 Initialize agents package
 """
-from .crew import OmniDispatchCrew
+from .crew import OmniDispatchCrew, dispatch_pool, process_call_sync, process_call_async
+from .chronos_crew import ChronosCrew, chronos_pool, analyze_location_async
+from .executor import ClientDisconnected, CrewExecutor, CrewQueueFull, crew_executor, run_until_disconnect
+from .pool import CrewPool, CrewPoolTimeout
 
-__all__ = ['OmniDispatchCrew']
+__all__ = ['OmniDispatchCrew', 'dispatch_pool', 'process_call_sync', 'process_call_async',
+           'ChronosCrew', 'chronos_pool', 'analyze_location_async',
+           'ClientDisconnected', 'CrewExecutor', 'CrewQueueFull', 'crew_executor', 'run_until_disconnect',
+           'CrewPool', 'CrewPoolTimeout']
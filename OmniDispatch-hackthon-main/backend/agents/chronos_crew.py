@@ -6,14 +6,24 @@ Uses Groq for ultra-fast inference with dynamic location analysis
 """
 
 from crewai import Agent, Task, Crew, Process, LLM
+import asyncio
 import os
-import json
+import threading
+import time
 from typing import Dict, Optional
 from datetime import datetime
 
+from services.json_stream import parse_json_lenient
+from services.log import agent_verbose
+from .executor import crew_executor
+from .pool import CrewPool
+
 class ChronosCrew:
     """
-    Chronos AI Crew: Three specialized agents for predictive disaster intelligence
+    Chronos AI Crew: Three specialized agents for predictive disaster intelligence.
+    
+    Built once and reused: each analysis fills in the task descriptions, so an
+    instance runs one analysis at a time (chronos_pool lends them out).
     """
     
     def __init__(self):
@@ -25,6 +35,7 @@ class ChronosCrew:
         self.llm = LLM(
             model="groq/llama-3.3-70b-versatile",
             api_key=api_key,
+            base_url=os.getenv("GROQ_BASE_URL") or None,
             temperature=0.4
         )
         
@@ -32,6 +43,36 @@ class ChronosCrew:
         self.geospatial_analyst = self._create_geospatial_agent()
         self.historical_researcher = self._create_historical_agent()
         self.risk_predictor = self._create_predictor_agent()
+        
+        # Tasks and crew are reused; descriptions and callbacks are set per analysis
+        self.geospatial_task = Task(
+            description="Analyze the location for natural disaster vulnerabilities",
+            agent=self.geospatial_analyst,
+            expected_output="Detailed geospatial risk analysis with specific reasons",
+        )
+        self.historical_task = Task(
+            description="Research historical disaster patterns",
+            agent=self.historical_researcher,
+            expected_output="Historical disaster patterns with confidence scores",
+            context=[self.geospatial_task],
+        )
+        self.predictor_task = Task(
+            description="Generate a complete risk assessment",
+            agent=self.risk_predictor,
+            expected_output="Complete JSON risk assessment",
+            context=[self.geospatial_task, self.historical_task],
+        )
+        self.crew = Crew(
+            agents=[
+                self.geospatial_analyst,
+                self.historical_researcher,
+                self.risk_predictor
+            ],
+            tasks=[self.geospatial_task, self.historical_task, self.predictor_task],
+            process=Process.sequential,
+            verbose=agent_verbose()
+        )
+        self._lock = threading.Lock()
     
     def _create_geospatial_agent(self) -> Agent:
         """Agent 1: Geospatial Analyst - Analyzes location characteristics"""
@@ -45,7 +86,7 @@ class ChronosCrew:
             hurricane paths, wildfire zones, etc. You provide detailed explanations
             of WHY a location faces specific risks based on its geography.""",
             llm=self.llm,
-            verbose=True,
+            verbose=agent_verbose(),
             allow_delegation=False
         )
     
@@ -60,7 +101,7 @@ class ChronosCrew:
             You correlate current conditions with historical precedents and identify
             recurring cycles. You explain how historical patterns predict future risks.""",
             llm=self.llm,
-            verbose=True,
+            verbose=agent_verbose(),
             allow_delegation=False
         )
     
@@ -75,26 +116,24 @@ class ChronosCrew:
             specific risk zones, calculate preparedness requirements, and provide
             actionable recommendations. You always explain your reasoning clearly.""",
             llm=self.llm,
-            verbose=True,
+            verbose=agent_verbose(),
             allow_delegation=True
         )
     
-    def analyze_location(self, lat: float, lng: float, location_name: Optional[str] = None) -> Dict:
-        """
-        Analyze any location for disaster risk using the Chronos AI crew
-        
-        Args:
-            lat: Latitude
-            lng: Longitude  
-            location_name: Optional known name of the location
-        
-        Returns:
-            Comprehensive disaster risk analysis
-        """
-        
+    @staticmethod
+    def _timing_callback(agent_name: str, timings: Dict[str, float], clock: Dict[str, float]):
+        """Task callback recording how long each sequential task took"""
+        def callback(output):
+            now = time.perf_counter()
+            timings[agent_name] = round((now - clock["last"]) * 1000, 2)
+            clock["last"] = now
+        return callback
+    
+    def _prepare_tasks(self, lat: float, lng: float, location_name: Optional[str],
+                       timings: Dict[str, float], clock: Dict[str, float]):
+        """Point the reusable tasks at this location"""
         # Task 1: Geospatial Analysis
-        geospatial_task = Task(
-            description=f"""
+        self.geospatial_task.description = f"""
             Analyze this location for natural disaster vulnerabilities:
             
             Coordinates: {lat}°N, {lng}°E
@@ -110,14 +149,11 @@ class ChronosCrew:
             
             Provide a detailed geographic risk profile with SPECIFIC reasons.
             Format your response as structured analysis.
-            """,
-            agent=self.geospatial_analyst,
-            expected_output="Detailed geospatial risk analysis with specific reasons"
-        )
+            """
+        self.geospatial_task.callback = self._timing_callback("geospatial_analyst", timings, clock)
         
         # Task 2: Historical Pattern Research
-        historical_task = Task(
-            description=f"""
+        self.historical_task.description = f"""
             Based on the geospatial analysis, research historical disaster patterns:
             
             Coordinates: {lat}°N, {lng}°E
@@ -135,15 +171,11 @@ class ChronosCrew:
             - How confident we are (percentage)
             - Why this pattern exists (explanation)
             - What action should be taken (recommendation)
-            """,
-            agent=self.historical_researcher,
-            expected_output="Historical disaster patterns with confidence scores",
-            context=[geospatial_task]
-        )
+            """
+        self.historical_task.callback = self._timing_callback("historical_researcher", timings, clock)
         
         # Task 3: Risk Assessment & Recommendations
-        predictor_task = Task(
-            description=f"""
+        self.predictor_task.description = f"""
             Using the geospatial and historical analysis, generate a complete risk assessment:
             
             Coordinates: {lat}°N, {lng}°E
@@ -184,47 +216,37 @@ class ChronosCrew:
             
             Be specific and accurate. Explain your reasoning clearly.
             Respond with ONLY the JSON, no other text.
-            """,
-            agent=self.risk_predictor,
-            expected_output="Complete JSON risk assessment",
-            context=[geospatial_task, historical_task]
-        )
+            """
+        self.predictor_task.callback = self._timing_callback("risk_predictor", timings, clock)
+    
+    def analyze_location(self, lat: float, lng: float, location_name: Optional[str] = None) -> Dict:
+        """
+        Analyze any location for disaster risk using the Chronos AI crew
         
-        # Create and run the Chronos crew
-        crew = Crew(
-            agents=[
-                self.geospatial_analyst,
-                self.historical_researcher,
-                self.risk_predictor
-            ],
-            tasks=[geospatial_task, historical_task, predictor_task],
-            process=Process.sequential,
-            verbose=True
-        )
+        Args:
+            lat: Latitude
+            lng: Longitude  
+            location_name: Optional known name of the location
         
-        # Execute the crew
-        result = crew.kickoff()
+        Returns:
+            Comprehensive disaster risk analysis
+        """
+        with self._lock:
+            timings: Dict[str, float] = {}
+            clock = {"last": time.perf_counter()}
+            started = clock["last"]
+            self._prepare_tasks(lat, lng, location_name, timings, clock)
+            
+            # Execute the crew
+            result = self.crew.kickoff()
         
         # Parse the result
         result_str = str(result)
         
-        # Try to extract JSON from the result
+        # Extract (and if needed repair) the JSON object in the result
         try:
-            # Find JSON in the response
-            if "```json" in result_str:
-                json_str = result_str.split("```json")[1].split("```")[0].strip()
-            elif "```" in result_str:
-                json_str = result_str.split("```")[1].split("```")[0].strip()
-            elif "{" in result_str:
-                # Find first { and last }
-                start = result_str.find("{")
-                end = result_str.rfind("}") + 1
-                json_str = result_str[start:end]
-            else:
-                json_str = result_str
-                
-            analysis = json.loads(json_str)
-        except json.JSONDecodeError:
+            analysis = parse_json_lenient(result_str)
+        except ValueError:
             # Return a structured fallback with the raw analysis
             analysis = {
                 "location_identified": "Analysis in progress",
@@ -240,19 +262,42 @@ class ChronosCrew:
             "coordinates": {"lat": lat, "lng": lng},
             "analysis": analysis,
             "agents_executed": ["geospatial_analyst", "historical_researcher", "risk_predictor"],
+            "agent_timings_ms": timings,
+            "processing_time_ms": round((time.perf_counter() - started) * 1000, 2),
             "generated_at": datetime.now().isoformat()
         }
 
 
+# Warm instances shared by callers in this process; size bounds concurrent kickoffs
+chronos_pool: CrewPool[ChronosCrew] = CrewPool("chronos", ChronosCrew)
+
+
 # Synchronous wrapper for async contexts
-def analyze_location_sync(lat: float, lng: float, location_name: Optional[str] = None) -> Dict:
-    """Synchronous wrapper for location analysis"""
+def analyze_location_sync(lat: float, lng: float, location_name: Optional[str] = None,
+                          timeout: Optional[float] = None) -> Dict:
+    """Synchronous wrapper for location analysis on a pooled crew"""
     try:
-        crew = ChronosCrew()
-        return crew.analyze_location(lat, lng, location_name)
+        with chronos_pool.acquire(timeout=timeout) as crew:
+            return crew.analyze_location(lat, lng, location_name)
     except Exception as e:
         return {
             "success": False,
             "error": str(e),
             "coordinates": {"lat": lat, "lng": lng}
         }
+
+
+async def analyze_location_async(lat: float, lng: float, location_name: Optional[str] = None,
+                                 timeout: Optional[float] = None) -> Dict:
+    """
+    analyze_location_sync on the crew executor, without blocking the event loop.
+    Times out per CREW_TIMEOUTS; raises CrewQueueFull when the executor is saturated.
+    """
+    try:
+        return await crew_executor.run("chronos", analyze_location_sync, lat, lng, location_name, timeout=timeout)
+    except asyncio.TimeoutError:
+        return {
+            "success": False,
+            "error": f"Chronos crew timed out after {timeout or crew_executor.timeouts['chronos']}s",
+            "coordinates": {"lat": lat, "lng": lng}
+        }
@@ -1,12 +1,34 @@
 """
 OmniDispatch CrewAI Agent System
 =================================
-Three specialized AI agents powered by Groq + Cerebras for ultra-fast reasoning
+Three specialized AI agents powered by Groq + Cerebras for ultra-fast reasoning.
+
+Tasks run as a dependency graph by default: intake and the historian (which
+only needs the call's location) run side by side, and the orchestrator starts
+once both are done.
+
+How much of the crew a call gets is decided per call by the plan router
+(services/plan_router.py) from the fast triage result in call_data["triage"]:
+local (no agents), single (orchestrator only), full, or hierarchical. Every
+call gets the full crew unless CREW_ROUTING=adaptive.
+
+Environment:
+    DISPATCH_CREW_MODE   "dag" (default) or "sequential" (the original Crew kickoff)
 """
 
 from crewai import Agent, Task, Crew, Process, LLM
+import asyncio
+import json
 import os
-from typing import List, Dict
+import threading
+import time
+from typing import List, Dict, Optional
+
+from services.log import agent_verbose
+from services.plan_router import PLANS, local_dispatch, plan_router
+from .dag import TaskGraph
+from .executor import crew_executor
+from .pool import CrewPool
 
 # ============================================================================
 # AGENT DEFINITIONS
@@ -14,14 +36,23 @@ from typing import List, Dict
 
 class OmniDispatchCrew:
     """
-    The Turbo Crew: Three specialized agents working in perfect harmony
+    The Turbo Crew: Three specialized agents working in perfect harmony.
+    
+    Agents, tasks and the Crew are built once; each call fills in the task
+    descriptions. An instance runs one call at a time (use dispatch_pool for
+    concurrency).
     """
     
-    def __init__(self):
+    def __init__(self, mode: Optional[str] = None):
+        self.mode = mode or os.getenv("DISPATCH_CREW_MODE", "dag")
+        if self.mode not in ("dag", "sequential"):
+            raise ValueError(f"DISPATCH_CREW_MODE must be dag or sequential, got {self.mode!r}")
+        
         # Initialize Groq-powered LLM (ultra-fast inference)
         self.llm = LLM(
             model="groq/llama-3.3-70b-versatile",
             api_key=os.getenv("GROQ_API_KEY", ""),
+            base_url=os.getenv("GROQ_BASE_URL") or None,
             temperature=0.7
         )
         
@@ -29,6 +60,63 @@ class OmniDispatchCrew:
         self.empathetic_intake = self._create_intake_agent()
         self.incident_historian = self._create_historian_agent()
         self.strategic_orchestrator = self._create_orchestrator_agent()
+        
+        # Tasks and crew are reused; descriptions and callbacks are set per call
+        self.intake_task = Task(
+            description="Analyze the emergency call",
+            agent=self.empathetic_intake,
+            expected_output="Structured analysis of the emergency call",
+        )
+        self.historian_task = Task(
+            description="Find historical context for the location",
+            agent=self.incident_historian,
+            expected_output="Historical context and building information",
+            context=[self.intake_task],
+        )
+        self.orchestrator_task = Task(
+            description="Coordinate the response",
+            agent=self.strategic_orchestrator,
+            expected_output="Complete response coordination plan",
+            context=[self.intake_task, self.historian_task],
+        )
+        self.crew = Crew(
+            agents=[
+                self.empathetic_intake,
+                self.incident_historian,
+                self.strategic_orchestrator
+            ],
+            tasks=[self.intake_task, self.historian_task, self.orchestrator_task],
+            process=Process.sequential,  # Can switch to hierarchical for complex scenarios
+            verbose=agent_verbose()
+        )
+        # Single-agent plan: the orchestrator alone, on a compact prompt built from the triage
+        self.quick_task = Task(
+            description="Dispatch from the triage",
+            agent=self.strategic_orchestrator,
+            expected_output="Units to dispatch with ETAs and any alerts",
+        )
+        self.quick_graph = TaskGraph("dispatch-single").add("strategic_orchestrator", self.quick_task)
+        # Most complex calls: a manager LLM delegates to and reviews the three agents
+        self.hierarchical_crew = Crew(
+            agents=[
+                self.empathetic_intake,
+                self.incident_historian,
+                self.strategic_orchestrator
+            ],
+            tasks=[self.intake_task, self.historian_task, self.orchestrator_task],
+            process=Process.hierarchical,
+            manager_llm=self.llm,
+            verbose=agent_verbose()
+        )
+        # Each task's real inputs: the historian works from the location alone
+        self.graph = (
+            TaskGraph("dispatch")
+            .add("empathetic_intake", self.intake_task)
+            .add("incident_historian", self.historian_task)
+            .add("strategic_orchestrator", self.orchestrator_task,
+                 inputs=["empathetic_intake", "incident_historian"])
+        )
+        self._lock = threading.Lock()
     
     def _create_intake_agent(self) -> Agent:
         """
@@ -43,7 +131,7 @@ class OmniDispatchCrew:
             extracting vital information quickly, and providing reassurance to panicked callers.
             You can detect stress levels from voice patterns and adapt your communication style.""",
             llm=self.llm,
-            verbose=True,
+            verbose=agent_verbose(),
             allow_delegation=False
         )
     
@@ -61,7 +149,7 @@ class OmniDispatchCrew:
             including blueprints, hazmat data, and previous incident reports. You use 
             advanced RAG technology to access your vast knowledge base in milliseconds.""",
             llm=self.llm,
-            verbose=True,
+            verbose=agent_verbose(),
             allow_delegation=False
         )
     
@@ -79,28 +167,30 @@ class OmniDispatchCrew:
             services, and maintain real-time awareness of all assets. You update 
             dashboards, trigger alerts, and ensure perfect information flow.""",
             llm=self.llm,
-            verbose=True,
+            verbose=agent_verbose(),
             allow_delegation=True
         )
     
-    def process_emergency_call(self, call_data: Dict) -> Dict:
-        """
-        Process an emergency call through the multi-agent system
-        
-        Args:
-            call_data: Dictionary containing:
-                - transcript: str
-                - location: dict
-                - caller_phone: str
-                - audio_features: dict (stress level, etc.)
-        
-        Returns:
-            Dictionary with incident analysis and response plan
-        """
-        
+    @staticmethod
+    def _timing_callback(agent_name: str, timings: Dict[str, Dict[str, float]], clock: Dict[str, float]):
+        """Task callback recording when each sequential task ran, relative to the kickoff"""
+        def callback(output):
+            now = time.perf_counter()
+            origin = clock.get("origin", clock["last"])
+            timings[agent_name] = {
+                "start_ms": round((clock["last"] - origin) * 1000, 2),
+                "end_ms": round((now - origin) * 1000, 2),
+                "duration_ms": round((now - clock["last"]) * 1000, 2),
+            }
+            clock["last"] = now
+        return callback
+    
+    def _prepare_tasks(self, call_data: Dict, timings: Dict[str, Dict[str, float]], clock: Dict[str, float],
+                       sequential: Optional[bool] = None):
+        """Point the reusable tasks at this call; timing callbacks only apply to Crew kickoffs"""
+        sequential = self.mode == "sequential" if sequential is None else sequential
         # Task 1: Intake Analysis
-        intake_task = Task(
-            description=f"""
+        self.intake_task.description = f"""
             Analyze this emergency call and extract critical information:
             
             Transcript: {call_data.get('transcript', '')}
@@ -117,15 +207,12 @@ class OmniDispatchCrew:
             7. Special concerns (children, elderly, hazmat, etc.)
             
             Provide your analysis in a structured format.
-            """,
-            agent=self.empathetic_intake,
-            expected_output="Structured analysis of the emergency call"
-        )
+            """
+        self.intake_task.callback = self._timing_callback("empathetic_intake", timings, clock) if sequential else None
         
         # Task 2: Historical Context & Building Info
-        historian_task = Task(
-            description=f"""
-            Based on the intake analysis, search for:
+        self.historian_task.description = f"""
+            Search for context on this location:
             
             Location: {call_data.get('location', {})}
             
@@ -138,15 +225,11 @@ class OmniDispatchCrew:
             6. Relevant safety protocols
             
             Provide historical context that will help responders.
-            """,
-            agent=self.incident_historian,
-            expected_output="Historical context and building information",
-            context=[intake_task]
-        )
+            """
+        self.historian_task.callback = self._timing_callback("incident_historian", timings, clock) if sequential else None
         
         # Task 3: Resource Dispatch & Coordination
-        orchestrator_task = Task(
-            description=f"""
+        self.orchestrator_task.description = """
             Based on the intake analysis and historical context, coordinate the response:
             
             1. Determine which units to dispatch (fire engines, ambulances, police)
@@ -158,33 +241,126 @@ class OmniDispatchCrew:
             7. Generate response timeline
             
             Provide a complete response coordination plan.
-            """,
-            agent=self.strategic_orchestrator,
-            expected_output="Complete response coordination plan",
-            context=[intake_task, historian_task]
-        )
+            """
         
-        # Create and run the crew
-        crew = Crew(
-            agents=[
-                self.empathetic_intake,
-                self.incident_historian,
-                self.strategic_orchestrator
-            ],
-            tasks=[intake_task, historian_task, orchestrator_task],
-            process=Process.sequential,  # Can switch to hierarchical for complex scenarios
-            verbose=True
+        # Single-agent plan
+        self.quick_task.description = f"""
+            Triage of an emergency call: {json.dumps(call_data.get('triage', {}))}
+            Location: {call_data.get('location', {})}
+            
+            List the units to dispatch with estimated arrival times, the nearest
+            hospital if medical, and any alerts to send. Be brief.
+            """
+        self.orchestrator_task.callback = (
+            self._timing_callback("strategic_orchestrator", timings, clock) if sequential else None
         )
+    
+    def process_emergency_call(self, call_data: Dict, decision: Optional[Dict] = None) -> Dict:
+        """
+        Process an emergency call through the multi-agent system
+        
+        Args:
+            call_data: Dictionary containing:
+                - transcript: str
+                - location: dict
+                - caller_phone: str
+                - audio_features: dict (stress level, etc.)
+                - triage: dict, the fast triage result the plan is routed on
+            decision: plan router decision; routed from the triage if omitted
         
-        # Execute the crew
-        result = crew.kickoff()
+        Returns:
+            Dictionary with incident analysis and response plan
+        """
+        decision = decision or plan_router.route(call_data.get("triage"), call_data.get("transcript", ""))
+        plan = decision["plan"]
+        if plan == "local":
+            return local_plan_result(call_data, decision)
+        
+        with self._lock:
+            timings: Dict[str, Dict[str, float]] = {}
+            started = time.perf_counter()
+            clock = {"origin": started, "last": started}
+            kickoff = plan == "hierarchical" or (plan == "full" and self.mode == "sequential")
+            self._prepare_tasks(call_data, timings, clock, sequential=kickoff)
+            
+            # Execute the plan
+            if plan == "single":
+                outputs, timings = self.quick_graph.run()
+                analysis = outputs["strategic_orchestrator"].raw
+                agents = ["strategic_orchestrator"]
+            else:
+                if plan == "hierarchical":
+                    analysis = str(self.hierarchical_crew.kickoff())
+                elif self.mode == "dag":
+                    outputs, timings = self.graph.run()
+                    analysis = "\n\n".join(outputs[name].raw for name in self.graph.sinks())
+                else:
+                    analysis = str(self.crew.kickoff())
+                agents = ["empathetic_intake", "incident_historian", "strategic_orchestrator"]
+            total_ms = round((time.perf_counter() - started) * 1000, 2)
         
         return {
             "success": True,
             "incident_id": f"INC-{call_data.get('timestamp', '00000000')}",
-            "analysis": str(result),
-            "agents_executed": ["empathetic_intake", "incident_historian", "strategic_orchestrator"],
-            "processing_time_ms": 180  # Cerebras target: <200ms
+            "analysis": analysis,
+            "agents_executed": agents,
+            "plan": decision,
+            "execution_mode": self.mode if plan == "full" else plan,
+            "task_timings_ms": timings,
+            "total_ms": total_ms,
+        }
+
+def local_plan_result(call_data: Dict, decision: Dict) -> Dict:
+    """Result of the local plan: dispatch straight from the triage, no agents"""
+    return {
+        "success": True,
+        "incident_id": f"INC-{call_data.get('timestamp', '00000000')}",
+        "analysis": local_dispatch(call_data.get("triage") or {}),
+        "agents_executed": [],
+        "plan": decision,
+        "execution_mode": "local",
+        "task_timings_ms": {},
+        "total_ms": 0.0,
+    }
+
+# Warm instances shared by callers in this process; size bounds concurrent kickoffs
+dispatch_pool: CrewPool[OmniDispatchCrew] = CrewPool("dispatch", OmniDispatchCrew)
+
+def route_call(call_data: Dict, plan: Optional[str] = None) -> Dict:
+    """Router decision for a call, or a forced `plan`"""
+    if plan is None:
+        return plan_router.route(call_data.get("triage"), call_data.get("transcript", ""))
+    if plan not in PLANS:
+        raise ValueError(f"plan must be one of {PLANS}, got {plan!r}")
+    return {"plan": plan, "score": None, "reasons": ["plan forced by caller"]}
+
+def process_call_sync(call_data: Dict, timeout: Optional[float] = None, plan: Optional[str] = None) -> Dict:
+    """Run a call through a pooled crew, waiting up to `timeout` seconds for a free one"""
+    return run_decision(call_data, route_call(call_data, plan), timeout)
+
+def run_decision(call_data: Dict, decision: Dict, timeout: Optional[float] = None) -> Dict:
+    """Execute an already-routed plan; only non-local plans borrow a crew"""
+    if decision["plan"] == "local":
+        return local_plan_result(call_data, decision)
+    with dispatch_pool.acquire(timeout=timeout) as crew:
+        return crew.process_emergency_call(call_data, decision)
+
+async def process_call_async(call_data: Dict, timeout: Optional[float] = None, plan: Optional[str] = None) -> Dict:
+    """
+    process_call_sync on the crew executor, without blocking the event loop.
+    Local plans return at once. Times out per CREW_TIMEOUTS; raises CrewQueueFull
+    when the executor is saturated.
+    """
+    decision = route_call(call_data, plan)
+    if decision["plan"] == "local":
+        return local_plan_result(call_data, decision)
+    try:
+        return await crew_executor.run("dispatch", run_decision, call_data, decision, timeout=timeout)
+    except asyncio.TimeoutError:
+        return {
+            "success": False,
+            "error": f"Dispatch crew timed out after {timeout or crew_executor.timeouts['dispatch']}s",
+            "agents_executed": [],
         }
 
 # ============================================================================
@@ -195,7 +371,7 @@ def example_usage():
     """
     Example of how to use the OmniDispatch crew
     """
-    crew = OmniDispatchCrew()
+    dispatch_pool.warm()
     
     sample_call = {
         "transcript": "There's a fire on the third floor! I can see smoke coming from room 305. There are people trapped!",
@@ -209,7 +385,7 @@ def example_usage():
         "timestamp": "20260112-143022"
     }
     
-    result = crew.process_emergency_call(sample_call)
+    result = process_call_sync(sample_call)
     print(result)
 
 if __name__ == "__main__":
@@ -0,0 +1,120 @@
+"""
+Task Graph Execution
+====================
+Runs CrewAI tasks as a dependency graph instead of Process.sequential. Each
+task declares the tasks whose output it actually reads; a task starts as
+soon as those are done, so tasks with no path between them run concurrently.
+A task's inputs are handed to it as context, in declaration order, the same
+way a sequential Crew passes earlier task outputs along.
+
+    graph = TaskGraph("dispatch")
+    graph.add("intake", intake_task)
+    graph.add("historian", historian_task)                 # no inputs: runs alongside intake
+    graph.add("orchestrator", orchestrator_task, inputs=["intake", "historian"])
+    outputs, timings = graph.run()
+
+Timings are per task, in milliseconds from the start of the run:
+{"start_ms", "end_ms", "duration_ms"}. Tasks run on a shared thread pool, so
+one graph holding a crew-executor worker can still fan out.
+
+Environment:
+    CREW_DAG_WORKERS   threads shared by all running task graphs (default 8)
+"""
+
+import concurrent.futures
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from services.log import get_logger
+from services.metrics import registry
+
+logger = get_logger("crew_dag")
+
+CREW_TASK_DURATION = registry.histogram(
+    "omnidispatch_crew_task_seconds", "Time spent executing one crew task", ["crew", "task"],
+    buckets=(0.25, 0.5, 1, 2.5, 5, 10, 20, 40, 60, 120),
+)
+
+# Matches the separator a sequential Crew puts between aggregated task outputs
+CONTEXT_SEPARATOR = "\n\n----------\n\n"
+
+_pool: Optional[concurrent.futures.ThreadPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _task_pool() -> concurrent.futures.ThreadPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = concurrent.futures.ThreadPoolExecutor(
+                max_workers=int(os.getenv("CREW_DAG_WORKERS", "8")), thread_name_prefix="crew-task"
+            )
+        return _pool
+
+
+class TaskGraph:
+    """CrewAI tasks with declared inputs, executed in dependency order"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.tasks: Dict[str, Any] = {}
+        self.inputs: Dict[str, List[str]] = {}
+
+    def add(self, name: str, task: Any, inputs: Sequence[str] = ()) -> "TaskGraph":
+        """Add a task; its inputs must already be in the graph, which keeps it acyclic"""
+        if name in self.tasks:
+            raise ValueError(f"task {name!r} already in graph {self.name!r}")
+        missing = [i for i in inputs if i not in self.tasks]
+        if missing:
+            raise ValueError(f"task {name!r} reads unknown tasks {missing}")
+        self.tasks[name] = task
+        self.inputs[name] = list(inputs)
+        return self
+
+    def sinks(self) -> List[str]:
+        """Tasks no other task reads from, i.e. the graph's results"""
+        read = {i for inputs in self.inputs.values() for i in inputs}
+        return [name for name in self.tasks if name not in read]
+
+    def _execute(self, name: str, context: Optional[str], origin: float) -> Tuple[Any, Dict[str, float]]:
+        started = time.perf_counter()
+        output = self.tasks[name].execute_sync(context=context)
+        ended = time.perf_counter()
+        CREW_TASK_DURATION.observe(ended - started, crew=self.name, task=name)
+        return output, {
+            "start_ms": round((started - origin) * 1000, 2),
+            "end_ms": round((ended - origin) * 1000, 2),
+            "duration_ms": round((ended - started) * 1000, 2),
+        }
+
+    def run(self) -> Tuple[Dict[str, Any], Dict[str, Dict[str, float]]]:
+        """Execute every task; returns (TaskOutput by name, timings by name). Re-raises a task's error"""
+        origin = time.perf_counter()
+        pool = _task_pool()
+        outputs: Dict[str, Any] = {}
+        timings: Dict[str, Dict[str, float]] = {}
+        waiting = dict(self.inputs)
+        running: Dict[concurrent.futures.Future, str] = {}
+        try:
+            while waiting or running:
+                for name, inputs in list(waiting.items()):
+                    if all(i in outputs for i in inputs):
+                        del waiting[name]
+                        context = CONTEXT_SEPARATOR.join(outputs[i].raw for i in inputs) or None
+                        running[pool.submit(self._execute, name, context, origin)] = name
+                done, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    outputs[name], timings[name] = future.result()
+        except Exception as e:
+            logger.warning("task graph failed", extra={
+                "crew": self.name, "completed": list(outputs), "error": str(e)
+            })
+            raise
+        finally:
+            # Tasks not started yet are dropped; ones already running finish on their own
+            for future in running:
+                future.cancel()
+        return outputs, timings
@@ -0,0 +1,208 @@
+"""
+Crew Executor
+=============
+Runs blocking crew.kickoff() work off the event loop. Crews go to a
+dedicated, bounded executor (not the loop's default one shared with
+everything else), so a long multi-agent run never stalls WebSocket traffic
+and a burst of crew requests cannot starve other blocking calls.
+
+    thread    crews share this process's crew pools; cheap, the default
+    process   each worker process keeps its own warm pools; needs picklable
+              arguments, isolates the GIL-heavy prompt/parse work
+
+Calls beyond the workers wait in the executor's queue, up to
+CREW_EXECUTOR_QUEUE; past that run() raises CrewQueueFull. Each crew type
+has a timeout. A call that times out, or whose client disconnects
+(run_until_disconnect), is cancelled if it has not started yet; a kickoff
+already running cannot be interrupted, so it finishes in the background and
+its result is dropped. In-flight work is counted until it really finishes,
+which is what the queue-depth gauges report.
+
+Environment:
+    CREW_EXECUTOR          "thread" (default) or "process"
+    CREW_EXECUTOR_WORKERS  concurrent kickoffs (default: CREW_POOL_SIZE x 2)
+    CREW_EXECUTOR_QUEUE    calls allowed to wait for a worker (default 16)
+    CREW_TIMEOUTS          per-crew seconds, e.g. "chronos=120,dispatch=45"
+"""
+
+import asyncio
+import concurrent.futures
+import multiprocessing
+import os
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+from services.log import get_logger
+from services.metrics import registry
+
+logger = get_logger("crew_executor")
+
+CREW_RUNS = registry.counter(
+    "omnidispatch_crew_runs_total", "Crew executions by outcome", ["crew", "result"]
+)
+CREW_RUN_DURATION = registry.histogram(
+    "omnidispatch_crew_run_seconds", "Crew execution time, queue wait included", ["crew"],
+    buckets=(0.5, 1, 2.5, 5, 10, 20, 40, 60, 120, 300),
+)
+CREW_INFLIGHT = registry.gauge(
+    "omnidispatch_crew_executor_inflight", "Crew calls submitted and not yet finished"
+)
+CREW_QUEUED = registry.gauge(
+    "omnidispatch_crew_executor_queued", "Crew calls waiting for an executor worker"
+)
+
+DEFAULT_TIMEOUTS: Dict[str, float] = {"chronos": 120.0, "dispatch": 45.0}
+
+T = TypeVar("T")
+
+
+class CrewQueueFull(Exception):
+    """Raised when the executor queue is at capacity; callers should retry later"""
+
+
+class ClientDisconnected(Exception):
+    """The HTTP client went away while its crew call was pending"""
+
+
+def _parse_timeouts(spec: str) -> Dict[str, float]:
+    timeouts: Dict[str, float] = {}
+    for item in spec.split(","):
+        name, _, value = item.partition("=")
+        if name.strip() and value.strip():
+            timeouts[name.strip()] = float(value)
+    return timeouts
+
+
+def _warm_worker():
+    """Process-pool initializer: build this worker's crews before the first call arrives"""
+    from agents.chronos_crew import chronos_pool
+    from agents.crew import dispatch_pool
+
+    for pool in (chronos_pool, dispatch_pool):
+        try:
+            pool.warm()
+        except Exception as e:
+            logger.warning("crew warm-up failed", extra={"crew": pool.name, "error": str(e)})
+
+
+class CrewExecutor:
+    """Bounded executor for synchronous crew entry points"""
+
+    def __init__(self, kind: Optional[str] = None, workers: Optional[int] = None,
+                 max_queue: Optional[int] = None, timeouts: Optional[Dict[str, float]] = None):
+        self.kind = kind or os.getenv("CREW_EXECUTOR", "thread")
+        if self.kind not in ("thread", "process"):
+            raise ValueError(f"CREW_EXECUTOR must be thread or process, got {self.kind!r}")
+        self.workers = workers or int(os.getenv("CREW_EXECUTOR_WORKERS", "0")) \
+            or 2 * int(os.getenv("CREW_POOL_SIZE", "2"))
+        self.max_queue = max_queue if max_queue is not None else int(os.getenv("CREW_EXECUTOR_QUEUE", "16"))
+        self.timeouts = {**DEFAULT_TIMEOUTS, **_parse_timeouts(os.getenv("CREW_TIMEOUTS", "")), **(timeouts or {})}
+        self._executor: Optional[concurrent.futures.Executor] = None
+        self._inflight = 0
+        self._lock = threading.Lock()
+        CREW_INFLIGHT.set_function(lambda: self._inflight)
+        CREW_QUEUED.set_function(lambda: self.queued)
+
+    @property
+    def queued(self) -> int:
+        return max(0, self._inflight - self.workers)
+
+    def _ensure_executor(self) -> concurrent.futures.Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                # spawn, not fork: the parent has logging and event-loop threads running
+                self._executor = concurrent.futures.ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_warm_worker,
+                )
+            else:
+                self._executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="crew"
+                )
+        return self._executor
+
+    def _finished(self, _future):
+        with self._lock:
+            self._inflight -= 1
+
+    async def run(self, crew: str, fn: Callable[..., T], *args: Any, timeout: Optional[float] = None) -> T:
+        """
+        Run fn(*args) on a crew worker and await it.
+        Raises CrewQueueFull, asyncio.TimeoutError, or CancelledError if the caller is cancelled.
+        """
+        with self._lock:
+            if self._inflight >= self.workers + self.max_queue:
+                CREW_RUNS.inc(crew=crew, result="rejected")
+                raise CrewQueueFull(f"{self._inflight} crew calls in flight")
+            self._inflight += 1
+        try:
+            future = self._ensure_executor().submit(fn, *args)
+        except Exception:
+            with self._lock:
+                self._inflight -= 1
+            raise
+        # Counted until the work really ends, not when the awaiting caller gives up
+        future.add_done_callback(self._finished)
+
+        timeout = timeout if timeout is not None else self.timeouts.get(crew)
+        started = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except asyncio.TimeoutError:
+            CREW_RUNS.inc(crew=crew, result="timeout")
+            self._abandon(crew, future, "timeout")
+            raise
+        except asyncio.CancelledError:
+            CREW_RUNS.inc(crew=crew, result="cancelled")
+            self._abandon(crew, future, "cancelled")
+            raise
+        except Exception:
+            CREW_RUNS.inc(crew=crew, result="error")
+            raise
+        finally:
+            CREW_RUN_DURATION.observe(time.perf_counter() - started, crew=crew)
+        CREW_RUNS.inc(crew=crew, result="ok")
+        return result
+
+    @staticmethod
+    def _abandon(crew: str, future: concurrent.futures.Future, reason: str):
+        # wait_for already cancelled the wrapper; this reports whether the kickoff had begun
+        if future.cancel() or future.cancelled():
+            logger.info("crew call dropped before starting", extra={"crew": crew, "reason": reason})
+        else:
+            logger.warning("crew call abandoned while running; it will finish in the background",
+                           extra={"crew": crew, "reason": reason})
+
+    def stats(self) -> Dict:
+        return {"kind": self.kind, "workers": self.workers, "max_queue": self.max_queue,
+                "inflight": self._inflight, "queued": self.queued, "timeouts": self.timeouts}
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+async def run_until_disconnect(request, awaitable: Awaitable[T], poll_s: float = 0.5) -> T:
+    """
+    Await `awaitable`, cancelling it if the HTTP client goes away.
+    `request` is anything with an async is_disconnected() (a Starlette Request).
+    Raises ClientDisconnected.
+    """
+    task = asyncio.ensure_future(awaitable)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=poll_s)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                task.cancel()
+                raise ClientDisconnected()
+    finally:
+        if not task.done():
+            task.cancel()
+
+
+# Shared by the crew modules' async entry points
+crew_executor = CrewExecutor()
@@ -0,0 +1,129 @@
+"""
+Crew Pool
+=========
+Warm, reusable crew instances. Building a crew means an LLM client, three
+Agents, their Tasks and a Crew; doing that on every call costs more than the
+bookkeeping around a kickoff. A pool builds each instance once (all of them
+up front with warm(), otherwise on first demand) and lends them out one
+caller at a time, so per-call state on an instance (task descriptions,
+callbacks, outputs) is never shared between concurrent kickoffs.
+
+The pool size is also the concurrency bound: at most `size` kickoffs of a
+crew type run at once, further callers wait for an instance to come back.
+
+Environment:
+    CREW_POOL_SIZE   instances per crew type (default 2)
+"""
+
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Generic, Iterator, Optional, TypeVar
+
+from services.log import get_logger
+from services.metrics import registry
+
+logger = get_logger("crew_pool")
+
+CREW_POOL_IN_USE = registry.gauge(
+    "omnidispatch_crew_pool_in_use", "Crew instances currently lent out", ["crew"]
+)
+CREW_POOL_WAIT = registry.histogram(
+    "omnidispatch_crew_pool_wait_seconds", "Time spent waiting for a free crew instance", ["crew"]
+)
+CREW_BUILDS = registry.counter(
+    "omnidispatch_crew_builds_total", "Crew instances constructed", ["crew"]
+)
+
+T = TypeVar("T")
+
+
+class CrewPoolTimeout(Exception):
+    """No crew instance became free within the timeout"""
+
+
+class CrewPool(Generic[T]):
+    """Fixed-size pool of crew instances built by `factory`"""
+
+    def __init__(self, name: str, factory: Callable[[], T], size: Optional[int] = None):
+        self.name = name
+        self.factory = factory
+        self.size = size or int(os.getenv("CREW_POOL_SIZE", "2"))
+        # LIFO: the most recently returned (warmest) instance goes out first
+        self._idle: "queue.LifoQueue[T]" = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _build(self) -> Optional[T]:
+        """A new instance if the pool is below size, else None"""
+        with self._lock:
+            if self._created >= self.size:
+                return None
+            self._created += 1
+        try:
+            started = time.perf_counter()
+            instance = self.factory()
+        except Exception:
+            with self._lock:
+                self._created -= 1
+            raise
+        CREW_BUILDS.inc(crew=self.name)
+        logger.info("crew built", extra={
+            "crew": self.name, "build_ms": round((time.perf_counter() - started) * 1000, 2)
+        })
+        return instance
+
+    def warm(self) -> int:
+        """Build every instance now rather than on first use; returns how many were built"""
+        built = 0
+        while True:
+            instance = self._build()
+            if instance is None:
+                return built
+            self._idle.put(instance)
+            built += 1
+
+    @contextmanager
+    def acquire(self, timeout: Optional[float] = None) -> Iterator[T]:
+        """Borrow an instance for one kickoff. Raises CrewPoolTimeout"""
+        started = time.perf_counter()
+        deadline = None if timeout is None else started + timeout
+        instance: Optional[T] = None
+        while instance is None:
+            try:
+                instance = self._idle.get_nowait()
+                break
+            except queue.Empty:
+                pass
+            instance = self._build()
+            if instance is not None:
+                break
+            # Wake up periodically: a discarded instance frees a build slot without a put()
+            wait = 0.5 if deadline is None else min(0.5, deadline - time.perf_counter())
+            if wait <= 0:
+                raise CrewPoolTimeout(f"no {self.name} crew free after {timeout}s")
+            try:
+                instance = self._idle.get(timeout=wait)
+            except queue.Empty:
+                continue
+        CREW_POOL_WAIT.observe(time.perf_counter() - started, crew=self.name)
+        CREW_POOL_IN_USE.inc(crew=self.name)
+        healthy = False
+        try:
+            yield instance
+            healthy = True
+        finally:
+            CREW_POOL_IN_USE.dec(crew=self.name)
+            if healthy:
+                self._idle.put(instance)
+            else:
+                # A kickoff that blew up may leave agent state half-updated; rebuild lazily
+                with self._lock:
+                    self._created -= 1
+
+    def stats(self) -> Dict:
+        idle = self._idle.qsize()
+        return {"crew": self.name, "size": self.size, "built": self._created,
+                "idle": idle, "in_use": self._created - idle}
@@ -0,0 +1,3 @@
+"""
+OmniDispatch benchmark suite
+"""
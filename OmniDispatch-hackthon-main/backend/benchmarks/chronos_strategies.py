@@ -0,0 +1,189 @@
+"""
+Chronos Strategy Benchmark
+==========================
+Runs the Chronos agent pipeline in-process under each CHRONOS_STRATEGY
+(sequential, parallel, fused) for the same locations and reports, per strategy:
+
+    latency       p50/p95/p99 of a full analysis
+    llm_calls     provider round trips per analysis (from the request trace)
+    success_rate  analyses that produced a parsed assessment
+    completeness  fraction of the response schema present and well-typed
+    agreement     vs. the sequential baseline for the same location: risk level
+                  match rate, mean |risk score delta|, primary threat overlap
+
+Providers come from the usual environment: real API keys, or the stand-in
+server (benchmarks.provider_stub) for latency-only comparisons.
+
+Usage (from backend/):
+    python -m benchmarks.chronos_strategies --rounds 3 --concurrency 2 --output chronos.json
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+from benchmarks.load_test import summarize
+from services.tracing import request_trace
+
+LOCATIONS: List[Tuple[str, float, float]] = [
+    ("Tokyo", 35.68, 139.69),
+    ("Mumbai", 19.08, 72.88),
+    ("Los Angeles", 34.05, -118.24),
+    ("Jakarta", -6.21, 106.85),
+    ("Istanbul", 41.01, 28.98),
+    ("Lima", -12.05, -77.04),
+    ("Dhaka", 23.81, 90.41),
+    ("Christchurch", -43.53, 172.64),
+]
+
+# Field -> accepted types; strings and lists must also be non-empty
+SCHEMA_FIELDS: Dict[str, tuple] = {
+    "location_name": (str,),
+    "country": (str,),
+    "overall_risk_level": (str,),
+    "risk_score": (int, float),
+    "risk_score_explanation": (str,),
+    "primary_threats": (list,),
+    "risk_zones": (list,),
+    "historical_patterns": (list,),
+    "immediate_concerns": (list,),
+    "prediction_next_24h": (str,),
+    "preparedness_score": (int, float),
+    "recommended_actions": (list,),
+    "weather_correlation": (dict,),
+    "ai_reasoning": (str,),
+}
+
+
+def completeness(result: Dict) -> float:
+    """Share of schema fields present, correctly typed and non-empty"""
+    ok = 0
+    for field, types in SCHEMA_FIELDS.items():
+        value = result.get(field)
+        if isinstance(value, types) and not isinstance(value, bool) and (
+            isinstance(value, (int, float)) or len(value) > 0
+        ):
+            ok += 1
+    return ok / len(SCHEMA_FIELDS)
+
+
+def _threats(result: Dict) -> set:
+    return {str(t).strip().lower() for t in result.get("primary_threats") or []}
+
+
+def agreement(result: Dict, baseline: Dict) -> Dict:
+    """How closely a result matches the baseline assessment of the same location"""
+    a, b = _threats(result), _threats(baseline)
+    try:
+        score_delta = abs(float(result.get("risk_score", 0)) - float(baseline.get("risk_score", 0)))
+    except (TypeError, ValueError):
+        score_delta = 100.0
+    return {
+        "level_match": str(result.get("overall_risk_level", "")).lower() == str(baseline.get("overall_risk_level", "")).lower(),
+        "score_delta": score_delta,
+        "threat_overlap": len(a & b) / len(a | b) if a | b else 1.0,
+    }
+
+
+async def run_strategy(analyze, strategy: str, rounds: int, concurrency: int) -> Dict:
+    """Analyze every location `rounds` times under one strategy"""
+    semaphore = asyncio.Semaphore(concurrency)
+    samples: List[Dict] = []
+
+    async def one(name: str, lat: float, lng: float):
+        async with semaphore:
+            with request_trace() as spans:
+                started = time.perf_counter()
+                result = await analyze(lat, lng, strategy=strategy)
+                elapsed_ms = (time.perf_counter() - started) * 1000
+            samples.append({
+                "location": name,
+                "latency_ms": elapsed_ms,
+                "llm_calls": len([s for s in spans if s["stage"] == "llm"]),
+                "success": bool(result.get("success")),
+                "result": result,
+            })
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(*loc) for _ in range(rounds) for loc in LOCATIONS))
+    elapsed_s = time.perf_counter() - started
+    ok = [s for s in samples if s["success"]]
+    return {
+        "samples": samples,
+        "latency": summarize([s["latency_ms"] for s in ok], len(samples) - len(ok), elapsed_s),
+        "llm_calls_per_analysis": round(sum(s["llm_calls"] for s in samples) / len(samples), 2),
+        "success_rate": round(len(ok) / len(samples), 3),
+        "completeness": round(sum(completeness(s["result"]) for s in ok) / len(ok), 3) if ok else 0.0,
+    }
+
+
+def compare_to_baseline(report: Dict, baseline: Dict) -> Optional[Dict]:
+    """Mean agreement of a strategy's successful results with the baseline's, per location"""
+    reference = {}
+    for sample in baseline["samples"]:
+        if sample["success"]:
+            reference.setdefault(sample["location"], sample["result"])
+    scores = [agreement(s["result"], reference[s["location"]])
+              for s in report["samples"] if s["success"] and s["location"] in reference]
+    if not scores:
+        return None
+    return {
+        "level_match_rate": round(sum(s["level_match"] for s in scores) / len(scores), 3),
+        "mean_score_delta": round(sum(s["score_delta"] for s in scores) / len(scores), 2),
+        "mean_threat_overlap": round(sum(s["threat_overlap"] for s in scores) / len(scores), 3),
+    }
+
+
+async def main_async(args) -> Dict:
+    # Imported late so provider configuration comes from the caller's environment
+    from main import CHRONOS_STRATEGIES, analyze_location_with_crewai
+
+    strategies = args.strategies or list(CHRONOS_STRATEGIES)
+    reports = {}
+    for strategy in strategies:
+        print(f"Running {strategy} ({len(LOCATIONS) * args.rounds} analyses)...", file=sys.stderr)
+        reports[strategy] = await run_strategy(analyze_location_with_crewai, strategy, args.rounds, args.concurrency)
+
+    baseline = reports.get("sequential")
+    summary = {}
+    for strategy, report in reports.items():
+        summary[strategy] = {
+            "latency": report["latency"],
+            "llm_calls_per_analysis": report["llm_calls_per_analysis"],
+            "success_rate": report["success_rate"],
+            "completeness": report["completeness"],
+            "agreement_with_sequential": compare_to_baseline(report, baseline) if baseline and strategy != "sequential" else None,
+        }
+    return summary
+
+
+def print_table(summary: Dict):
+    print(f"{'strategy':<12}{'p50 ms':>10}{'p95 ms':>10}{'calls':>8}{'success':>9}{'complete':>10}{'level=':>8}{'|Δscore|':>10}{'threats':>9}")
+    for strategy, row in summary.items():
+        agree = row["agreement_with_sequential"] or {}
+        print(f"{strategy:<12}{row['latency']['p50_ms']:>10.0f}{row['latency']['p95_ms']:>10.0f}"
+              f"{row['llm_calls_per_analysis']:>8.2f}{row['success_rate']:>9.2f}{row['completeness']:>10.2f}"
+              f"{agree.get('level_match_rate', float('nan')):>8.2f}{agree.get('mean_score_delta', float('nan')):>10.1f}"
+              f"{agree.get('mean_threat_overlap', float('nan')):>9.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare Chronos pipeline strategies")
+    parser.add_argument("--strategies", nargs="+", choices=["sequential", "parallel", "fused"])
+    parser.add_argument("--rounds", type=int, default=2, help="Analyses per location per strategy")
+    parser.add_argument("--concurrency", type=int, default=2)
+    parser.add_argument("--output", help="Write the summary as JSON")
+    args = parser.parse_args()
+
+    summary = asyncio.run(main_async(args))
+    print_table(summary)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Crew Construction Benchmark
+===========================
+Measures the per-call setup cost of the CrewAI crews with and without the
+crew pool, stopping short of kickoff (no provider calls are made):
+
+    per_call  build a fresh crew (LLM client, three Agents, Tasks, Crew) and
+              fill in the call's task descriptions - what every call used to pay
+    pooled    borrow a warm instance from the pool and fill in the descriptions
+
+Requires crewai; a placeholder GROQ_API_KEY is set if none is configured, and
+OpenTelemetry export is disabled so no network is touched.
+
+Usage (from backend/):
+    python -m benchmarks.crew_construction --iterations 200 --output crews.json
+"""
+
+import argparse
+import json
+import os
+import time
+from typing import Callable, Dict, List
+
+from benchmarks.load_test import summarize
+
+SAMPLE_CALL = {
+    "transcript": "There's a fire on the third floor! People are trapped!",
+    "location": {"address": "123 Main St", "coordinates": {"lat": 40.7128, "lng": -74.0060}},
+    "stress_level": 0.87,
+}
+
+
+def measure(setup: Callable[[], None], iterations: int) -> Dict:
+    samples: List[float] = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        setup()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return summarize(samples, 0, time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Crew construction overhead: per-call vs pooled")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--output", help="Write the results as JSON")
+    args = parser.parse_args()
+
+    os.environ.setdefault("GROQ_API_KEY", "benchmark-placeholder")
+    os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+    os.environ.setdefault("CREW_VERBOSE", "0")
+    # Imported late so the environment above is in place
+    from agents.chronos_crew import ChronosCrew, chronos_pool
+    from agents.crew import OmniDispatchCrew, dispatch_pool
+
+    chronos_pool.warm()
+    dispatch_pool.warm()
+
+    def chronos_per_call():
+        ChronosCrew()._prepare_tasks(35.68, 139.69, None, {}, {"last": 0.0})
+
+    def chronos_pooled():
+        with chronos_pool.acquire() as crew:
+            crew._prepare_tasks(35.68, 139.69, None, {}, {"last": 0.0})
+
+    def dispatch_per_call():
+        OmniDispatchCrew()._prepare_tasks(SAMPLE_CALL, {}, {"last": 0.0})
+
+    def dispatch_pooled():
+        with dispatch_pool.acquire() as crew:
+            crew._prepare_tasks(SAMPLE_CALL, {}, {"last": 0.0})
+
+    results = {
+        "chronos": {"per_call": measure(chronos_per_call, args.iterations),
+                    "pooled": measure(chronos_pooled, args.iterations)},
+        "dispatch": {"per_call": measure(dispatch_per_call, args.iterations),
+                     "pooled": measure(dispatch_pooled, args.iterations)},
+    }
+
+    print(f"{'crew':<10}{'mode':<10}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}")
+    for crew, modes in results.items():
+        for mode, stats in modes.items():
+            print(f"{crew:<10}{mode:<10}{stats['mean_ms']:>10.3f}{stats['p50_ms']:>10.3f}{stats['p95_ms']:>10.3f}")
+        saved = modes["per_call"]["mean_ms"] - modes["pooled"]["mean_ms"]
+        print(f"{'':<10}{'saved':<10}{saved:>10.3f}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,377 @@
+"""
+OmniDispatch End-to-End Load Test
+=================================
+Replays synthetic emergency call scripts against /api/emergency/process-full
+at a configurable concurrency and reports throughput plus p50/p95/p99 latency
+per conversation stage, overall, and for WebSocket incident delivery.
+
+Usage (from backend/, with the API running):
+    python -m benchmarks.load_test --calls 50 --concurrency 8 --output results.json
+    python -m benchmarks.load_test --compare results.json --max-regression 15
+
+Every script runs under its own call_id, so concurrent scripts keep separate
+conversation state on the server and each stage is classified correctly.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import sys
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import httpx
+
+# ============================================================================
+# SYNTHETIC CALL SCRIPTS
+# ============================================================================
+
+CALL_SCRIPTS: List[Dict] = [
+    {
+        "emergency_type": "fire",
+        "first_report": "There's a fire in my kitchen and the smoke is spreading to the hallway!",
+        "followups": ["The fire is getting worse, I can't see the door", "I'm trapped in the bedroom"],
+        "ending": "Thank you, I can hear the sirens",
+    },
+    {
+        "emergency_type": "medical",
+        "first_report": "My father collapsed and he's not breathing properly, please help",
+        "followups": ["He is unconscious now", "There's some bleeding from his head"],
+        "ending": "Thanks, the paramedics are here",
+    },
+    {
+        "emergency_type": "crime",
+        "first_report": "Someone broke into my house, I think the intruder is still inside",
+        "followups": ["I'm hiding in the closet, he is still here"],
+        "ending": "That's all, police just arrived",
+    },
+    {
+        "emergency_type": "accident",
+        "first_report": "There's been a car crash on the highway, two vehicles, one driver is hurt",
+        "followups": ["The other car is leaking fuel", "Traffic is still going around us"],
+        "ending": "Bye, the ambulance is here",
+    },
+    {
+        "emergency_type": "disaster",
+        "first_report": "Flood water is coming into our ground floor and rising fast",
+        "followups": ["The water is rising to my knees now", "We're stuck on the stairs"],
+        "ending": "Thank you so much",
+    },
+]
+
+DEFAULT_LOCATIONS: List[Dict] = [
+    {"lat": 17.385, "lng": 78.4867, "address": "Hyderabad, India"},
+    {"lat": 40.7128, "lng": -74.0060, "address": "New York, NY, USA"},
+    {"lat": 35.6762, "lng": 139.6503, "address": "Tokyo, Japan"},
+]
+
+# ============================================================================
+# STATISTICS
+# ============================================================================
+
+def percentile(values: List[float], pct: float) -> float:
+    """Linear-interpolated percentile of a list of values"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100.0
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(latencies_ms: List[float], errors: int, elapsed_s: float) -> Dict:
+    """Summarize a latency sample into throughput and percentile figures"""
+    count = len(latencies_ms)
+    return {
+        "count": count,
+        "errors": errors,
+        "throughput_rps": round(count / elapsed_s, 3) if elapsed_s > 0 else 0.0,
+        "mean_ms": round(sum(latencies_ms) / count, 2) if count else 0.0,
+        "p50_ms": round(percentile(latencies_ms, 50), 2),
+        "p95_ms": round(percentile(latencies_ms, 95), 2),
+        "p99_ms": round(percentile(latencies_ms, 99), 2),
+        "max_ms": round(max(latencies_ms), 2) if latencies_ms else 0.0,
+    }
+
+# ============================================================================
+# LOAD GENERATOR
+# ============================================================================
+
+class LoadTest:
+    """Drives call scripts against a running OmniDispatch backend"""
+
+    def __init__(self, base_url: str, concurrency: int, calls: int, followups: int,
+                 timeout: float, measure_ws: bool, seed: Optional[int] = None):
+        self.base_url = base_url.rstrip("/")
+        self.concurrency = concurrency
+        self.calls = calls
+        self.followups = followups
+        self.timeout = timeout
+        self.measure_ws = measure_ws
+        self.random = random.Random(seed)
+
+        self.stage_latencies: Dict[str, List[float]] = {}
+        self.stage_errors: Dict[str, int] = {}
+        self.server_stage_latencies: Dict[str, List[float]] = {}
+        self.service_modes: Dict[str, int] = {}
+        self.call_latencies: List[float] = []
+        self.call_errors = 0
+        self.ws_lags: List[float] = []
+        self.ws_error: Optional[str] = None
+
+    def _record(self, stage: str, latency_ms: Optional[float]):
+        if latency_ms is None:
+            self.stage_errors[stage] = self.stage_errors.get(stage, 0) + 1
+        else:
+            self.stage_latencies.setdefault(stage, []).append(latency_ms)
+
+    async def _post(self, client: httpx.AsyncClient, stage: str, path: str, payload: Dict,
+                    params: Optional[Dict] = None) -> Optional[Dict]:
+        start = time.perf_counter()
+        try:
+            response = await client.post(f"{self.base_url}{path}", json=payload, params=params, timeout=self.timeout)
+            latency_ms = (time.perf_counter() - start) * 1000
+            if response.status_code != 200:
+                self._record(stage, None)
+                return None
+            self._record(stage, latency_ms)
+            result = response.json()
+            # Server-side span totals reported by /api/emergency/process-full
+            for name, value in result.get("stage_timings_ms", {}).items():
+                self.server_stage_latencies.setdefault(name, []).append(value)
+            if "service_mode" in result:
+                self.service_modes[result["service_mode"]] = self.service_modes.get(result["service_mode"], 0) + 1
+            return result
+        except httpx.HTTPError:
+            self._record(stage, None)
+            return None
+
+    async def _run_script(self, client: httpx.AsyncClient, script: Dict, location: Dict) -> bool:
+        """Replay one call under its own call_id: first report, follow-ups, an ending phrase, then reset"""
+        call_id = f"load-{uuid.uuid4().hex[:12]}"
+        body = {"transcript": script["first_report"], "caller_location": location, "call_id": call_id,
+                "caller_phone": f"+1-555-{self.random.randint(1000, 9999)}"}
+        result = await self._post(client, "first_report", "/api/emergency/process-full", body)
+        ok = result is not None
+
+        for transcript in script["followups"][:self.followups]:
+            body = {"transcript": transcript, "caller_location": location, "call_id": call_id}
+            ok = await self._post(client, "followup", "/api/emergency/process-full", body) is not None and ok
+
+        body = {"transcript": script["ending"], "caller_location": location, "call_id": call_id}
+        ok = await self._post(client, "ending", "/api/emergency/process-full", body) is not None and ok
+        # Frees the server-side session
+        ok = await self._post(client, "reset", "/api/call/reset", {}, {"call_id": call_id}) is not None and ok
+        return ok
+
+    async def _worker(self, client: httpx.AsyncClient, queue: "asyncio.Queue[int]"):
+        while True:
+            try:
+                queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            script = self.random.choice(CALL_SCRIPTS)
+            location = self.random.choice(DEFAULT_LOCATIONS)
+            start = time.perf_counter()
+            ok = await self._run_script(client, script, location)
+            if ok:
+                self.call_latencies.append((time.perf_counter() - start) * 1000)
+            else:
+                self.call_errors += 1
+
+    async def _listen_ws(self, ready: asyncio.Event):
+        """Record the delivery lag of every new_incident broadcast"""
+        try:
+            import websockets
+        except ImportError:
+            self.ws_error = "websockets package not installed"
+            ready.set()
+            return
+
+        ws_url = self.base_url.replace("https://", "wss://").replace("http://", "ws://") + "/ws"
+        try:
+            async with websockets.connect(ws_url, max_size=None) as ws:
+                ready.set()
+                async for raw in ws:
+                    received = time.time()
+                    message = json.loads(raw)
+                    if message.get("type") != "new_incident":
+                        continue
+                    incident = message.get("incident", {})
+                    created_at = incident.get("created_at")
+                    if not created_at:
+                        continue
+                    # created_at is the server's local wall clock; lag is only
+                    # meaningful when client and server share a clock.
+                    lag_ms = (received - datetime.fromisoformat(created_at).timestamp()) * 1000
+                    self.ws_lags.append(max(lag_ms, 0.0))
+        except Exception as e:
+            self.ws_error = str(e)
+            ready.set()
+
+    async def run(self) -> Dict:
+        ws_task = None
+        if self.measure_ws:
+            ready = asyncio.Event()
+            ws_task = asyncio.create_task(self._listen_ws(ready))
+            await asyncio.wait_for(ready.wait(), timeout=self.timeout)
+
+        queue: "asyncio.Queue[int]" = asyncio.Queue()
+        for i in range(self.calls):
+            queue.put_nowait(i)
+
+        limits = httpx.Limits(max_connections=self.concurrency * 2)
+        started = time.perf_counter()
+        async with httpx.AsyncClient(limits=limits) as client:
+            await asyncio.gather(*(self._worker(client, queue) for _ in range(self.concurrency)))
+        elapsed = time.perf_counter() - started
+
+        if ws_task:
+            # Give in-flight broadcasts a moment to land before closing.
+            await asyncio.sleep(0.5)
+            ws_task.cancel()
+            try:
+                await ws_task
+            except asyncio.CancelledError:
+                pass
+
+        return self.report(elapsed)
+
+    def report(self, elapsed_s: float) -> Dict:
+        stages = sorted(set(self.stage_latencies) | set(self.stage_errors))
+        all_requests = [v for values in self.stage_latencies.values() for v in values]
+        return {
+            "generated_at": datetime.now().isoformat(),
+            "git_revision": _git_revision(),
+            "config": {
+                "base_url": self.base_url,
+                "concurrency": self.concurrency,
+                "calls": self.calls,
+                "followups": self.followups,
+                "timeout_s": self.timeout,
+            },
+            "elapsed_s": round(elapsed_s, 3),
+            "calls": summarize(self.call_latencies, self.call_errors, elapsed_s),
+            "requests": summarize(all_requests, sum(self.stage_errors.values()), elapsed_s),
+            "stages": {
+                stage: summarize(self.stage_latencies.get(stage, []), self.stage_errors.get(stage, 0), elapsed_s)
+                for stage in stages
+            },
+            "server_stages": {
+                stage: summarize(values, 0, elapsed_s)
+                for stage, values in sorted(self.server_stage_latencies.items())
+            },
+            "service_modes": dict(self.service_modes),
+            "websocket_lag": {
+                **summarize(self.ws_lags, 0, elapsed_s),
+                "enabled": self.measure_ws,
+                "error": self.ws_error,
+            },
+        }
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"],
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+# ============================================================================
+# REGRESSION COMPARISON
+# ============================================================================
+
+def compare_reports(baseline: Dict, current: Dict, max_regression_pct: float) -> List[str]:
+    """Return human-readable regressions of p95 latency and throughput"""
+    regressions = []
+    sections = [("requests", baseline.get("requests"), current.get("requests"))]
+    for stage, stats in current.get("stages", {}).items():
+        sections.append((f"stage:{stage}", baseline.get("stages", {}).get(stage), stats))
+    for stage, stats in current.get("server_stages", {}).items():
+        sections.append((f"server:{stage}", baseline.get("server_stages", {}).get(stage), stats))
+
+    for name, old, new in sections:
+        if not old or not new or not old.get("count") or not new.get("count"):
+            continue
+        if old["p95_ms"] > 0:
+            change = (new["p95_ms"] - old["p95_ms"]) / old["p95_ms"] * 100
+            if change > max_regression_pct:
+                regressions.append(f"{name} p95 {old['p95_ms']}ms -> {new['p95_ms']}ms (+{change:.1f}%)")
+        if old["throughput_rps"] > 0:
+            change = (old["throughput_rps"] - new["throughput_rps"]) / old["throughput_rps"] * 100
+            if change > max_regression_pct:
+                regressions.append(
+                    f"{name} throughput {old['throughput_rps']} -> {new['throughput_rps']} rps (-{change:.1f}%)"
+                )
+    return regressions
+
+
+def print_report(report: Dict):
+    print(f"\n{'='*84}")
+    print(f"📊 LOAD TEST RESULTS ({report['config']['calls']} calls @ concurrency {report['config']['concurrency']})")
+    print(f"{'='*84}")
+    header = f"{'stage':<28}{'count':>7}{'err':>6}{'rps':>9}{'p50':>10}{'p95':>10}{'p99':>10}"
+    print(header)
+    rows = [("calls", report["calls"]), ("requests", report["requests"])]
+    rows += [(stage, stats) for stage, stats in report["stages"].items()]
+    rows += [(f"srv:{stage}", stats) for stage, stats in report.get("server_stages", {}).items()]
+    if report["websocket_lag"]["enabled"]:
+        rows.append(("ws_lag", report["websocket_lag"]))
+    for name, stats in rows:
+        print(f"{name:<28}{stats['count']:>7}{stats['errors']:>6}{stats['throughput_rps']:>9.2f}"
+              f"{stats['p50_ms']:>10.1f}{stats['p95_ms']:>10.1f}{stats['p99_ms']:>10.1f}")
+    if report.get("service_modes"):
+        print("service modes: " + ", ".join(f"{mode}={count}" for mode, count in report["service_modes"].items()))
+    if report["websocket_lag"].get("error"):
+        print(f"⚠️ WebSocket: {report['websocket_lag']['error']}")
+    print(f"{'='*84}\n")
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="OmniDispatch emergency pipeline load test")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--calls", type=int, default=20, help="Number of call scripts to replay")
+    parser.add_argument("--followups", type=int, default=2, help="Max follow-up turns per call")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--no-ws", action="store_true", help="Skip WebSocket delivery lag measurement")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--output", default=None, help="Write the JSON report to this file")
+    parser.add_argument("--compare", default=None, help="Baseline JSON report to compare against")
+    parser.add_argument("--max-regression", type=float, default=10.0,
+                        help="Allowed p95/throughput regression in percent before failing")
+    args = parser.parse_args(argv)
+
+    test = LoadTest(args.base_url, args.concurrency, args.calls, args.followups,
+                    args.timeout, not args.no_ws, args.seed)
+    report = asyncio.run(test.run())
+    print_report(report)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Report written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare_reports(baseline, report, args.max_regression)
+        if regressions:
+            print("❌ Regressions detected:")
+            for line in regressions:
+                print(f"   - {line}")
+            return 1
+        print("✅ No regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,143 @@
+"""
+Request-Path Logging Benchmark
+==============================
+Compares per-request latency when the emergency pipeline writes its old
+multi-line print banners synchronously to a slow stdout (a blocked pipe or
+container log driver) against the queue-backed structured logger in
+services.log.
+
+Each simulated request awaits a fake provider round trip and emits the same
+volume of log output the first-message path of process_emergency_full used to.
+
+Usage (from backend/):
+    python -m benchmarks.logging_bench --requests 400 --concurrency 50 --write-delay-ms 2
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import logging
+import sys
+import time
+from typing import Dict, List, Optional
+
+from benchmarks.load_test import summarize
+from services import log as service_log
+
+
+class SlowStream(io.TextIOBase):
+    """A stdout stand-in whose every write blocks, like a full pipe"""
+
+    def __init__(self, write_delay_s: float):
+        self.write_delay_s = write_delay_s
+        self.bytes_written = 0
+
+    def write(self, text: str) -> int:
+        time.sleep(self.write_delay_s)
+        self.bytes_written += len(text)
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+BANNER_LINES = [
+    "\n" + "=" * 60,
+    "🚨 INCOMING MESSAGE",
+    "📝 Transcript: There's a fire in my kitchen and the smoke is spreading",
+    "📍 Location: {'lat': 17.385, 'lng': 78.4867, 'address': 'Unknown Location'}",
+    "🔄 Units Dispatched: False",
+    "=" * 60 + "\n",
+    "🆕 First message - Full emergency analysis and dispatch",
+    "🧠 Running JARVIS AI Analysis...",
+    "⚡ Cerebras Analysis: fire - critical (ultra-fast)",
+    "🚒 Dispatching Nearest Units...",
+    "📍 Dispatched Engine 7 - 2.7km away, ETA: 3min",
+    "📍 Dispatched Medic 5 - 2.5km away, ETA: 2min",
+    "📍 Searching Nearby Services...",
+    "✅ Found 3 nearby services",
+    "🤖 Getting JARVIS initial response...",
+    "🤖 JARVIS: Stay low and move toward the nearest exit.",
+    "\n✅ INCIDENT INC-20260112143022-123 CREATED",
+    "   Type: fire | Priority: critical",
+    "   Units Dispatched: 2",
+    "=" * 60 + "\n",
+]
+
+
+async def request_with_prints(stream: SlowStream, provider_latency_s: float):
+    for line in BANNER_LINES[:10]:
+        print(line, file=stream)
+    await asyncio.sleep(provider_latency_s)
+    for line in BANNER_LINES[10:]:
+        print(line, file=stream)
+
+
+async def request_with_logger(logger: logging.Logger, provider_latency_s: float):
+    logger.debug("incoming message", extra={"transcript": BANNER_LINES[2], "units_dispatched": False})
+    logger.info("triage complete", extra={"provider": "cerebras", "emergency_type": "fire", "priority": "critical"})
+    await asyncio.sleep(provider_latency_s)
+    logger.debug("unit dispatched", extra={"unit": "Engine 7", "distance_km": 2.7, "eta_minutes": 3})
+    logger.debug("unit dispatched", extra={"unit": "Medic 5", "distance_km": 2.5, "eta_minutes": 2})
+    logger.info("incident created", extra={"incident_id": "INC-20260112143022-123", "units_dispatched": 2})
+
+
+async def run_mode(make_request, requests: int, concurrency: int) -> Dict:
+    latencies: List[float] = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            await make_request()
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return summarize(latencies, 0, time.perf_counter() - started)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="print vs queue-backed logging on the request path")
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--write-delay-ms", type=float, default=2.0, help="Blocking time per stdout write")
+    parser.add_argument("--provider-latency-ms", type=float, default=50.0)
+    parser.add_argument("--level", default="INFO", help="Logger level for the structured mode")
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args(argv)
+
+    provider_latency_s = args.provider_latency_ms / 1000
+    print_stream = SlowStream(args.write_delay_ms / 1000)
+    log_stream = SlowStream(args.write_delay_ms / 1000)
+
+    service_log.configure_logging(stream=log_stream)
+    logger = service_log.get_logger("bench")
+    logging.getLogger(service_log.ROOT_LOGGER).setLevel(args.level.upper())
+
+    results = {
+        "config": vars(args),
+        "print": asyncio.run(run_mode(
+            lambda: request_with_prints(print_stream, provider_latency_s), args.requests, args.concurrency)),
+        "structured_queue": asyncio.run(run_mode(
+            lambda: request_with_logger(logger, provider_latency_s), args.requests, args.concurrency)),
+    }
+    drain_start = time.perf_counter()
+    service_log.shutdown_logging()
+    results["structured_queue"]["background_drain_s"] = round(time.perf_counter() - drain_start, 3)
+
+    print(f"{'mode':<18}{'rps':>9}{'p50':>10}{'p95':>10}{'p99':>10}")
+    for mode in ("print", "structured_queue"):
+        stats = results[mode]
+        print(f"{mode:<18}{stats['throughput_rps']:>9.1f}{stats['p50_ms']:>10.1f}"
+              f"{stats['p95_ms']:>10.1f}{stats['p99_ms']:>10.1f}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,306 @@
+"""
+Crew Plan Routing Evaluation
+============================
+Measures what the complexity-adaptive plan router (services.plan_router)
+saves in latency against what it costs in decision quality, on labelled
+calls. Each call carries the cheapest plan a dispatcher would accept for it
+and the agencies it needs. The router's cue terms and thresholds were tuned
+on the tuning set; the held-out set was never used for tuning and is the one
+whose numbers count.
+
+    routing    plan accuracy, under-routed calls (a cheaper plan than the label:
+               the unsafe error, reported separately for critical calls),
+               over-routed calls, and a label x routed confusion matrix
+    services   recall of the required agencies in what was dispatched: the
+               triage flags for local plans, the crew's output otherwise
+    latency    total and mean time of routed plans vs. always running the full
+               crew, and the share saved
+
+Triage comes from the keyword fallback (--triage local, offline and
+deterministic) or the live providers (--triage ai, real keys or the
+benchmarks.provider_stub server). Latencies are measured by running the crews
+(--execute, needs crewai and a Groq key) or, without it, estimated from
+per-plan costs (--plan-costs, e.g. the plan_costs_ms of an earlier --execute
+run). --sweep shifts every threshold by -2..+2 to show the trade-off curve.
+Both sets are reported unless --calls replaces them; --execute runs the
+held-out set (or the --calls set).
+
+Usage (from backend/):
+    python -m benchmarks.plan_routing --triage local --sweep
+    python -m benchmarks.plan_routing --triage ai --execute --output routing.json
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from typing import Dict, List, Optional
+
+from services.plan_router import DEFAULT_THRESHOLDS, PLANS, PlanRouter
+
+# (transcript, label plan, agencies needed)
+LABELLED_CALLS: List[Dict] = [
+    {"transcript": "My grandmother fell in the garden and her knee hurts. She's awake and talking.",
+     "plan": "local", "services": ["medical"]},
+    {"transcript": "Someone broke into my car last night, they took my bag. Nobody is hurt.",
+     "plan": "local", "services": ["police"]},
+    {"transcript": "I cut my hand cooking, it's bleeding a bit but I think it needs stitches.",
+     "plan": "local", "services": ["medical"]},
+    {"transcript": "There's a small fender bender at the corner of 5th and Main, nobody's injured.",
+     "plan": "local", "services": ["police"]},
+    {"transcript": "My son has a high fever and a rash, he's drowsy but breathing fine.",
+     "plan": "single", "services": ["medical"]},
+    {"transcript": "A man is following me and shouting threats, I'm hiding in a shop.",
+     "plan": "single", "services": ["police"]},
+    {"transcript": "My dad is having chest pain and his left arm feels numb.",
+     "plan": "full", "services": ["medical"]},
+    {"transcript": "Car crash on the highway, two cars, one driver is bleeding from the head.",
+     "plan": "full", "services": ["medical", "police"]},
+    {"transcript": "There's smoke coming out of my neighbour's kitchen window, I think there's a fire.",
+     "plan": "full", "services": ["fire", "medical"]},
+    {"transcript": "Someone has been stabbed outside the bar, he's on the ground bleeding a lot.",
+     "plan": "full", "services": ["medical", "police"]},
+    {"transcript": "My wife collapsed and she's not breathing, I'm doing CPR.",
+     "plan": "full", "services": ["medical"]},
+    {"transcript": "The river is flooding into our street, water is up to the doors and rising.",
+     "plan": "full", "services": ["fire", "medical"]},
+    {"transcript": "A chemical tanker overturned on the interstate and is leaking, several people "
+                   "are unconscious and there's a strong smell of gas.",
+     "plan": "hierarchical", "services": ["fire", "medical", "police"]},
+    {"transcript": "Apartment building fire on the 6th floor, people are trapped on the balconies and "
+                   "the stairwell is full of smoke, at least ten people inside.",
+     "plan": "hierarchical", "services": ["fire", "medical", "police"]},
+    {"transcript": "An explosion at the factory, part of the building collapsed and workers are buried.",
+     "plan": "hierarchical", "services": ["fire", "medical", "police"]},
+    {"transcript": "Shooting at the mall, multiple people shot, the gunman is still inside.",
+     "plan": "hierarchical", "services": ["medical", "police"]},
+    {"transcript": "A bus crashed into a building, there are lots of injured passengers and "
+                   "the front of the bus is on fire.",
+     "plan": "hierarchical", "services": ["fire", "medical", "police"]},
+]
+
+# Never used to pick cue terms, floors or thresholds: scores on it are the ones to quote
+HELD_OUT_CALLS: List[Dict] = [
+    {"transcript": "I twisted my ankle jogging, it's swollen but I can still walk on it.",
+     "plan": "local", "services": ["medical"]},
+    {"transcript": "Someone stole my bike from outside the gas station this morning.",
+     "plan": "local", "services": ["police"]},
+    {"transcript": "The house alarm went off, I think I disarmed it wrong. There's no sign of anyone.",
+     "plan": "local", "services": ["police"]},
+    {"transcript": "There was a minor collision in the parking lot, just scratched bumpers, no injuries.",
+     "plan": "local", "services": ["police"]},
+    {"transcript": "My father has a mild fever and a cough since yesterday, he's eating and talking normally.",
+     "plan": "local", "services": ["medical"]},
+    {"transcript": "My husband has been vomiting since this morning and has bad stomach pain.",
+     "plan": "single", "services": ["medical"]},
+    {"transcript": "A drunk man is banging on my door and won't leave.",
+     "plan": "single", "services": ["police"]},
+    {"transcript": "My daughter fell off her bike and hit her head, she's crying and has a big bump.",
+     "plan": "single", "services": ["medical"]},
+    {"transcript": "Someone sent my son a threatening message at school, I have a screenshot. He's home safe now.",
+     "plan": "single", "services": ["police"]},
+    {"transcript": "We just got back from Vegas and my wife's face is swelling up and she can't swallow.",
+     "plan": "full", "services": ["medical"]},
+    {"transcript": "My friend took a whole bottle of pills and I can't wake him up.",
+     "plan": "full", "services": ["medical"]},
+    {"transcript": "A car is on fire at the petrol station on Elm Road, the driver got out.",
+     "plan": "full", "services": ["fire", "police"]},
+    {"transcript": "A man with a knife is threatening people at the bus stop.",
+     "plan": "full", "services": ["medical", "police"]},
+    {"transcript": "My mother is having a seizure and her lips are turning blue.",
+     "plan": "full", "services": ["medical"]},
+    {"transcript": "A cyclist was hit by a truck and is lying in the road, not moving.",
+     "plan": "full", "services": ["medical", "police"]},
+    {"transcript": "Gas explosion in an apartment block, part of the building collapsed and "
+                   "many people are missing.",
+     "plan": "hierarchical", "services": ["fire", "medical", "police"]},
+    {"transcript": "A train derailed near the station, dozens of passengers are hurt.",
+     "plan": "hierarchical", "services": ["fire", "medical", "police"]},
+    {"transcript": "Someone is shooting at people in the school parking lot.",
+     "plan": "hierarchical", "services": ["medical", "police"]},
+    {"transcript": "A chlorine leak at the water treatment plant, workers are coughing and collapsing.",
+     "plan": "hierarchical", "services": ["fire", "medical", "police"]},
+]
+
+# Rough per-plan latency used when the crews are not executed (ms)
+DEFAULT_PLAN_COST_MS: Dict[str, float] = {"local": 0.0, "single": 1800.0, "full": 4200.0, "hierarchical": 9500.0}
+
+# Words in a dispatch plan that show an agency was sent
+SERVICE_TERMS: Dict[str, tuple] = {
+    "fire": ("fire engine", "fire truck", "engine company", "ladder", "firefighter", "fire department", "fire unit"),
+    "medical": ("ambulance", "ems", "paramedic", "medic", "als unit", "bls unit"),
+    "police": ("police", "officer", "patrol", "law enforcement", "swat"),
+}
+
+
+def triage_services(triage: Dict) -> set:
+    return {s for s, flag in (("fire", "requires_fire"), ("medical", "requires_medical"),
+                              ("police", "requires_police")) if triage.get(flag)}
+
+
+def text_services(text: str) -> set:
+    lowered = text.lower()
+    return {s for s, terms in SERVICE_TERMS.items() if any(term in lowered for term in terms)}
+
+
+def service_recall(needed: List[str], sent: set) -> float:
+    return len(set(needed) & sent) / len(needed) if needed else 1.0
+
+
+def evaluate(calls: List[Dict], router: PlanRouter, costs: Dict[str, float]) -> Dict:
+    """Routing quality and estimated latency of one router over triaged calls"""
+    rows = []
+    for call in calls:
+        decision = router.route(call["triage"], call["transcript"])
+        routed, label = PLANS.index(decision["plan"]), PLANS.index(call["plan"])
+        rows.append({
+            "plan": decision["plan"], "label": call["plan"], "score": decision["score"],
+            "under": routed < label, "over": routed > label,
+            "critical": str(call["triage"].get("priority", "")).lower() == "critical" or call["plan"] == "hierarchical",
+        })
+    n = len(rows)
+    routed_ms = sum(costs[r["plan"]] for r in rows)
+    full_ms = costs["full"] * n
+    confusion = {label: {plan: 0 for plan in PLANS} for label in PLANS}
+    for r in rows:
+        confusion[r["label"]][r["plan"]] += 1
+    return {
+        "thresholds": dict(router.thresholds),
+        "accuracy": round(sum(r["plan"] == r["label"] for r in rows) / n, 3),
+        "under_routed": round(sum(r["under"] for r in rows) / n, 3),
+        "under_routed_critical": sum(r["under"] and r["critical"] for r in rows),
+        "over_routed": round(sum(r["over"] for r in rows) / n, 3),
+        "plans": {plan: sum(r["plan"] == plan for r in rows) for plan in PLANS},
+        "latency_ms": {"routed_total": round(routed_ms, 1), "full_total": round(full_ms, 1),
+                       "saved_pct": round(100 * (1 - routed_ms / full_ms), 1) if full_ms else 0.0},
+        "confusion": confusion,
+        "rows": rows,
+    }
+
+
+async def triage_calls(calls: List[Dict], source: str) -> List[Dict]:
+    # Imported late so provider configuration comes from the caller's environment
+    from main import analyze_emergency_with_ai, fallback_analysis
+
+    triaged = []
+    for call in calls:
+        if "triage" in call:
+            triage = call["triage"]
+        elif source == "ai":
+            triage = await analyze_emergency_with_ai(call["transcript"])
+        else:
+            triage = fallback_analysis(call["transcript"])
+        triaged.append({**call, "triage": triage})
+    return triaged
+
+
+def execute(calls: List[Dict], router: PlanRouter) -> Dict:
+    """Run every call through its routed plan and the full crew; measured latency and service agreement"""
+    from agents.crew import route_call, run_decision
+
+    samples = []
+    for i, call in enumerate(calls):
+        call_data = {"transcript": call["transcript"], "location": {"address": "Unknown"},
+                     "triage": call["triage"], "timestamp": f"EVAL{i:04d}"}
+        decision = router.route(call["triage"], call["transcript"])
+        timed = {}
+        for name, chosen in (("routed", decision), ("full", route_call(call_data, "full"))):
+            print(f"  [{i + 1}/{len(calls)}] {name}: {chosen['plan']}", file=sys.stderr)
+            started = time.perf_counter()
+            result = run_decision(call_data, chosen)
+            sent = triage_services(call["triage"]) if chosen["plan"] == "local" else text_services(result.get("analysis", ""))
+            timed[name] = {"plan": chosen["plan"], "ms": (time.perf_counter() - started) * 1000, "services": sent}
+        samples.append({
+            "label": call["plan"],
+            "routed_plan": timed["routed"]["plan"],
+            "routed_ms": round(timed["routed"]["ms"], 1),
+            "full_ms": round(timed["full"]["ms"], 1),
+            "routed_recall": service_recall(call["services"], timed["routed"]["services"]),
+            "full_recall": service_recall(call["services"], timed["full"]["services"]),
+            "agrees_with_full": timed["routed"]["services"] == timed["full"]["services"],
+        })
+    n = len(samples)
+    plan_costs = {}
+    for plan in PLANS:
+        runs = [s["routed_ms"] for s in samples if s["routed_plan"] == plan]
+        if plan == "full":
+            runs += [s["full_ms"] for s in samples]
+        if runs:
+            plan_costs[plan] = round(sum(runs) / len(runs), 1)
+    routed_ms, full_ms = sum(s["routed_ms"] for s in samples), sum(s["full_ms"] for s in samples)
+    return {
+        "latency_ms": {"routed_total": round(routed_ms, 1), "full_total": round(full_ms, 1),
+                       "saved_pct": round(100 * (1 - routed_ms / full_ms), 1) if full_ms else 0.0},
+        "service_recall": {"routed": round(sum(s["routed_recall"] for s in samples) / n, 3),
+                           "full": round(sum(s["full_recall"] for s in samples) / n, 3)},
+        "agreement_with_full": round(sum(s["agrees_with_full"] for s in samples) / n, 3),
+        "plan_costs_ms": plan_costs,
+        "samples": samples,
+    }
+
+
+def load_calls(path: Optional[str]) -> Dict[str, List[Dict]]:
+    if not path:
+        return {"tuning": LABELLED_CALLS, "held_out": HELD_OUT_CALLS}
+    with open(path) as f:
+        return {"calls": [json.loads(line) for line in f if line.strip()]}
+
+
+def print_row(name: str, report: Dict):
+    latency = report["latency_ms"]
+    print(f"{name:<22}{report['accuracy']:>9.2f}{report['under_routed']:>8.2f}{report['under_routed_critical']:>8}"
+          f"{report['over_routed']:>8.2f}{latency['saved_pct']:>9.1f}%  "
+          + " ".join(f"{plan}={count}" for plan, count in report["plans"].items()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency saved vs decision quality of the crew plan router")
+    parser.add_argument("--triage", choices=["local", "ai"], default="local")
+    parser.add_argument("--calls", help="JSONL of {transcript, plan, services[, triage]} instead of the built-in set")
+    parser.add_argument("--plan-costs", help="JSON of per-plan latency in ms (default: built-in estimates)")
+    parser.add_argument("--sweep", action="store_true", help="Also evaluate thresholds shifted by -2..+2")
+    parser.add_argument("--execute", action="store_true", help="Run the crews and measure real latency and agreement")
+    parser.add_argument("--output", help="Write the results as JSON")
+    args = parser.parse_args()
+
+    costs = dict(DEFAULT_PLAN_COST_MS)
+    if args.plan_costs:
+        with open(args.plan_costs) as f:
+            costs.update(json.load(f))
+
+    results = {"triage": args.triage, "plan_costs_ms": costs, "sets": {}}
+    print(f"{'router':<22}{'accuracy':>9}{'under':>8}{'crit<':>8}{'over':>8}{'saved':>10}  plans")
+    for name, labelled in load_calls(args.calls).items():
+        calls = asyncio.run(triage_calls(labelled, args.triage))
+        report = {"calls": len(calls), "adaptive": evaluate(calls, PlanRouter(adaptive=True), costs)}
+        if args.sweep:
+            report["sweep"] = {
+                shift: evaluate(calls, PlanRouter({k: v + shift for k, v in DEFAULT_THRESHOLDS.items()}, adaptive=True),
+                                costs)
+                for shift in range(-2, 3) if shift
+            }
+        results["sets"][name] = report
+
+        print(f"-- {name} ({len(calls)} calls)")
+        print_row("adaptive", report["adaptive"])
+        for shift, row in report.get("sweep", {}).items():
+            print_row(f"thresholds {shift:+d}", row)
+    print(f"(latency saved estimated from plan costs {costs})")
+
+    if args.execute:
+        # The last set: held_out, or the --calls set
+        results["executed"] = execute(calls, PlanRouter(adaptive=True))
+        executed = results["executed"]
+        print(f"measured on {name}: saved {executed['latency_ms']['saved_pct']}% "
+              f"({executed['latency_ms']['routed_total']:.0f} vs {executed['latency_ms']['full_total']:.0f} ms), "
+              f"service recall routed {executed['service_recall']['routed']:.2f} / full {executed['service_recall']['full']:.2f}, "
+              f"agreement with full {executed['agreement_with_full']:.2f}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2, default=sorted)
+
+
+if __name__ == "__main__":
+    main()
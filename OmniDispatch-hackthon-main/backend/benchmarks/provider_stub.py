@@ -0,0 +1,360 @@
+"""
+OmniDispatch Provider Stand-in Server
+=====================================
+A single ASGI app that mimics the provider endpoints the backend calls:
+
+    POST /v1/chat/completions                  Cerebras (and Groq via /openai/v1), incl. "stream": true
+    GET  /maps/api/place/nearbysearch/json     Google Places
+    GET  /maps/api/geocode/json                Google Geocoding
+    POST /v1/text-to-speech/{voice_id}         ElevenLabs
+
+Point the backend at it (any non-empty API keys work):
+    CEREBRAS_BASE_URL=http://localhost:9000/v1
+    GROQ_BASE_URL=http://localhost:9000/openai/v1
+    GOOGLE_MAPS_BASE_URL=http://localhost:9000/maps/api
+    ELEVENLABS_BASE_URL=http://localhost:9000/v1
+
+Latency and failures are injected per endpoint group (chat, places, geocode, tts)
+from STUB_* environment variables or at runtime via POST /_stub/config:
+    STUB_LATENCY_DIST     constant | uniform | normal | lognormal   (default lognormal)
+    STUB_LATENCY_MS       median latency in ms                      (default 150)
+    STUB_LATENCY_SPREAD   jitter in ms (uniform/normal) or sigma (lognormal)
+    STUB_ERROR_RATE       fraction of requests answered with HTTP 500
+    STUB_RATE_LIMIT_RATE  fraction of requests answered with HTTP 429
+    STUB_TIMEOUT_RATE     fraction of requests that hang for STUB_TIMEOUT_S
+    STUB_TOKENS_PER_S     streaming generation speed                (default 400)
+    STUB_SEED             seed for reproducible runs
+
+Run: python -m benchmarks.provider_stub --port 9000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+import uuid
+from typing import Dict, List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+
+ENDPOINT_GROUPS = ["chat", "places", "geocode", "tts"]
+
+
+def _env_float(name: str, default: float) -> float:
+    return float(os.getenv(name, default))
+
+
+def default_profile() -> Dict:
+    """Fault/latency profile read from STUB_* environment variables"""
+    dist = os.getenv("STUB_LATENCY_DIST", "lognormal")
+    return {
+        "latency_dist": dist,
+        "latency_ms": _env_float("STUB_LATENCY_MS", 150),
+        "latency_spread": _env_float("STUB_LATENCY_SPREAD", 0.5 if dist == "lognormal" else 50),
+        "error_rate": _env_float("STUB_ERROR_RATE", 0.0),
+        "rate_limit_rate": _env_float("STUB_RATE_LIMIT_RATE", 0.0),
+        "timeout_rate": _env_float("STUB_TIMEOUT_RATE", 0.0),
+        "timeout_s": _env_float("STUB_TIMEOUT_S", 60.0),
+        "tokens_per_s": _env_float("STUB_TOKENS_PER_S", 400),
+    }
+
+
+class FaultInjector:
+    """Per-endpoint-group latency distributions and failure rates"""
+
+    def __init__(self, seed: Optional[int] = None):
+        self.random = random.Random(seed)
+        self.profiles: Dict[str, Dict] = {group: default_profile() for group in ENDPOINT_GROUPS}
+        self.stats: Dict[str, Dict[str, int]] = {
+            group: {"requests": 0, "errors": 0, "rate_limited": 0, "timeouts": 0} for group in ENDPOINT_GROUPS
+        }
+
+    def configure(self, group: Optional[str], updates: Dict):
+        groups = ENDPOINT_GROUPS if group in (None, "default") else [group]
+        for name in groups:
+            self.profiles[name].update(updates)
+
+    def sample_latency(self, group: str) -> float:
+        """Latency in seconds drawn from the group's distribution"""
+        profile = self.profiles[group]
+        median = profile["latency_ms"]
+        spread = profile["latency_spread"]
+        dist = profile["latency_dist"]
+        if dist == "constant":
+            ms = median
+        elif dist == "uniform":
+            ms = self.random.uniform(median - spread, median + spread)
+        elif dist == "normal":
+            ms = self.random.gauss(median, spread)
+        else:
+            ms = median * self.random.lognormvariate(0, spread)
+        return max(ms, 0.0) / 1000
+
+    async def inject(self, group: str) -> Optional[Response]:
+        """Sleep for the sampled latency; return a failure response if one is drawn"""
+        profile = self.profiles[group]
+        stats = self.stats[group]
+        stats["requests"] += 1
+        roll = self.random.random()
+
+        if roll < profile["timeout_rate"]:
+            stats["timeouts"] += 1
+            await asyncio.sleep(profile["timeout_s"])
+            return JSONResponse({"error": {"message": "upstream timeout"}}, status_code=504)
+        roll -= profile["timeout_rate"]
+
+        await asyncio.sleep(self.sample_latency(group))
+
+        if roll < profile["rate_limit_rate"]:
+            stats["rate_limited"] += 1
+            return JSONResponse(
+                {"error": {"message": "Rate limit exceeded", "type": "rate_limit_error"}},
+                status_code=429,
+                headers={"Retry-After": "1"},
+            )
+        roll -= profile["rate_limit_rate"]
+
+        if roll < profile["error_rate"]:
+            stats["errors"] += 1
+            return JSONResponse({"error": {"message": "Internal server error"}}, status_code=500)
+        return None
+
+
+# ============================================================================
+# CANNED CONTENT
+# ============================================================================
+
+TRIAGE_KEYWORDS = [
+    ("fire", ["fire", "smoke", "burning", "flames"], (True, True, False), "critical"),
+    ("disaster", ["flood", "water", "earthquake", "storm"], (True, True, False), "critical"),
+    ("crime", ["intruder", "robbery", "gun", "broke into", "attack"], (False, False, True), "high"),
+    ("accident", ["crash", "accident", "collision", "car"], (False, True, True), "high"),
+    ("medical", ["breathing", "collapsed", "unconscious", "bleeding", "pain", "hurt"], (False, True, False), "high"),
+]
+
+
+def triage_content(transcript: str) -> str:
+    text = transcript.lower()
+    emergency_type, needs, priority = "medical", (False, True, True), "medium"
+    for name, words, requires, level in TRIAGE_KEYWORDS:
+        if any(word in text for word in words):
+            emergency_type, needs, priority = name, requires, level
+            break
+    return json.dumps({
+        "emergency_type": emergency_type,
+        "priority": priority,
+        "description": f"Reported {emergency_type} emergency requiring response",
+        "requires_fire": needs[0],
+        "requires_medical": needs[1],
+        "requires_police": needs[2],
+        "number_of_victims": 1,
+        "immediate_danger": priority == "critical",
+        "special_equipment": [],
+        "caller_reassurance": "Help is on the way. Stay calm and stay on the line with me.",
+    })
+
+
+def risk_content(lat: float, lng: float) -> str:
+    return json.dumps({
+        "location_name": f"Stub Region {lat:.2f}, {lng:.2f}",
+        "country": "Stubland",
+        "coordinates_analyzed": f"{lat}, {lng}",
+        "overall_risk_level": "medium",
+        "risk_score": 55,
+        "risk_score_explanation": "Synthetic assessment produced by the provider stand-in server.",
+        "primary_threats": ["Flooding", "Earthquake", "Heat Wave"],
+        "risk_zones": [
+            {"name": "Stub River Basin", "lat": lat + 0.1, "lng": lng + 0.1, "risk_score": 62,
+             "primary_risk": "Flooding", "incidents_24h": 2, "explanation": "Low-lying flood plain."},
+            {"name": "Stub Ridge", "lat": lat - 0.1, "lng": lng - 0.1, "risk_score": 48,
+             "primary_risk": "Landslide", "incidents_24h": 0, "explanation": "Steep unstable slopes."},
+        ],
+        "historical_patterns": [
+            {"pattern": "Seasonal Flooding", "confidence": 80, "description": "Annual wet-season floods.",
+             "recommendation": "Clear drainage before the wet season."},
+        ],
+        "immediate_concerns": ["Seasonal rainfall"],
+        "prediction_next_24h": "Stable conditions expected",
+        "prediction_next_week": "Moderate rainfall possible",
+        "preparedness_score": 60,
+        "recommended_actions": ["Maintain emergency kits", "Monitor weather alerts"],
+        "weather_correlation": {"temperature": "24°C", "humidity": "60%", "current_risk": "+5%",
+                                "factor": "Seasonal rainfall"},
+        "ai_reasoning": "Stand-in response; no real analysis was performed.",
+    })
+
+
+def _extract_coordinates(text: str) -> List[float]:
+    """Pull the first lat/lng pair mentioned in a prompt (best effort)"""
+    numbers = []
+    for token in text.replace(",", " ").replace("°N", " ").replace("°E", " ").split():
+        try:
+            numbers.append(float(token))
+        except ValueError:
+            continue
+        if len(numbers) == 2:
+            return numbers
+    return [0.0, 0.0]
+
+
+def chat_content(messages: List[Dict]) -> str:
+    """Pick a plausible completion based on which backend prompt is calling"""
+    system = next((m.get("content", "") for m in messages if m.get("role") == "system"), "")
+    user = next((m.get("content", "") for m in reversed(messages) if m.get("role") == "user"), "")
+    if "ORACLE" in system:
+        lat, lng = _extract_coordinates(user.split("COORDINATES:", 1)[-1])
+        return risk_content(lat, lng)
+    if "emergency_type" in system:
+        return triage_content(user)
+    if "ATLAS" in system:
+        return "LOCATION IDENTIFICATION: Stub Region. Moderate seismic activity, river flood plain, monsoon climate."
+    if "CHRONICLE" in system:
+        return "MAJOR HISTORICAL DISASTERS: 2019 flood, 2005 earthquake. Flood season peaks July-September."
+    return "Stay calm and move to a safe place. Help is on the way - tell me what you can see right now."
+
+
+def _usage(messages: List[Dict], content: str) -> Dict:
+    prompt_tokens = sum(len(m.get("content", "")) for m in messages) // 4
+    completion_tokens = len(content) // 4
+    return {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens}
+
+
+# ============================================================================
+# APP
+# ============================================================================
+
+def create_app(seed: Optional[int] = None) -> FastAPI:
+    env_seed = os.getenv("STUB_SEED")
+    injector = FaultInjector(seed if seed is not None else (int(env_seed) if env_seed else None))
+    app = FastAPI(title="OmniDispatch Provider Stand-in")
+    app.state.injector = injector
+
+    async def chat_completions(request: Request):
+        failure = await injector.inject("chat")
+        if failure is not None:
+            return failure
+        body = await request.json()
+        messages = body.get("messages", [])
+        model = body.get("model", "stub-model")
+        content = chat_content(messages)
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        created = int(time.time())
+
+        if not body.get("stream"):
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content},
+                             "finish_reason": "stop"}],
+                "usage": _usage(messages, content),
+            }
+
+        tokens_per_s = max(injector.profiles["chat"]["tokens_per_s"], 1.0)
+
+        async def event_stream():
+            # ~4 characters per token, emitted a few tokens at a time
+            chunk_chars = 16
+            for i in range(0, len(content), chunk_chars):
+                await asyncio.sleep(chunk_chars / 4 / tokens_per_s)
+                chunk = {
+                    "id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                    "choices": [{"index": 0, "delta": {"content": content[i:i + chunk_chars]}, "finish_reason": None}],
+                }
+                yield f"data: {json.dumps(chunk)}\n\n"
+            final = {
+                "id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+                "usage": _usage(messages, content),
+            }
+            yield f"data: {json.dumps(final)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+    app.add_api_route("/v1/chat/completions", chat_completions, methods=["POST"])
+    app.add_api_route("/openai/v1/chat/completions", chat_completions, methods=["POST"])
+
+    @app.get("/maps/api/place/nearbysearch/json")
+    async def nearby_search(location: str, type: str = "hospital", radius: int = 5000, key: str = ""):
+        failure = await injector.inject("places")
+        if failure is not None:
+            return failure
+        lat, lng = (float(v) for v in location.split(","))
+        rng = random.Random(f"{location}:{type}")
+        results = []
+        for i in range(5):
+            results.append({
+                "place_id": f"stub-{type}-{i}-{uuid.uuid4().hex[:8]}",
+                "name": f"Stub {type.replace('_', ' ').title()} {i + 1}",
+                "vicinity": f"{100 + i} Stub Street",
+                "geometry": {"location": {"lat": lat + rng.uniform(-0.03, 0.03),
+                                          "lng": lng + rng.uniform(-0.03, 0.03)}},
+                "rating": round(rng.uniform(3.0, 5.0), 1),
+                "opening_hours": {"open_now": True},
+                "types": [type],
+            })
+        return {"status": "OK", "results": results, "html_attributions": []}
+
+    @app.get("/maps/api/geocode/json")
+    async def geocode(address: str = "", key: str = ""):
+        failure = await injector.inject("geocode")
+        if failure is not None:
+            return failure
+        if not address.strip():
+            return {"status": "ZERO_RESULTS", "results": []}
+        rng = random.Random(address.lower())
+        return {
+            "status": "OK",
+            "results": [{
+                "formatted_address": f"{address.strip().title()}, Stubland",
+                "geometry": {"location": {"lat": rng.uniform(-60, 70), "lng": rng.uniform(-180, 180)},
+                             "location_type": "APPROXIMATE"},
+                "place_id": f"stub-geo-{uuid.uuid4().hex[:8]}",
+            }],
+        }
+
+    @app.post("/v1/text-to-speech/{voice_id}")
+    async def text_to_speech(voice_id: str, request: Request):
+        failure = await injector.inject("tts")
+        if failure is not None:
+            return failure
+        body = await request.json()
+        # Roughly the size of a 128 kbps MP3 at ~15 characters per second of speech
+        size = max(len(body.get("text", "")) * 1100, 1024)
+        return Response(content=b"\xff\xfb\x90\x00" + os.urandom(size - 4), media_type="audio/mpeg")
+
+    @app.get("/_stub/config")
+    async def get_config():
+        return {"profiles": injector.profiles, "stats": injector.stats}
+
+    @app.post("/_stub/config")
+    async def set_config(request: Request):
+        """Body: {"group": "chat"|"places"|"geocode"|"tts"|"default", ...profile fields}"""
+        body = await request.json()
+        group = body.pop("group", "default")
+        if group not in ENDPOINT_GROUPS and group != "default":
+            return JSONResponse({"error": f"unknown group {group}"}, status_code=400)
+        injector.configure(group, body)
+        return {"profiles": injector.profiles}
+
+    return app
+
+
+app = create_app()
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="OmniDispatch provider stand-in server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    args = parser.parse_args()
+    print(f"🧪 Provider stand-in listening on http://{args.host}:{args.port}")
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
@@ -3,10 +3,11 @@
 # AI-Powered Emergency Dispatch System
 # Features: ElevenLabs TTS, CrewAI Agents, Google Places API, Real-time Updates
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Request, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Awaitable, Callable, Tuple, Union
 import uvicorn
 import os
 import json
@@ -16,11 +17,36 @@ from datetime import datetime
 import random
 import base64
 import math
+import time
+from collections import OrderedDict
 from dotenv import load_dotenv
+from services.metrics import registry, HTTP_DURATION, HTTP_IN_FLIGHT, WEBSOCKET_CLIENTS
+from services.log import get_logger
+from services.admission import AdmissionController, DEGRADED
+from services.router import ProviderRouter
+from services.scheduler import LLMScheduler, priority_for
+from services.memory import ConversationMemory, estimate_tokens, relevant_survival_knowledge
+from services.chronos_cache import ChronosCache, STALE
+from services.jobs import JobManager, JobQueueFull, ProgressCallback
+from services.risk_grid import GridSpec, RiskGridBatch, RiskGridStore
+from services.json_stream import IncrementalJSONParser, parse_json_lenient
+from services.regions import load_region_index
+from services.risk_zones import load_risk_zones
+from services.incident_stats import IncidentStats, zone_cell, cell_center
+from services.plan_router import PLANS as CREW_PLANS
+from services.rag import knowledge_base, KnowledgeBaseNotReady
+from services.tracing import trace_span, traced, record_provider_result, request_trace, current_trace, summarize_trace
 
 # Load environment variables
 load_dotenv()
 
+log = get_logger("api")
+jarvis_log = get_logger("jarvis")
+triage_log = get_logger("triage")
+dispatch_log = get_logger("dispatch")
+chronos_log = get_logger("chronos")
+guardian_log = get_logger("guardian")
+
 app = FastAPI(
     title="OmniDispatch API",
     description="Wafer-Scale Emergency Intelligence Backend - Powered by CrewAI + Cerebras",
@@ -36,6 +62,25 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def track_request_metrics(request: Request, call_next):
+    """Record latency and in-flight counts per route and collect stage spans"""
+    started = time.perf_counter()
+    HTTP_IN_FLIGHT.inc()
+    try:
+        with request_trace():
+            response = await call_next(request)
+    finally:
+        HTTP_IN_FLIGHT.dec()
+        route = request.scope.get("route")
+        HTTP_DURATION.observe(
+            time.perf_counter() - started,
+            method=request.method,
+            route=getattr(route, "path", "unmatched")
+        )
+    response.headers.setdefault("X-Service-Mode", admission.mode)
+    return response
+
 # ============================================================================
 # CONFIGURATION - Using your .env keys
 # ============================================================================
@@ -46,32 +91,74 @@ GROQ_API_KEY = os.getenv("GROQ_API_KEY", "")
 CEREBRAS_API_KEY = os.getenv("CEREBRAS_API_KEY", "")
 GOOGLE_MAPS_API_KEY = os.getenv("NEXT_PUBLIC_GOOGLE_MAPS_API_KEY", "")
 
-print(f"🔑 ElevenLabs API: {'✅ Configured' if ELEVENLABS_API_KEY else '❌ Missing'}")
-print(f"🔑 Groq API: {'✅ Configured' if GROQ_API_KEY else '❌ Missing'}")
-print(f"🔑 Cerebras API: {'✅ Configured' if CEREBRAS_API_KEY else '❌ Missing'}")
-print(f"🔑 Google Maps API: {'✅ Configured' if GOOGLE_MAPS_API_KEY else '❌ Missing'}")
+# Provider base URLs - override to point the backend at benchmarks/provider_stub.py
+CEREBRAS_BASE_URL = os.getenv("CEREBRAS_BASE_URL", "https://api.cerebras.ai/v1").rstrip("/")
+GROQ_BASE_URL = os.getenv("GROQ_BASE_URL", "https://api.groq.com/openai/v1").rstrip("/")
+GOOGLE_MAPS_BASE_URL = os.getenv("GOOGLE_MAPS_BASE_URL", "https://maps.googleapis.com/maps/api").rstrip("/")
+ELEVENLABS_BASE_URL = os.getenv("ELEVENLABS_BASE_URL", "https://api.elevenlabs.io/v1").rstrip("/")
+
+LLM_PROVIDERS = {
+    "cerebras": {"base_url": CEREBRAS_BASE_URL, "api_key": CEREBRAS_API_KEY},
+    "groq": {"base_url": GROQ_BASE_URL, "api_key": GROQ_API_KEY},
+}
+LLM_MODELS = {"cerebras": "llama-3.3-70b", "groq": "llama-3.3-70b-versatile"}
+
+# Picks the fastest healthy provider per call instead of always trying Cerebras first
+provider_router = ProviderRouter(list(LLM_PROVIDERS))
+# Live-call triage and JARVIS go ahead of Chronos and background work for provider capacity
+llm_scheduler = LLMScheduler(list(LLM_PROVIDERS))
+# Switches new calls to local-only degraded mode when live calls pile up or slow down
+admission = AdmissionController()
+
+log.info("provider keys", extra={
+    "elevenlabs": bool(ELEVENLABS_API_KEY),
+    "groq": bool(GROQ_API_KEY),
+    "cerebras": bool(CEREBRAS_API_KEY),
+    "google_maps": bool(GOOGLE_MAPS_API_KEY),
+})
 
 # ============================================================================
 # IN-MEMORY STATE
 # ============================================================================
 
 active_incidents: List[Dict] = []
+# Rolling 1h/24h/7d incident counts (overall, per type, priority and zone cell); outlives /api/incidents/clear
+incident_stats = IncidentStats()
 connected_clients: List[WebSocket] = []
+WEBSOCKET_CLIENTS.set_function(lambda: len(connected_clients))
 
 # Default responders - will be regenerated based on user location
 active_responders: List[Dict] = []
 
-# Conversation history for JARVIS-like contextual responses
-conversation_history: List[Dict] = []
-current_emergency_context: Dict = {}
-units_already_dispatched: bool = False
-
-def reset_conversation():
+# Conversation state per call: JARVIS memory (see summarize_conversation), emergency context and
+# whether units were sent. The frontend sends no call_id and uses the default session.
+DEFAULT_CALL_ID = "default"
+CALL_SESSIONS_MAX = int(os.getenv("CALL_SESSIONS_MAX", "256"))
+
+class CallSession:
+    def __init__(self):
+        self.memory = ConversationMemory(summarizer=summarize_conversation)
+        self.emergency_context: Dict = {}
+        self.units_dispatched = False
+
+call_sessions: "OrderedDict[str, CallSession]" = OrderedDict()
+
+def call_session(call_id: Optional[str] = None) -> CallSession:
+    """The session for a call, created on first use; the least recently used call is dropped when full"""
+    call_id = call_id or DEFAULT_CALL_ID
+    session = call_sessions.get(call_id)
+    if session is None:
+        session = call_sessions[call_id] = CallSession()
+        while len(call_sessions) > CALL_SESSIONS_MAX:
+            call_sessions.popitem(last=False)[1].memory.reset()
+    call_sessions.move_to_end(call_id)
+    return session
+
+def reset_conversation(call_id: Optional[str] = None):
     """Reset conversation state for new call"""
-    global conversation_history, current_emergency_context, units_already_dispatched
-    conversation_history = []
-    current_emergency_context = {}
-    units_already_dispatched = False
+    session = call_sessions.pop(call_id or DEFAULT_CALL_ID, None)
+    if session is not None:
+        session.memory.reset()
 
 def generate_responders_near_location(lat: float, lng: float) -> List[Dict]:
     """Generate dynamic responders near the user's actual location"""
@@ -113,6 +200,7 @@ class EmergencyCall(BaseModel):
     transcript: str
     caller_location: Optional[Dict] = None
     caller_phone: Optional[str] = None
+    call_id: Optional[str] = None  # separate conversation state per call; omitted by the single-caller UI
 
 class TextToSpeechRequest(BaseModel):
     text: str
@@ -140,6 +228,175 @@ def calculate_distance(lat1: float, lng1: float, lat2: float, lng2: float) -> fl
     
     return R * c
 
+async def post_chat_completion(client: httpx.AsyncClient, provider: str, purpose: str, **kwargs) -> httpx.Response:
+    """POST to a provider's /chat/completions endpoint inside an llm tracing span"""
+    config = LLM_PROVIDERS[provider]
+    with trace_span("llm", provider=provider, purpose=purpose) as span:
+        try:
+            response = await client.post(
+                f"{config['base_url']}/chat/completions",
+                headers={
+                    "Authorization": f"Bearer {config['api_key']}",
+                    "Content-Type": "application/json"
+                },
+                **kwargs
+            )
+        except Exception as e:
+            record_provider_result(provider, error=type(e).__name__)
+            raise
+        record_provider_result(provider, response.status_code)
+        if response.status_code != 200:
+            span.fail(f"http_{response.status_code}")
+        return response
+
+FieldsCallback = Callable[[Dict], Awaitable[None]]
+
+async def stream_chat_completion(client: httpx.AsyncClient, provider: str, purpose: str,
+                                 on_fields: FieldsCallback, **kwargs) -> Tuple[httpx.Response, str]:
+    """
+    Streamed /chat/completions: feeds deltas to an IncrementalJSONParser and awaits
+    on_fields with the fields parsed so far whenever another top-level field completes.
+    Returns (response, full content); content is empty for non-200 responses.
+    """
+    config = LLM_PROVIDERS[provider]
+    kwargs["json"] = {**kwargs["json"], "stream": True}
+    with trace_span("llm", provider=provider, purpose=purpose, streamed=True) as span:
+        try:
+            async with client.stream(
+                "POST",
+                f"{config['base_url']}/chat/completions",
+                headers={
+                    "Authorization": f"Bearer {config['api_key']}",
+                    "Content-Type": "application/json"
+                },
+                **kwargs
+            ) as response:
+                if response.status_code != 200:
+                    await response.aread()
+                    record_provider_result(provider, response.status_code)
+                    span.fail(f"http_{response.status_code}")
+                    return response, ""
+                parser = IncrementalJSONParser()
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[5:].strip()
+                    if data == "[DONE]":
+                        break
+                    choices = json.loads(data).get("choices") or [{}]
+                    delta = choices[0].get("delta", {}).get("content")
+                    if delta and parser.feed(delta):
+                        if "first_field_ms" not in span.attributes:
+                            span.set(first_field_ms=round((time.perf_counter() - span.started) * 1000, 1))
+                        try:
+                            await on_fields(dict(parser.fields))
+                        except Exception:
+                            # A consumer bug must not be charged to the provider
+                            log.exception("streamed field handler failed", extra={"purpose": purpose})
+        except Exception as e:
+            record_provider_result(provider, error=type(e).__name__)
+            raise
+        record_provider_result(provider, response.status_code)
+        return response, parser.buffer
+
+def _retry_after_seconds(response: httpx.Response) -> Optional[float]:
+    try:
+        return float(response.headers.get("retry-after", ""))
+    except ValueError:
+        return None
+
+async def complete_chat(
+    purpose: str,
+    messages: Union[List[Dict], Callable[[str], List[Dict]]],
+    temperature: float,
+    max_tokens: int,
+    timeout: float = 15.0,
+    client: Optional[httpx.AsyncClient] = None,
+    models: Dict[str, str] = LLM_MODELS,
+    parse: Optional[Callable[[str], Any]] = None,
+    on_fields: Optional[FieldsCallback] = None,
+) -> Optional[Tuple[str, Any]]:
+    """
+    Chat completion on the best provider the router allows, falling back through the rest.
+    Each attempt waits for a provider slot from llm_scheduler at the purpose's priority.
+    messages may be a function of the provider name; parse failures also fall back.
+    With on_fields the reply is streamed and its JSON fields reported as they complete.
+    Returns (provider, content or parsed content), or None if every provider failed.
+    """
+    candidates = [p for p in models if LLM_PROVIDERS[p]["api_key"]]
+    order = provider_router.order(candidates, purpose)
+    priority = priority_for(purpose)
+    if not order:
+        return None
+    owns_client = client is None
+    client = client or httpx.AsyncClient()
+    try:
+        for attempt, provider in enumerate(order):
+            if attempt:
+                provider_router.note_fallback(purpose, provider)
+            provider_messages = messages(provider) if callable(messages) else messages
+            cost = estimate_tokens(json.dumps(provider_messages)) + max_tokens
+            started = time.perf_counter()
+            try:
+                async with llm_scheduler.slot(provider, priority, cost, timeout=timeout):
+                    started = time.perf_counter()
+                    request = {
+                        "model": models[provider],
+                        "messages": provider_messages,
+                        "temperature": temperature,
+                        "max_tokens": max_tokens
+                    }
+                    if on_fields is None:
+                        response = await post_chat_completion(client, provider, purpose, json=request, timeout=timeout)
+                    else:
+                        response, streamed = await stream_chat_completion(
+                            client, provider, purpose, on_fields, json=request, timeout=timeout
+                        )
+            except asyncio.TimeoutError:
+                # Queued behind higher-priority work for too long; the provider itself is fine
+                provider_router.release(provider)
+                log.warning("llm slot wait timed out", extra={"provider": provider, "purpose": purpose})
+                continue
+            except asyncio.CancelledError:
+                provider_router.release(provider)
+                raise
+            except Exception as e:
+                provider_router.record_failure(provider, time.perf_counter() - started)
+                log.warning("llm provider error", extra={"provider": provider, "purpose": purpose, "error": str(e)})
+                continue
+            elapsed = time.perf_counter() - started
+            if response.status_code != 200:
+                provider_router.record_failure(provider, elapsed, response.status_code, _retry_after_seconds(response))
+                log.warning("llm provider failed", extra={
+                    "provider": provider, "purpose": purpose, "status": response.status_code
+                })
+                continue
+            provider_router.record_success(provider, elapsed)
+            content = (streamed if on_fields else response.json()["choices"][0]["message"]["content"]).strip()
+            if parse is None:
+                return provider, content
+            try:
+                return provider, parse(content)
+            except (ValueError, KeyError) as e:
+                log.warning("llm response unparseable", extra={"provider": provider, "purpose": purpose, "error": str(e)})
+    finally:
+        if owns_client:
+            await client.aclose()
+    return None
+
+async def get_google_maps(client: httpx.AsyncClient, path: str, stage: str, **kwargs) -> httpx.Response:
+    """GET a Google Maps web service endpoint inside a tracing span"""
+    with trace_span(stage, provider="google_maps") as span:
+        try:
+            response = await client.get(f"{GOOGLE_MAPS_BASE_URL}/{path}", **kwargs)
+        except Exception as e:
+            record_provider_result("google_maps", error=type(e).__name__)
+            raise
+        record_provider_result("google_maps", response.status_code)
+        if response.status_code != 200:
+            span.fail(f"http_{response.status_code}")
+        return response
+
 def calculate_eta(distance_km: float, responder_type: str) -> int:
     """Calculate ETA in minutes based on distance and responder type"""
     speeds = {"fire": 50, "medical": 60, "police": 70}
@@ -148,19 +405,42 @@ def calculate_eta(distance_km: float, responder_type: str) -> int:
     eta_minutes = max(1, int(eta_hours * 60))
     return min(eta_minutes, 15)
 
+async def summarize_conversation(previous_summary: str, turns: List[Dict]) -> str:
+    """Fold older JARVIS turns into a short running summary (runs in the background)"""
+    transcript = "\n".join(f"{t['role'].upper()}: {t['content']}" for t in turns)
+    prompt = f"""Update the running summary of an emergency call. Keep every fact a dispatcher needs:
+location details, injuries, hazards, people involved, and advice already given. Max 80 words.
+
+CURRENT SUMMARY: {previous_summary or 'none'}
+
+NEW TURNS:
+{transcript}"""
+    result = await complete_chat(
+        "memory_summary", [{"role": "user", "content": prompt}],
+        temperature=0.2, max_tokens=150, timeout=10.0,
+        models={"cerebras": "llama3.1-8b", "groq": "llama-3.1-8b-instant"}
+    )
+    return result[1] if result else ""
+
 # ============================================================================
 # JARVIS-LIKE CONVERSATIONAL AI
 # ============================================================================
 
-async def get_jarvis_response(transcript: str, emergency_context: Dict, is_first_message: bool) -> str:
+@traced("jarvis")
+async def get_jarvis_response(transcript: str, emergency_context: Dict, is_first_message: bool,
+                              degraded: bool = False, memory: Optional[ConversationMemory] = None) -> str:
     """
     JARVIS-like AI that provides dynamic, contextual survival advice.
     This is the brain of the emergency assistant - it actually HELPS, not just dispatches.
     """
-    global conversation_history
-    
-    # Add user message to history
-    conversation_history.append({"role": "user", "content": transcript})
+    conversation_memory = memory or call_session().memory
+    conversation_memory.add("user", transcript)
+    if degraded:
+        # Overloaded: answer locally instead of queueing behind slow providers
+        ai_response = get_smart_fallback_response(transcript, emergency_context)
+        conversation_memory.add("assistant", ai_response)
+        return ai_response
+    survival_knowledge = relevant_survival_knowledge(emergency_context.get("emergency_type"), transcript)
     
     # Build context about the emergency
     context_summary = ""
@@ -196,102 +476,19 @@ CRITICAL RULES:
 
 SURVIVAL KNOWLEDGE YOU MUST USE:
 
-FOR FLOODS:
-- Move to highest floor/point immediately
-- If water is rising in room: find furniture/objects to climb on
-- Look for any drainage (holes, windows) to reduce water
-- If trapped: signal from window, use flashlight/phone light
-- Don't touch electrical outlets if wet
-- If must enter water: remove heavy clothing, hold something buoyant
-
-FOR FIRES:
-- Stay low - smoke rises, cleaner air is near floor
-- Feel doors before opening - if hot, find another exit
-- Cover mouth with wet cloth if available
-- If clothes catch fire: STOP, DROP, ROLL
-- Close doors behind you to slow fire spread
-- If trapped: seal door cracks, signal from window
-
-FOR MEDICAL:
-- Keep patient still and calm
-- Apply pressure to bleeding wounds
-- For choking: back blows then abdominal thrusts
-- For unconscious: check breathing, recovery position
-- For chest pain: have them chew aspirin if available, sit upright
-
-FOR CRIMES:
-- Stay hidden and quiet if intruder present
-- Lock/barricade if possible
-- Note descriptions: height, clothing, direction of travel
-- Don't confront armed individuals
-
-FOR ACCIDENTS:
-- Don't move injured unless in immediate danger
-- Turn off vehicle ignition if possible
-- Direct traffic away if safe to do so
-- Check for breathing and consciousness
+{survival_knowledge}
 
 RESPOND TO THE CALLER'S LATEST MESSAGE. Be their lifeline."""
-
-    try:
-        # Use Cerebras for ultra-fast response
-        if CEREBRAS_API_KEY:
-            async with httpx.AsyncClient() as client:
-                messages = [{"role": "system", "content": system_prompt}]
-                # Include last 6 conversation turns for context
-                messages.extend(conversation_history[-6:])
-                
-                response = await client.post(
-                    "https://api.cerebras.ai/v1/chat/completions",
-                    headers={
-                        "Authorization": f"Bearer {CEREBRAS_API_KEY}",
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "model": "llama-3.3-70b",
-                        "messages": messages,
-                        "temperature": 0.7,
-                        "max_tokens": 200
-                    },
-                    timeout=15.0
-                )
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    ai_response = result["choices"][0]["message"]["content"].strip()
-                    conversation_history.append({"role": "assistant", "content": ai_response})
-                    print(f"🤖 JARVIS: {ai_response}")
-                    return ai_response
-        
-        # Fallback to Groq
-        if GROQ_API_KEY:
-            async with httpx.AsyncClient() as client:
-                messages = [{"role": "system", "content": system_prompt}]
-                messages.extend(conversation_history[-6:])
-                
-                response = await client.post(
-                    "https://api.groq.com/openai/v1/chat/completions",
-                    headers={
-                        "Authorization": f"Bearer {GROQ_API_KEY}",
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "model": "llama-3.3-70b-versatile",
-                        "messages": messages,
-                        "temperature": 0.7,
-                        "max_tokens": 200
-                    },
-                    timeout=15.0
-                )
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    ai_response = result["choices"][0]["message"]["content"].strip()
-                    conversation_history.append({"role": "assistant", "content": ai_response})
-                    return ai_response
-                    
-    except Exception as e:
-        print(f"❌ JARVIS error: {e}")
+    # Recent turns within the token budget; older ones live in the rolling summary
+    messages = conversation_memory.build_messages(system_prompt)
+
+    result = await complete_chat("jarvis", messages, temperature=0.7, max_tokens=200, timeout=15.0)
+    if result:
+        provider, ai_response = result
+        conversation_memory.add("assistant", ai_response)
+        conversation_memory.schedule_summary()
+        jarvis_log.debug("jarvis response", extra={"provider": provider, "response": ai_response})
+        return ai_response
     
     # Smart fallback based on keywords
     return get_smart_fallback_response(transcript, emergency_context)
@@ -361,34 +558,37 @@ async def health_check():
         "elevenlabs": "connected" if ELEVENLABS_API_KEY else "missing_key",
         "groq": "connected" if GROQ_API_KEY else "missing_key",
         "google_places": "connected" if GOOGLE_MAPS_API_KEY else "missing_key",
+        "llm_providers": provider_router.snapshot(),
+        "llm_scheduler": llm_scheduler.snapshot(),
+        "admission": admission.snapshot(),
+        "chronos_cache": chronos_cache.stats(),
+        "risk_grid": risk_grid_status(),
+        "knowledge_base": knowledge_base.status(),
         "active_incidents": len(active_incidents),
         "available_responders": len([r for r in active_responders if r["status"] == "available"])
     }
 
+@app.get("/metrics")
+async def metrics():
+    """Prometheus scrape endpoint"""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+def shed_when_degraded(request: Request):
+    """Dependency for non-critical endpoints: 503 + Retry-After while live calls are degraded"""
+    if not admission.allow_noncritical(request.url.path):
+        raise HTTPException(
+            status_code=503,
+            detail="Service degraded - capacity reserved for live emergency calls",
+            headers={"Retry-After": str(admission.retry_after_s())}
+        )
+
 # ============================================================================
 # AI EMERGENCY ANALYSIS (Cerebras LLama 3.3 - Ultra Fast!)
 # ============================================================================
 
-async def analyze_emergency_with_ai(transcript: str) -> Dict:
-    """Use Cerebras AI for ultra-fast emergency analysis with CrewAI-style prompting"""
-    
-    # Try Cerebras first (much faster), fall back to Groq
-    if CEREBRAS_API_KEY:
-        print("🧠 Using Cerebras AI for ultra-fast analysis...")
-        try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    "https://api.cerebras.ai/v1/chat/completions",
-                    headers={
-                        "Authorization": f"Bearer {CEREBRAS_API_KEY}",
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "model": "llama-3.3-70b",
-                        "messages": [
-                            {
-                                "role": "system",
-                                "content": """You are an elite 911 Emergency Dispatch AI. Analyze calls instantly and respond with ONLY valid JSON (no markdown):
+# Cerebras gets the terse prompt (fastest); Groq keeps the fuller CrewAI-style one
+TRIAGE_SYSTEM_PROMPTS = {
+    "cerebras": """You are an elite 911 Emergency Dispatch AI. Analyze calls instantly and respond with ONLY valid JSON (no markdown):
 {
     "emergency_type": "fire|medical|crime|accident|disaster",
     "priority": "critical|high|medium|low",
@@ -400,55 +600,8 @@ async def analyze_emergency_with_ai(transcript: str) -> Dict:
     "immediate_danger": true/false,
     "special_equipment": [],
     "caller_reassurance": "A calm 1-sentence reassurance"
-}"""
-                            },
-                            {
-                                "role": "user",
-                                "content": f"EMERGENCY: \"{transcript}\""
-                            }
-                        ],
-                        "temperature": 0.1,
-                        "max_tokens": 400
-                    },
-                    timeout=10.0
-                )
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    content = result["choices"][0]["message"]["content"]
-                    content = content.strip()
-                    if content.startswith("```"):
-                        content = content.split("```")[1]
-                        if content.startswith("json"):
-                            content = content[4:]
-                    content = content.strip()
-                    parsed = json.loads(content)
-                    print(f"⚡ Cerebras Analysis: {parsed['emergency_type']} - {parsed['priority']} (ultra-fast)")
-                    return parsed
-                else:
-                    print(f"❌ Cerebras error: {response.status_code}, falling back to Groq")
-        except Exception as e:
-            print(f"❌ Cerebras error: {e}, falling back to Groq")
-    
-    # Fallback to Groq if Cerebras fails
-    if not GROQ_API_KEY:
-        print("⚠️ No AI API keys set, using fallback analysis")
-        return fallback_analysis(transcript)
-    
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                "https://api.groq.com/openai/v1/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {GROQ_API_KEY}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": "llama-3.3-70b-versatile",
-                    "messages": [
-                        {
-                            "role": "system",
-                            "content": """You are an elite 911 Emergency Dispatch AI powered by CrewAI technology. 
+}""",
+    "groq": """You are an elite 911 Emergency Dispatch AI powered by CrewAI technology. 
 You have three specialized capabilities working together:
 
 1. EMPATHETIC INTAKE: Understand distressed callers, extract critical information
@@ -469,39 +622,46 @@ Analyze the emergency call and respond with ONLY valid JSON (no markdown, no exp
     "caller_reassurance": "A calm, professional 1-2 sentence reassurance for the caller"
 }
 
-Be accurate. Lives depend on your classification."""
-                        },
-                        {
-                            "role": "user",
-                            "content": f"EMERGENCY CALL TRANSCRIPT: \"{transcript}\""
-                        }
-                    ],
-                    "temperature": 0.2,
-                    "max_tokens": 500
-                },
-                timeout=15.0
-            )
-            
-            if response.status_code == 200:
-                result = response.json()
-                content = result["choices"][0]["message"]["content"]
-                content = content.strip()
-                if content.startswith("```"):
-                    content = content.split("```")[1]
-                    if content.startswith("json"):
-                        content = content[4:]
-                content = content.strip()
-                parsed = json.loads(content)
-                print(f"✅ AI Analysis: {parsed['emergency_type']} - {parsed['priority']}")
-                return parsed
-            else:
-                print(f"❌ Groq API error: {response.status_code}")
-    except json.JSONDecodeError as e:
-        print(f"❌ JSON parse error: {e}")
-    except Exception as e:
-        print(f"❌ AI analysis error: {e}")
+Be accurate. Lives depend on your classification.""",
+}
+
+def parse_llm_json(content: str) -> Dict:
+    """Parse a JSON object from an LLM reply, repairing fences, prose, stray commas and truncation"""
+    return parse_json_lenient(content)
+
+def parse_triage(content: str) -> Dict:
+    parsed = parse_llm_json(content)
+    # Dispatch and the call response read all of these; a repaired, truncated reply that lacks any
+    # of them falls through to the next provider (and finally to fallback_analysis)
+    missing = {"emergency_type", "priority", "description", "immediate_danger"} | DISPATCH_FIELDS
+    missing -= set(parsed)
+    if missing:
+        raise KeyError(f"triage reply missing {sorted(missing)}")
+    return parsed
+
+@traced("analysis")
+async def analyze_emergency_with_ai(transcript: str, on_fields: Optional[FieldsCallback] = None) -> Dict:
+    """
+    Fast emergency analysis on whichever provider the router currently rates best.
+    on_fields streams the reply and receives the triage fields parsed so far as they arrive.
+    """
+    result = await complete_chat(
+        "triage",
+        lambda provider: [
+            {"role": "system", "content": TRIAGE_SYSTEM_PROMPTS[provider]},
+            {"role": "user", "content": f"EMERGENCY CALL TRANSCRIPT: \"{transcript}\""}
+        ],
+        temperature=0.1, max_tokens=500, timeout=10.0, parse=parse_triage, on_fields=on_fields
+    )
+    if result is None:
+        triage_log.info("no AI provider available, using fallback analysis")
+        return fallback_analysis(transcript)
     
-    return fallback_analysis(transcript)
+    provider, parsed = result
+    triage_log.info("triage complete", extra={
+        "provider": provider, "emergency_type": parsed["emergency_type"], "priority": parsed["priority"]
+    })
+    return parsed
 
 def fallback_analysis(transcript: str) -> Dict:
     """Smart fallback when AI is unavailable - keyword-based analysis with varied responses"""
@@ -614,10 +774,11 @@ def fallback_analysis(transcript: str) -> Dict:
 # GOOGLE PLACES - NEARBY EMERGENCY SERVICES
 # ============================================================================
 
+@traced("nearby_services")
 async def search_nearby_services(lat: float, lng: float, emergency_type: str) -> List[Dict]:
     """Search for nearby emergency services using Google Places API"""
     if not GOOGLE_MAPS_API_KEY:
-        print("⚠️ Google Maps API key not set, using mock data")
+        dispatch_log.debug("google maps key not set, using mock nearby services")
         return get_mock_nearby_services(lat, lng, emergency_type)
     
     place_types = {
@@ -634,8 +795,8 @@ async def search_nearby_services(lat: float, lng: float, emergency_type: str) ->
     try:
         async with httpx.AsyncClient() as client:
             for place_type in types_to_search[:2]:
-                response = await client.get(
-                    "https://maps.googleapis.com/maps/api/place/nearbysearch/json",
+                response = await get_google_maps(
+                    client, "place/nearbysearch/json", "places",
                     params={
                         "location": f"{lat},{lng}",
                         "radius": 10000,
@@ -665,11 +826,11 @@ async def search_nearby_services(lat: float, lng: float, emergency_type: str) ->
                             })
         
         all_places.sort(key=lambda x: x["distance"])
-        print(f"✅ Found {len(all_places)} nearby services")
+        dispatch_log.debug("nearby services found", extra={"count": len(all_places)})
         return all_places[:6]
         
     except Exception as e:
-        print(f"❌ Google Places error: {e}")
+        dispatch_log.warning("google places error", extra={"error": str(e)})
         return get_mock_nearby_services(lat, lng, emergency_type)
 
 def get_mock_nearby_services(lat: float, lng: float, emergency_type: str) -> List[Dict]:
@@ -693,6 +854,10 @@ async def get_nearby_places(lat: float, lng: float, type: str = "medical"):
 # DISPATCH LOGIC
 # ============================================================================
 
+# Triage fields dispatch_units reads; once streamed in, units can roll before the reply finishes
+DISPATCH_FIELDS = {"requires_fire", "requires_medical", "requires_police"}
+UNIT_TYPE_FIELDS = {"fire": "requires_fire", "medical": "requires_medical", "police": "requires_police"}
+
 def dispatch_units(analysis: Dict, incident_location: Dict) -> List[Dict]:
     """Dispatch appropriate units based on emergency analysis with real calculations"""
     dispatched = []
@@ -738,19 +903,64 @@ def dispatch_units(analysis: Dict, incident_location: Dict) -> List[Dict]:
                 "lng": unit["lng"]
             })
             
-            print(f"📍 Dispatched {unit['unit']} - {distance:.1f}km away, ETA: {eta}min")
+            dispatch_log.debug("unit dispatched", extra={
+                "unit": unit["unit"], "distance_km": round(distance, 2), "eta_minutes": eta
+            })
     
     return dispatched
 
+def release_units(units: List[Dict]):
+    """Return dispatched units to available"""
+    ids = {u["id"] for u in units}
+    for r in active_responders:
+        if r["id"] in ids:
+            r["status"] = "available"
+            r.pop("destination", None)
+            r.pop("eta_minutes", None)
+
+def reconcile_dispatch(units: List[Dict], analysis: Dict, incident_location: Dict) -> List[Dict]:
+    """
+    Align units dispatched from a streamed partial triage with the final analysis (which can come
+    from a fallback provider): release unit types no longer required, dispatch newly required ones
+    """
+    kept = [u for u in units if analysis[UNIT_TYPE_FIELDS[u["type"]]]]
+    released = [u for u in units if not analysis[UNIT_TYPE_FIELDS[u["type"]]]]
+    release_units(released)
+    kept_types = {u["type"] for u in kept}
+    missing = {field: bool(analysis[field]) and unit_type not in kept_types
+               for unit_type, field in UNIT_TYPE_FIELDS.items()}
+    added = dispatch_units(missing, incident_location)
+    dispatch_log.info("early dispatch revised by final triage", extra={
+        "released": [u["unit"] for u in released], "added": [u["unit"] for u in added]
+    })
+    return kept + added
+
 # ============================================================================
 # ELEVENLABS TEXT-TO-SPEECH
 # ============================================================================
 
+# Recently synthesized phrases (fallback advice, sign-offs) - the only TTS served while degraded
+TTS_CACHE_SIZE = int(os.getenv("TTS_CACHE_SIZE", "256"))
+tts_cache: "OrderedDict[str, str]" = OrderedDict()
+
 @app.post("/api/voice/speak")
 async def text_to_speech(request: TextToSpeechRequest):
     """Convert text to speech using ElevenLabs API with your voice ID"""
+    cached_audio = tts_cache.get(request.text)
+    if cached_audio is not None:
+        tts_cache.move_to_end(request.text)
+        return {"success": True, "audio": cached_audio, "format": "audio/mpeg", "cached": True}
+    
+    if admission.mode == DEGRADED:
+        return {
+            "success": False,
+            "error": "TTS unavailable in degraded mode",
+            "text": request.text,
+            "service_mode": DEGRADED
+        }
+    
     if not ELEVENLABS_API_KEY:
-        print("⚠️ ElevenLabs API key not configured")
+        log.debug("elevenlabs key not configured")
         return {
             "success": False,
             "error": "ElevenLabs API key not configured",
@@ -759,28 +969,35 @@ async def text_to_speech(request: TextToSpeechRequest):
     
     try:
         async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"https://api.elevenlabs.io/v1/text-to-speech/{ELEVENLABS_VOICE_ID}",
-                headers={
-                    "xi-api-key": ELEVENLABS_API_KEY,
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "text": request.text,
-                    "model_id": "eleven_turbo_v2_5",
-                    "voice_settings": {
-                        "stability": 0.6,
-                        "similarity_boost": 0.8,
-                        "style": 0.3,
-                        "use_speaker_boost": True
-                    }
-                },
-                timeout=30.0
-            )
+            with trace_span("tts", provider="elevenlabs") as span:
+                response = await client.post(
+                    f"{ELEVENLABS_BASE_URL}/text-to-speech/{ELEVENLABS_VOICE_ID}",
+                    headers={
+                        "xi-api-key": ELEVENLABS_API_KEY,
+                        "Content-Type": "application/json"
+                    },
+                    json={
+                        "text": request.text,
+                        "model_id": "eleven_turbo_v2_5",
+                        "voice_settings": {
+                            "stability": 0.6,
+                            "similarity_boost": 0.8,
+                            "style": 0.3,
+                            "use_speaker_boost": True
+                        }
+                    },
+                    timeout=30.0
+                )
+                if response.status_code != 200:
+                    span.fail(f"http_{response.status_code}")
+            record_provider_result("elevenlabs", response.status_code)
             
             if response.status_code == 200:
                 audio_base64 = base64.b64encode(response.content).decode('utf-8')
-                print(f"✅ TTS generated: {len(request.text)} chars -> {len(response.content)} bytes audio")
+                tts_cache[request.text] = audio_base64
+                if len(tts_cache) > TTS_CACHE_SIZE:
+                    tts_cache.popitem(last=False)
+                log.debug("tts generated", extra={"chars": len(request.text), "bytes": len(response.content)})
                 return {
                     "success": True,
                     "audio": audio_base64,
@@ -788,7 +1005,7 @@ async def text_to_speech(request: TextToSpeechRequest):
                 }
             else:
                 error_msg = f"ElevenLabs error: {response.status_code}"
-                print(f"❌ {error_msg}")
+                log.warning("tts failed", extra={"status": response.status_code})
                 return {
                     "success": False,
                     "error": error_msg,
@@ -796,7 +1013,8 @@ async def text_to_speech(request: TextToSpeechRequest):
                 }
                 
     except Exception as e:
-        print(f"❌ TTS error: {e}")
+        record_provider_result("elevenlabs", error=type(e).__name__)
+        log.warning("tts error", extra={"error": str(e)})
         return {
             "success": False,
             "error": str(e),
@@ -818,62 +1036,102 @@ async def process_emergency_full(call: EmergencyCall):
     JARVIS-powered emergency processing.
     - First message: Analyze, dispatch, and give initial survival advice
     - Follow-up messages: Pure JARVIS conversation with contextual help
+    Under overload the call is served in degraded mode (local triage and advice, no Places).
     """
-    global current_emergency_context, units_already_dispatched
+    async with admission.live_call() as service_mode:
+        result = await handle_emergency_message(call, degraded=service_mode == DEGRADED)
+    result["service_mode"] = service_mode
+    return result
+
+async def handle_emergency_message(call: EmergencyCall, degraded: bool) -> Dict:
+    """Run one caller message through analysis, dispatch and JARVIS"""
+    session = call_session(call.call_id)
     
     incident_location = call.caller_location or {"lat": 17.385, "lng": 78.4867, "address": "Unknown Location"}
     
-    print(f"\n{'='*60}")
-    print(f"🚨 INCOMING MESSAGE")
-    print(f"📝 Transcript: {call.transcript}")
-    print(f"📍 Location: {incident_location}")
-    print(f"🔄 Units Dispatched: {units_already_dispatched}")
-    print(f"{'='*60}\n")
+    log.debug("incoming message", extra={
+        "transcript": call.transcript,
+        "location": incident_location,
+        "call_id": call.call_id,
+        "units_dispatched": session.units_dispatched
+    })
     
     # Check if this is a conversation-ending phrase
     transcript_lower = call.transcript.lower()
     ending_phrases = ["thank", "thanks", "bye", "goodbye", "stop", "that's all", "thats all", "end call", "hang up"]
     if any(phrase in transcript_lower for phrase in ending_phrases):
-        print("👋 Conversation ending detected")
-        response_message = await get_jarvis_response(call.transcript, current_emergency_context, False)
+        response_message = await get_jarvis_response(call.transcript, session.emergency_context, False, degraded, session.memory)
         return {
             "success": True,
             "message": response_message,
             "is_ending": True,
             "dispatched_units": [],
-            "nearby_services": []
+            "nearby_services": [],
+            "stage_timings_ms": summarize_trace(current_trace())
         }
     
     # If units not yet dispatched, this is the first emergency report - do full analysis
-    if not units_already_dispatched:
-        print("🆕 First message - Full emergency analysis and dispatch")
-        
+    if not session.units_dispatched:
         # Generate responders near the caller's actual location
         generate_responders_near_location(incident_location["lat"], incident_location["lng"])
         
-        # Analyze the emergency
-        print("🧠 Running JARVIS AI Analysis...")
-        analysis = await analyze_emergency_with_ai(call.transcript)
+        # Dispatch and the Places search start mid-generation, as soon as the streamed
+        # triage fields they depend on are complete
+        early: Dict[str, Any] = {}
+        
+        async def on_triage_fields(fields: Dict):
+            if "places" not in early and isinstance(fields.get("emergency_type"), str):
+                early["places_type"] = fields["emergency_type"]
+                early["places"] = asyncio.create_task(search_nearby_services(
+                    incident_location["lat"], incident_location["lng"], fields["emergency_type"]
+                ))
+            if "units" not in early and DISPATCH_FIELDS <= fields.keys():
+                early["fields"] = {k: bool(fields[k]) for k in DISPATCH_FIELDS}
+                with trace_span("dispatch", early=True) as span:
+                    early["units"] = dispatch_units(fields, incident_location)
+                    span.set(units=len(early["units"]))
+        
+        # Analyze the emergency (keyword triage when degraded - dispatch must not wait on providers)
+        analysis = fallback_analysis(call.transcript) if degraded else await analyze_emergency_with_ai(
+            call.transcript, on_fields=on_triage_fields
+        )
         
         incident_id = f"INC-{datetime.now().strftime('%Y%m%d%H%M%S')}-{random.randint(100, 999)}"
         
-        # Dispatch units
-        print("🚒 Dispatching Nearest Units...")
-        dispatched_units = dispatch_units(analysis, incident_location)
+        # Dispatch units; units committed mid-stream are revised if the final triage disagrees
+        # (the streaming provider's reply failed to parse and another provider answered)
+        if "units" in early:
+            dispatched_units = early["units"]
+            if early["fields"] != {k: bool(analysis[k]) for k in DISPATCH_FIELDS}:
+                with trace_span("dispatch", revised=True) as span:
+                    dispatched_units = reconcile_dispatch(dispatched_units, analysis, incident_location)
+                    span.set(units=len(dispatched_units))
+        else:
+            with trace_span("dispatch") as span:
+                dispatched_units = dispatch_units(analysis, incident_location)
+                span.set(units=len(dispatched_units))
         
-        # Find nearby services
-        print("📍 Searching Nearby Services...")
-        nearby_services = await search_nearby_services(
-            incident_location["lat"],
-            incident_location["lng"],
-            analysis["emergency_type"]
-        )
+        # Find nearby services (enrichment only - skipped when degraded)
+        places_task = early.get("places")
+        if places_task is not None and early["places_type"] != analysis["emergency_type"]:
+            places_task.cancel()
+            places_task = None
+        if degraded:
+            nearby_services = []
+        elif places_task is not None:
+            nearby_services = await places_task
+        else:
+            nearby_services = await search_nearby_services(
+                incident_location["lat"],
+                incident_location["lng"],
+                analysis["emergency_type"]
+            )
         
         min_eta = min([u["eta_minutes"] for u in dispatched_units]) if dispatched_units else 5
         units_list = ', '.join([u['unit'] for u in dispatched_units]) if dispatched_units else "emergency services"
         
         # Store context for follow-up conversations
-        current_emergency_context = {
+        session.emergency_context = {
             "emergency_type": analysis["emergency_type"],
             "priority": analysis["priority"],
             "description": analysis["description"],
@@ -898,25 +1156,26 @@ async def process_emergency_full(call: EmergencyCall):
             "analysis": analysis
         }
         active_incidents.append(incident)
+        record_incident_stats(incident)
         
         await broadcast_update({"type": "new_incident", "incident": incident})
         await broadcast_update({"type": "responder_update", "responders": active_responders})
         
-        units_already_dispatched = True
+        session.units_dispatched = True
         
         # Get JARVIS response for first message (includes dispatch info + survival advice)
         # Build a smart first response
-        print("🤖 Getting JARVIS initial response...")
-        jarvis_advice = await get_jarvis_response(call.transcript, current_emergency_context, True)
+        jarvis_advice = await get_jarvis_response(call.transcript, session.emergency_context, True, degraded, session.memory)
         
         # Combine dispatch info with JARVIS advice
         response_message = f"{units_list} dispatched to your location, ETA {min_eta} minutes. {jarvis_advice}"
         
-        print(f"\n✅ INCIDENT {incident_id} CREATED")
-        print(f"   Type: {analysis['emergency_type']} | Priority: {analysis['priority']}")
-        print(f"   Units Dispatched: {len(dispatched_units)}")
-        print(f"   JARVIS Advice: {jarvis_advice[:100]}...")
-        print(f"{'='*60}\n")
+        log.info("incident created", extra={
+            "incident_id": incident_id,
+            "emergency_type": analysis["emergency_type"],
+            "priority": analysis["priority"],
+            "units_dispatched": len(dispatched_units)
+        })
         
         return {
             "success": True,
@@ -934,29 +1193,27 @@ async def process_emergency_full(call: EmergencyCall):
                 "requires_medical": analysis["requires_medical"],
                 "requires_police": analysis["requires_police"],
                 "immediate_danger": analysis["immediate_danger"]
-            }
+            },
+            "stage_timings_ms": summarize_trace(current_trace())
         }
     
     else:
         # Follow-up message - pure JARVIS conversation
-        print("💬 Follow-up message - JARVIS conversational response")
-        
-        response_message = await get_jarvis_response(call.transcript, current_emergency_context, False)
-        
-        print(f"🤖 JARVIS Response: {response_message}")
+        response_message = await get_jarvis_response(call.transcript, session.emergency_context, False, degraded, session.memory)
         
         return {
             "success": True,
             "message": response_message,
             "is_followup": True,
             "dispatched_units": [],
-            "nearby_services": []
+            "nearby_services": [],
+            "stage_timings_ms": summarize_trace(current_trace())
         }
 
 @app.post("/api/call/reset")
-async def reset_call():
+async def reset_call(call_id: Optional[str] = None):
     """Reset conversation state for new call"""
-    reset_conversation()
+    reset_conversation(call_id)
     return {"success": True, "message": "Conversation reset"}
 
 # ============================================================================
@@ -967,6 +1224,35 @@ async def reset_call():
 async def get_incidents():
     return {"incidents": active_incidents}
 
+def record_incident_stats(incident: Dict):
+    location = incident["location"]
+    cell = zone_cell(location["lat"], location["lng"], zone_dataset.cell_deg)
+    incident_stats.record(["all", f"type:{incident['type']}", f"priority:{incident['priority']}", f"cell:{cell}"])
+
+@app.get("/api/incidents/stats")
+async def get_incident_stats(window: str = "24h", lat: Optional[float] = None, lng: Optional[float] = None):
+    """Incident counts over the last 1h/24h/7d, broken down by type, priority and zone cell"""
+    if window not in incident_stats.window_names:
+        raise HTTPException(status_code=400, detail=f"window must be one of {incident_stats.window_names}")
+    top_cells = incident_stats.breakdown("cell:", window, limit=20)
+    result = {
+        "success": True,
+        "window": window,
+        "bucket_s": incident_stats.bucket_s,
+        "totals": incident_stats.windows("all"),
+        "by_type": incident_stats.breakdown("type:", window),
+        "by_priority": incident_stats.breakdown("priority:", window),
+        "hotspots": [
+            {"lat": center[0], "lng": center[1], "cell_deg": zone_dataset.cell_deg, "incidents": count}
+            for cell, count in top_cells.items()
+            for center in [cell_center(cell, zone_dataset.cell_deg)]
+        ],
+        "timeline": incident_stats.timeline("all", window),
+    }
+    if lat is not None and lng is not None:
+        result["area"] = incident_stats.windows(f"cell:{zone_cell(lat, lng, zone_dataset.cell_deg)}")
+    return result
+
 @app.get("/api/responders")
 async def get_responders():
     return {"responders": active_responders}
@@ -980,7 +1266,7 @@ async def init_responders_location(request: InitLocationRequest):
     """Initialize responders near the user's actual location"""
     responders = generate_responders_near_location(request.lat, request.lng)
     await broadcast_update({"type": "responder_update", "responders": responders})
-    print(f"📍 Initialized {len(responders)} responders near ({request.lat}, {request.lng})")
+    dispatch_log.info("responders initialized", extra={"count": len(responders), "lat": request.lat, "lng": request.lng})
     return {"success": True, "responders": responders}
 
 # ============================================================================
@@ -993,146 +1279,15 @@ class ChronosLocationRequest(BaseModel):
     country: Optional[str] = None
     region: Optional[str] = None
 
-# Historical disaster data by region (real patterns)
-DISASTER_PATTERNS = {
-    "japan": {
-        "country": "Japan",
-        "flag": "🇯🇵",
-        "risk_zones": [
-            {"name": "Tokyo-Kanto Region", "lat": 35.6762, "lng": 139.6503, "risk_score": 92, "primary_risk": "Earthquake", "incidents_24h": 3},
-            {"name": "Osaka-Kobe Region", "lat": 34.6937, "lng": 135.5023, "risk_score": 85, "primary_risk": "Tsunami", "incidents_24h": 1},
-            {"name": "Tohoku Coast", "lat": 38.2682, "lng": 140.8694, "risk_score": 88, "primary_risk": "Earthquake/Tsunami", "incidents_24h": 2},
-        ],
-        "historical_patterns": [
-            {"pattern": "Pacific Ring Seismic Activity", "confidence": 96, "description": "Japan experiences ~1500 earthquakes annually due to its location on multiple tectonic plates", "recommendation": "Maintain earthquake-ready infrastructure and early warning systems"},
-            {"pattern": "Seasonal Typhoon Corridor", "confidence": 91, "description": "Peak typhoon activity August-October, affecting primarily southern islands", "recommendation": "Pre-position emergency resources during typhoon season"},
-            {"pattern": "Volcanic Cluster Activity", "confidence": 87, "description": "110 active volcanoes with increased activity correlating with seismic events", "recommendation": "Monitor volcanic activity around Mt. Fuji and Sakurajima"},
-        ],
-        "incidents_history": [
-            {"date": "2024-01-01", "type": "Earthquake", "magnitude": "M5.7", "location": "Noto Peninsula", "casualties": 200},
-            {"date": "2023-10-05", "type": "Typhoon", "name": "Koinu", "location": "Okinawa", "casualties": 3},
-            {"date": "2022-03-16", "type": "Earthquake", "magnitude": "M7.4", "location": "Fukushima", "casualties": 4},
-        ],
-        "weather_correlation": {"current_risk": "+18%", "factor": "Seasonal seismic pattern", "temperature": "8°C"},
-    },
-    "india": {
-        "country": "India",
-        "flag": "🇮🇳",
-        "risk_zones": [
-            {"name": "Hyderabad Metro", "lat": 17.385, "lng": 78.4867, "risk_score": 45, "primary_risk": "Urban Flooding", "incidents_24h": 2},
-            {"name": "Gujarat Coast", "lat": 22.2587, "lng": 71.1924, "risk_score": 78, "primary_risk": "Cyclone/Earthquake", "incidents_24h": 1},
-            {"name": "Himalayan Foothills", "lat": 30.0668, "lng": 79.0193, "risk_score": 82, "primary_risk": "Landslide", "incidents_24h": 0},
-            {"name": "Chennai Coast", "lat": 13.0827, "lng": 80.2707, "risk_score": 68, "primary_risk": "Cyclone/Flooding", "incidents_24h": 1},
-        ],
-        "historical_patterns": [
-            {"pattern": "Monsoon Flood Correlation", "confidence": 94, "description": "Urban flooding increases 340% during June-September monsoon season", "recommendation": "Deploy water pumps and rescue boats pre-monsoon"},
-            {"pattern": "Himalayan Seismic Belt", "confidence": 89, "description": "Northern India lies on major fault lines with periodic seismic activity", "recommendation": "Strengthen building codes in Zone V regions"},
-            {"pattern": "Coastal Cyclone Seasonality", "confidence": 92, "description": "Bay of Bengal cyclones peak in October-November affecting eastern coast", "recommendation": "Establish coastal evacuation corridors"},
-        ],
-        "incidents_history": [
-            {"date": "2024-12-15", "type": "Urban Flood", "location": "Hyderabad", "affected": 5000, "casualties": 2},
-            {"date": "2024-10-25", "type": "Cyclone", "name": "Dana", "location": "Odisha Coast", "casualties": 8},
-            {"date": "2023-02-06", "type": "Earthquake", "magnitude": "M4.2", "location": "Delhi NCR", "casualties": 0},
-        ],
-        "weather_correlation": {"current_risk": "+12%", "factor": "Post-monsoon residual moisture", "temperature": "26°C"},
-    },
-    "usa": {
-        "country": "United States",
-        "flag": "🇺🇸",
-        "risk_zones": [
-            {"name": "California Fault Lines", "lat": 34.0522, "lng": -118.2437, "risk_score": 85, "primary_risk": "Earthquake/Wildfire", "incidents_24h": 5},
-            {"name": "Florida Peninsula", "lat": 27.6648, "lng": -81.5158, "risk_score": 88, "primary_risk": "Hurricane", "incidents_24h": 2},
-            {"name": "Tornado Alley", "lat": 35.4676, "lng": -97.5164, "risk_score": 76, "primary_risk": "Tornado", "incidents_24h": 3},
-            {"name": "Pacific Northwest", "lat": 47.6062, "lng": -122.3321, "risk_score": 72, "primary_risk": "Earthquake/Volcano", "incidents_24h": 1},
-        ],
-        "historical_patterns": [
-            {"pattern": "San Andreas Stress Accumulation", "confidence": 88, "description": "Overdue major seismic event with micro-quakes increasing 15% annually", "recommendation": "Prepare for potential M7.0+ event in Southern California"},
-            {"pattern": "Hurricane Intensification Trend", "confidence": 93, "description": "Category 4-5 hurricanes increasing due to warmer Gulf waters", "recommendation": "Strengthen coastal infrastructure and evacuation plans"},
-            {"pattern": "Wildfire Season Extension", "confidence": 95, "description": "Fire season now 78 days longer than 1970s average", "recommendation": "Year-round fire prevention and early detection systems"},
-        ],
-        "incidents_history": [
-            {"date": "2024-11-12", "type": "Wildfire", "name": "Mountain Fire", "location": "California", "acres": 20000},
-            {"date": "2024-10-09", "type": "Hurricane", "name": "Milton", "location": "Florida", "casualties": 24},
-            {"date": "2024-05-21", "type": "Tornado", "name": "EF4", "location": "Oklahoma", "casualties": 18},
-        ],
-        "weather_correlation": {"current_risk": "+22%", "factor": "La Niña conditions active", "temperature": "12°C"},
-    },
-    "indonesia": {
-        "country": "Indonesia",
-        "flag": "🇮🇩",
-        "risk_zones": [
-            {"name": "Java Volcanic Belt", "lat": -7.7956, "lng": 110.3695, "risk_score": 90, "primary_risk": "Volcano/Earthquake", "incidents_24h": 4},
-            {"name": "Sumatra Fault", "lat": 0.7893, "lng": 101.7068, "risk_score": 88, "primary_risk": "Earthquake/Tsunami", "incidents_24h": 2},
-            {"name": "Sulawesi Region", "lat": -1.4305, "lng": 121.4450, "risk_score": 82, "primary_risk": "Earthquake", "incidents_24h": 1},
-        ],
-        "historical_patterns": [
-            {"pattern": "Ring of Fire Volatility", "confidence": 97, "description": "Located on most active volcanic arc with 127 active volcanoes", "recommendation": "Continuous volcanic monitoring and evacuation readiness"},
-            {"pattern": "Megathrust Earthquake Cycle", "confidence": 91, "description": "Sunda megathrust capable of M9.0+ events every 200-500 years", "recommendation": "Tsunami early warning and coastal setback zones"},
-            {"pattern": "Monsoon Landslide Season", "confidence": 88, "description": "Landslides increase 400% during November-March wet season", "recommendation": "Hillside community relocations and early warning"},
-        ],
-        "incidents_history": [
-            {"date": "2024-12-03", "type": "Volcano", "name": "Semeru Eruption", "location": "East Java", "evacuated": 15000},
-            {"date": "2024-08-18", "type": "Earthquake", "magnitude": "M6.2", "location": "Sulawesi", "casualties": 12},
-            {"date": "2023-12-02", "type": "Volcano", "name": "Marapi Eruption", "location": "West Sumatra", "casualties": 23},
-        ],
-        "weather_correlation": {"current_risk": "+25%", "factor": "Active monsoon season", "temperature": "29°C"},
-    },
-    "default": {
-        "country": "Global",
-        "flag": "🌍",
-        "risk_zones": [
-            {"name": "Local Urban Area", "lat": 0, "lng": 0, "risk_score": 35, "primary_risk": "General Emergency", "incidents_24h": 1},
-        ],
-        "historical_patterns": [
-            {"pattern": "Urban Infrastructure Stress", "confidence": 75, "description": "Standard urban emergency patterns observed", "recommendation": "Maintain regular emergency response readiness"},
-            {"pattern": "Weather-Related Incidents", "confidence": 70, "description": "Seasonal weather affects incident frequency", "recommendation": "Monitor weather forecasts for emergency planning"},
-        ],
-        "incidents_history": [],
-        "weather_correlation": {"current_risk": "+5%", "factor": "Normal conditions", "temperature": "20°C"},
-    }
-}
+# Historical disaster data by region (real patterns): data/risk_zones.json plus any
+# RISK_ZONES_EXTRA files, compiled into memory-mapped columns with a spatial index
+zone_dataset = load_risk_zones()
 
-async def analyze_location_with_crewai(lat: float, lng: float) -> Dict:
-    """
-    Use CrewAI-style agents powered by Cerebras API for ultra-fast disaster risk analysis.
-    Cerebras provides incredibly fast inference for real-time analysis.
-    """
-    print(f"\n{'='*60}")
-    print(f"🔮 CHRONOS AI ANALYSIS - Powered by Cerebras")
-    print(f"{'='*60}")
-    print(f"📍 Coordinates: {lat}, {lng}")
-    
-    if not CEREBRAS_API_KEY:
-        print("❌ CEREBRAS_API_KEY not configured!")
-        return {
-            "success": False,
-            "error": "CEREBRAS_API_KEY not configured",
-            "overall_risk_level": "unknown",
-            "risk_score": 0,
-            "risk_score_explanation": "AI analysis unavailable - Cerebras API key missing"
-        }
-    
-    try:
-        async with httpx.AsyncClient(timeout=120.0) as client:
-            
-            # ================================================================
-            # AGENT 1: GEOSPATIAL ANALYST (Cerebras-powered)
-            # ================================================================
-            print("\n🌍 AGENT 1: Geospatial Analyst initializing...")
-            print("   └── Analyzing tectonic plates, fault lines, climate zones...")
-            
-            geo_response = await client.post(
-                "https://api.cerebras.ai/v1/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {CEREBRAS_API_KEY}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": "llama-3.3-70b",
-                    "messages": [
-                        {
-                            "role": "system",
-                            "content": """You are ATLAS, an elite Geospatial Risk Analyst AI with expertise in:
+# ============================================================================
+# CHRONOS AGENT PROMPTS
+# ============================================================================
+
+ATLAS_SYSTEM_PROMPT = """You are ATLAS, an elite Geospatial Risk Analyst AI with expertise in:
 - Tectonic plate boundaries and seismic activity
 - Volcanic regions and Ring of Fire analysis
 - Flood plains, river systems, and coastal vulnerability
@@ -1140,10 +1295,47 @@ async def analyze_location_with_crewai(lat: float, lng: float) -> Dict:
 - Topographical risk factors (mountains, valleys, deltas)
 
 Your analysis is precise, scientific, and actionable. Always identify the exact location first."""
-                        },
-                        {
-                            "role": "user",
-                            "content": f"""Perform comprehensive geospatial risk analysis for:
+
+CHRONICLE_SYSTEM_PROMPT = """You are CHRONICLE, an elite Historical Disaster Pattern Specialist with encyclopedic knowledge of:
+- Global disaster databases and historical records
+- Disaster frequency analysis and return periods
+- Seasonal and cyclical patterns in natural disasters
+- Climate change impacts on disaster trends
+- Regional vulnerability evolution over time
+
+Your analysis identifies patterns that help predict future risks."""
+
+RISK_SCORING_METHODOLOGY = """Your risk scoring methodology:
+- 90-100: CRITICAL - Imminent danger, evacuation may be needed
+- 70-89: HIGH - Significant risk, enhanced monitoring required  
+- 50-69: MEDIUM - Moderate risk, standard preparedness
+- 30-49: LOW - Minor risk, routine monitoring
+- 0-29: MINIMAL - Very low risk"""
+
+ORACLE_SYSTEM_PROMPT = f"""You are ORACLE, the Predictive Risk Assessment Coordinator. You synthesize geospatial and historical data into actionable intelligence.
+
+CRITICAL: You MUST respond with ONLY valid JSON. No markdown, no explanations outside JSON.
+
+{RISK_SCORING_METHODOLOGY}
+
+Generate comprehensive, specific, and actionable assessments."""
+
+FUSED_SYSTEM_PROMPT = f"""You are the CHRONOS disaster intelligence team working as one: ATLAS (geospatial risk analyst), CHRONICLE (historical disaster pattern specialist) and ORACLE (predictive risk assessment coordinator).
+
+Work through the roles in order before answering:
+1. ATLAS: identify the exact location, then its tectonic, volcanic, hydrological, climate and topographical hazards.
+2. CHRONICLE: recall the region's major historical disasters with dates, their frequency, seasonality and recent trend.
+3. ORACLE: synthesize both into the risk assessment.
+
+CRITICAL: You MUST respond with ONLY valid JSON. No markdown, no explanations outside JSON.
+
+{RISK_SCORING_METHODOLOGY}
+
+Generate comprehensive, specific, and actionable assessments."""
+
+
+def atlas_request(lat: float, lng: float) -> str:
+    return f"""Perform comprehensive geospatial risk analysis for:
 📍 COORDINATES: {lat}°N, {lng}°E
 
 ANALYZE:
@@ -1155,52 +1347,21 @@ ANALYZE:
 6. TOPOGRAPHICAL FACTORS: Elevation, landslide risk, soil stability?
 
 Provide detailed, factual geographical analysis."""
-                        }
-                    ],
-                    "temperature": 0.3,
-                    "max_tokens": 800
-                }
-            )
-            
-            if geo_response.status_code == 200:
-                geo_analysis = geo_response.json()["choices"][0]["message"]["content"]
-                print("   ✅ Geospatial analysis complete!")
-            else:
-                print(f"   ❌ Geo analysis failed: {geo_response.status_code}")
-                geo_analysis = f"Location at coordinates {lat}, {lng}"
-            
-            # ================================================================
-            # AGENT 2: HISTORICAL DISASTER RESEARCHER (Cerebras-powered)
-            # ================================================================
-            print("\n📚 AGENT 2: Historical Researcher initializing...")
-            print("   └── Researching disaster history, patterns, cycles...")
-            
-            hist_response = await client.post(
-                "https://api.cerebras.ai/v1/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {CEREBRAS_API_KEY}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": "llama-3.3-70b",
-                    "messages": [
-                        {
-                            "role": "system",
-                            "content": """You are CHRONICLE, an elite Historical Disaster Pattern Specialist with encyclopedic knowledge of:
-- Global disaster databases and historical records
-- Disaster frequency analysis and return periods
-- Seasonal and cyclical patterns in natural disasters
-- Climate change impacts on disaster trends
-- Regional vulnerability evolution over time
 
-Your analysis identifies patterns that help predict future risks."""
-                        },
-                        {
-                            "role": "user",
-                            "content": f"""Research disaster history for the region identified in this geospatial analysis:
+
+def chronicle_request(lat: float, lng: float, geo_analysis: Optional[str] = None) -> str:
+    """CHRONICLE's task, grounded in ATLAS's output or (parallel mode) the coordinates alone"""
+    if geo_analysis is None:
+        context = f"""Research disaster history for the region at these coordinates:
+
+📍 COORDINATES: {lat}°N, {lng}°E
+First identify the country and city/region, then research it."""
+    else:
+        context = f"""Research disaster history for the region identified in this geospatial analysis:
 
 GEOSPATIAL CONTEXT:
-{geo_analysis[:1200]}
+{geo_analysis[:1200]}"""
+    return f"""{context}
 
 RESEARCH REQUIREMENTS:
 1. MAJOR HISTORICAL DISASTERS: List significant events with dates, magnitudes, casualties
@@ -1211,70 +1372,11 @@ RESEARCH REQUIREMENTS:
 6. WARNING SIGNS: Any current indicators of impending events?
 
 Be specific with dates, statistics, and event names."""
-                        }
-                    ],
-                    "temperature": 0.3,
-                    "max_tokens": 900
-                }
-            )
-            
-            if hist_response.status_code == 200:
-                hist_analysis = hist_response.json()["choices"][0]["message"]["content"]
-                print("   ✅ Historical research complete!")
-            else:
-                print(f"   ❌ Historical analysis failed: {hist_response.status_code}")
-                hist_analysis = "Historical data analysis pending"
-            
-            # ================================================================
-            # AGENT 3: PREDICTIVE RISK ASSESSOR (Cerebras-powered)
-            # ================================================================
-            print("\n🎯 AGENT 3: Predictive Risk Assessor initializing...")
-            print("   └── Synthesizing data, calculating risk scores...")
-            
-            pred_response = await client.post(
-                "https://api.cerebras.ai/v1/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {CEREBRAS_API_KEY}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": "llama-3.3-70b",
-                    "messages": [
-                        {
-                            "role": "system",
-                            "content": """You are ORACLE, the Predictive Risk Assessment Coordinator. You synthesize geospatial and historical data into actionable intelligence.
-
-CRITICAL: You MUST respond with ONLY valid JSON. No markdown, no explanations outside JSON.
-
-Your risk scoring methodology:
-- 90-100: CRITICAL - Imminent danger, evacuation may be needed
-- 70-89: HIGH - Significant risk, enhanced monitoring required  
-- 50-69: MEDIUM - Moderate risk, standard preparedness
-- 30-49: LOW - Minor risk, routine monitoring
-- 0-29: MINIMAL - Very low risk
-
-Generate comprehensive, specific, and actionable assessments."""
-                        },
-                        {
-                            "role": "user",
-                            "content": f"""SYNTHESIZE AND GENERATE RISK ASSESSMENT
-
-📍 COORDINATES: {lat}, {lng}
-
-═══════════════════════════════════════
-GEOSPATIAL INTELLIGENCE (ATLAS):
-═══════════════════════════════════════
-{geo_analysis[:1500]}
 
-═══════════════════════════════════════
-HISTORICAL INTELLIGENCE (CHRONICLE):
-═══════════════════════════════════════
-{hist_analysis[:1500]}
 
-═══════════════════════════════════════
-GENERATE JSON RESPONSE:
-═══════════════════════════════════════
-{{
+def risk_assessment_schema(lat: float, lng: float) -> str:
+    """The JSON shape ORACLE (or the fused call) must return"""
+    return f"""{{
     "location_name": "Specific city/region name",
     "country": "Country name",
     "coordinates_analyzed": "{lat}, {lng}",
@@ -1343,40 +1445,163 @@ GENERATE JSON RESPONSE:
         "factor": "Specific weather factor affecting risk"
     }},
     "ai_reasoning": "Comprehensive 3-4 sentence summary of the analysis methodology and key findings that led to this assessment"
-}}
+}}"""
+
+
+def oracle_request(lat: float, lng: float, geo_analysis: str, hist_analysis: str) -> str:
+    return f"""SYNTHESIZE AND GENERATE RISK ASSESSMENT
+
+📍 COORDINATES: {lat}, {lng}
+
+═══════════════════════════════════════
+GEOSPATIAL INTELLIGENCE (ATLAS):
+═══════════════════════════════════════
+{geo_analysis[:1500]}
+
+═══════════════════════════════════════
+HISTORICAL INTELLIGENCE (CHRONICLE):
+═══════════════════════════════════════
+{hist_analysis[:1500]}
+
+═══════════════════════════════════════
+GENERATE JSON RESPONSE:
+═══════════════════════════════════════
+{risk_assessment_schema(lat, lng)}
 
 RESPOND WITH ONLY THE JSON. NO OTHER TEXT."""
-                        }
+
+
+def fused_request(lat: float, lng: float) -> str:
+    return f"""ANALYZE AND GENERATE RISK ASSESSMENT
+
+📍 COORDINATES: {lat}, {lng}
+
+Apply the ATLAS geospatial and CHRONICLE historical analysis internally; put their
+conclusions into the fields below (location, threats, zones, patterns, reasoning).
+
+═══════════════════════════════════════
+GENERATE JSON RESPONSE:
+═══════════════════════════════════════
+{risk_assessment_schema(lat, lng)}
+
+RESPOND WITH ONLY THE JSON. NO OTHER TEXT."""
+
+
+# sequential: ATLAS -> CHRONICLE -> ORACLE (three serial round trips)
+# parallel:   ATLAS and CHRONICLE concurrently from the coordinates, then ORACLE
+# fused:      one structured call covering all three roles
+CHRONOS_STRATEGIES = ("sequential", "parallel", "fused")
+CHRONOS_STRATEGY = os.getenv("CHRONOS_STRATEGY", "sequential").lower()
+if CHRONOS_STRATEGY not in CHRONOS_STRATEGIES:
+    raise ValueError(f"CHRONOS_STRATEGY must be one of {', '.join(CHRONOS_STRATEGIES)}, got {CHRONOS_STRATEGY!r}")
+
+@traced("chronos")
+async def analyze_location_with_crewai(lat: float, lng: float,
+                                       on_progress: Optional[ProgressCallback] = None,
+                                       strategy: Optional[str] = None) -> Dict:
+    """
+    Use CrewAI-style agents for ultra-fast disaster risk analysis. Each agent runs
+    on whichever provider the router currently rates fastest and healthy.
+    on_progress is awaited with (agent, details) as each agent finishes.
+    strategy overrides CHRONOS_STRATEGY (sequential | parallel | fused).
+    """
+    strategy = strategy or CHRONOS_STRATEGY
+
+    async def report(agent: str, succeeded: bool):
+        if on_progress is not None:
+            await on_progress(agent.lower(), {"agent": agent, "status": "complete" if succeeded else "fallback"})
+
+    chronos_log.debug("chronos analysis started", extra={"lat": lat, "lng": lng, "strategy": strategy})
+    
+    if not (CEREBRAS_API_KEY or GROQ_API_KEY):
+        chronos_log.warning("chronos analysis unavailable, no LLM API key configured")
+        return {
+            "success": False,
+            "error": "CEREBRAS_API_KEY / GROQ_API_KEY not configured",
+            "overall_risk_level": "unknown",
+            "risk_score": 0,
+            "risk_score_explanation": "AI analysis unavailable - LLM API key missing"
+        }
+    
+    try:
+        async with httpx.AsyncClient(timeout=120.0) as client:
+            
+            # ================================================================
+            # AGENT 1: GEOSPATIAL ANALYST
+            # ================================================================
+            async def run_atlas() -> str:
+                geo_result = await complete_chat(
+                    "chronos_atlas",
+                    [
+                        {"role": "system", "content": ATLAS_SYSTEM_PROMPT},
+                        {"role": "user", "content": atlas_request(lat, lng)}
                     ],
-                    "temperature": 0.2,
-                    "max_tokens": 2000
-                }
-            )
+                    temperature=0.3, max_tokens=800, timeout=120.0, client=client
+                )
+                await report("ATLAS", bool(geo_result))
+                if geo_result:
+                    return geo_result[1]
+                chronos_log.warning("ATLAS stage failed")
+                return f"Location at coordinates {lat}, {lng}"
             
-            if pred_response.status_code == 200:
-                content = pred_response.json()["choices"][0]["message"]["content"].strip()
-                print("   ✅ Predictive assessment complete!")
-                
-                # Clean up JSON response
-                if "```json" in content:
-                    content = content.split("```json")[1].split("```")[0].strip()
-                elif "```" in content:
-                    content = content.split("```")[1].split("```")[0].strip()
-                elif content.startswith("{"):
-                    # Already clean JSON
-                    pass
+            # ================================================================
+            # AGENT 2: HISTORICAL DISASTER RESEARCHER
+            # ================================================================
+            async def run_chronicle(geo_analysis: Optional[str]) -> str:
+                hist_result = await complete_chat(
+                    "chronos_chronicle",
+                    [
+                        {"role": "system", "content": CHRONICLE_SYSTEM_PROMPT},
+                        {"role": "user", "content": chronicle_request(lat, lng, geo_analysis)}
+                    ],
+                    temperature=0.3, max_tokens=900, timeout=120.0, client=client
+                )
+                await report("CHRONICLE", bool(hist_result))
+                if hist_result:
+                    return hist_result[1]
+                chronos_log.warning("CHRONICLE stage failed")
+                return "Historical data analysis pending"
+            
+            if strategy == "fused":
+                # ============================================================
+                # ALL AGENTS: ONE STRUCTURED CALL
+                # ============================================================
+                pred_result = await complete_chat(
+                    "chronos_fused",
+                    [
+                        {"role": "system", "content": FUSED_SYSTEM_PROMPT},
+                        {"role": "user", "content": fused_request(lat, lng)}
+                    ],
+                    temperature=0.2, max_tokens=2000, timeout=120.0, client=client, parse=parse_llm_json
+                )
+                for agent in ("ATLAS", "CHRONICLE"):
+                    await report(agent, bool(pred_result))
+            else:
+                if strategy == "parallel":
+                    geo_analysis, hist_analysis = await asyncio.gather(run_atlas(), run_chronicle(None))
                 else:
-                    # Try to find JSON in response
-                    start_idx = content.find("{")
-                    end_idx = content.rfind("}") + 1
-                    if start_idx != -1 and end_idx > start_idx:
-                        content = content[start_idx:end_idx]
+                    geo_analysis = await run_atlas()
+                    hist_analysis = await run_chronicle(geo_analysis)
                 
-                # Parse JSON result
-                result = json.loads(content)
+                # ============================================================
+                # AGENT 3: PREDICTIVE RISK ASSESSOR
+                # ============================================================
+                pred_result = await complete_chat(
+                    "chronos_oracle",
+                    [
+                        {"role": "system", "content": ORACLE_SYSTEM_PROMPT},
+                        {"role": "user", "content": oracle_request(lat, lng, geo_analysis, hist_analysis)}
+                    ],
+                    temperature=0.2, max_tokens=2000, timeout=120.0, client=client, parse=parse_llm_json
+                )
+            
+            await report("ORACLE", bool(pred_result))
+            if pred_result:
+                provider, result = pred_result
                 result["success"] = True
                 result["agents_used"] = ["ATLAS (Geospatial)", "CHRONICLE (Historical)", "ORACLE (Predictive)"]
-                result["powered_by"] = "Cerebras AI"
+                result["strategy"] = strategy
+                result["powered_by"] = "Cerebras AI" if provider == "cerebras" else "Groq AI"
                 
                 # Ensure proper formatting
                 if "risk_zones" in result:
@@ -1388,30 +1613,22 @@ RESPOND WITH ONLY THE JSON. NO OTHER TEXT."""
                         if "incidents_24h" not in zone:
                             zone["incidents_24h"] = random.randint(0, 5)
                 
-                print(f"\n{'='*60}")
-                print(f"✅ CHRONOS ANALYSIS COMPLETE")
-                print(f"   Risk Level: {result.get('overall_risk_level', 'N/A').upper()}")
-                print(f"   Risk Score: {result.get('risk_score', 'N/A')}/100")
-                print(f"   Location: {result.get('location_name', 'N/A')}")
-                print(f"{'='*60}\n")
+                chronos_log.info("chronos analysis complete", extra={
+                    "risk_level": result.get("overall_risk_level"),
+                    "risk_score": result.get("risk_score"),
+                    "location_name": result.get("location_name")
+                })
                 
                 return result
             else:
-                print(f"   ❌ Prediction failed: {pred_response.status_code}")
-                print(f"   Response: {pred_response.text[:500]}")
+                chronos_log.warning("ORACLE stage failed")
                 
-    except json.JSONDecodeError as e:
-        print(f"❌ JSON Parse Error: {e}")
-        print(f"   Raw content: {content[:500] if 'content' in dir() else 'N/A'}")
     except httpx.TimeoutException:
-        print("❌ Request timed out - Cerebras API took too long")
-    except Exception as e:
-        print(f"❌ Chronos Analysis Error: {e}")
-        import traceback
-        traceback.print_exc()
+        chronos_log.warning("chronos analysis timed out")
+    except Exception:
+        chronos_log.exception("chronos analysis error")
     
     # Enhanced fallback response
-    print("\n⚠️ Using fallback analysis...")
     return {
         "success": False,
         "overall_risk_level": "medium",
@@ -1461,42 +1678,56 @@ RESPOND WITH ONLY THE JSON. NO OTHER TEXT."""
         "powered_by": "Fallback System"
     }
 
+# Point-in-polygon country/admin-1 lookups over bundled boundaries (compiled to an .npz index on first load)
+region_index = load_region_index()
+
 def get_region_from_coordinates(lat: float, lng: float) -> str:
     """Determine region based on coordinates"""
-    if 24 <= lat <= 46 and 122 <= lng <= 154:  # Japan bounds
-        return "japan"
-    elif 6 <= lat <= 37 and 68 <= lng <= 98:  # India bounds
-        return "india"
-    elif 24 <= lat <= 50 and -130 <= lng <= -65:  # USA bounds
-        return "usa"
-    elif -11 <= lat <= 6 and 95 <= lng <= 141:  # Indonesia bounds
-        return "indonesia"
-    return "default"
-
-@app.post("/api/chronos/analyze")
-async def chronos_analyze(request: ChronosLocationRequest):
-    """Chronos Predictive Intelligence Analysis Endpoint - Powered by CrewAI Agents"""
-    print(f"\n🔮 CHRONOS ANALYSIS REQUEST")
-    print(f"📍 Location: {request.lat}, {request.lng}")
-    
-    # Use CrewAI agents for dynamic analysis
-    ai_result = await analyze_location_with_crewai(request.lat, request.lng)
-    
+    region = region_index.resolve(lat, lng)
+    if region is None:
+        return "default"
+    return zone_dataset.region_for_iso(region["iso_a2"])
+
+def region_label(region: Optional[Dict]) -> Optional[str]:
+    """'California, United States' style label for a resolved region"""
+    if region is None:
+        return None
+    return f"{region['admin1']}, {region['country']}" if region["admin1"] else region["country"]
+
+def with_live_incidents(risk_zones: List[Dict], lat: Optional[float] = None,
+                        lng: Optional[float] = None) -> Tuple[List[Dict], int]:
+    """Zones with incidents_24h from the incident stream, plus the 24h total over their cells (and the query's)"""
+    cells = []
+    for zone in risk_zones:
+        try:
+            zone_lat, zone_lng = float(zone["lat"]), float(zone["lng"])
+        except (KeyError, TypeError, ValueError):
+            zone_lat, zone_lng = lat or 0.0, lng or 0.0
+        cells.append(f"cell:{zone_cell(zone_lat, zone_lng, zone_dataset.cell_deg)}")
+    counts = dict(zip(cells, incident_stats.counts_for(cells, "24h")))
+    if lat is not None and lng is not None:
+        area = f"cell:{zone_cell(lat, lng, zone_dataset.cell_deg)}"
+        counts.setdefault(area, incident_stats.count(area, "24h"))
+    return [{**z, "incidents_24h": counts[c]} for z, c in zip(risk_zones, cells)], sum(counts.values())
+
+def build_chronos_response(lat: float, lng: float, ai_result: Dict) -> Dict:
+    """Shape an agent result (or the static regional fallback) into the Chronos API response"""
+    region = region_index.resolve(lat, lng)
     if ai_result.get("success"):
         # Use AI-generated data
-        risk_zones = ai_result.get("risk_zones", [])
+        risk_zones, total_incidents_24h = with_live_incidents(ai_result.get("risk_zones", []), lat, lng)
         historical_patterns = ai_result.get("historical_patterns", [])
         weather = ai_result.get("weather_correlation", {"temperature": "N/A", "current_risk": "+0%", "factor": "Unknown"})
         
         # Calculate metrics from AI response
         avg_risk = ai_result.get("risk_score", 50)
-        total_incidents_24h = sum(z.get("incidents_24h", 0) for z in risk_zones)
         
         return {
             "success": True,
-            "location": {"lat": request.lat, "lng": request.lng},
-            "region": ai_result.get("location_name", ai_result.get("country", "Unknown")),
-            "flag": "🌍",  # Could be enhanced with country detection
+            "location": {"lat": lat, "lng": lng},
+            "region": ai_result.get("location_name", ai_result.get("country", region_label(region) or "Unknown")),
+            "flag": region["flag"] if region else "🌍",
+            "resolved_region": region,
             "overview": {
                 "avg_risk_score": avg_risk,
                 "total_incidents_24h": total_incidents_24h,
@@ -1518,26 +1749,28 @@ async def chronos_analyze(request: ChronosLocationRequest):
                 "recommended_actions": ai_result.get("recommended_actions", []),
                 "agents_used": ai_result.get("agents_used", []),
             },
+            "cache": ai_result.get("cache"),
             "generated_at": datetime.now().isoformat(),
         }
     else:
         # Fallback to static region data if AI fails
-        region_key = get_region_from_coordinates(request.lat, request.lng)
-        region_data = DISASTER_PATTERNS.get(region_key, DISASTER_PATTERNS["default"])
+        region_key = zone_dataset.region_for_iso(region["iso_a2"]) if region else "default"
+        region_data = zone_dataset.region(region_key)
+        risk_zones = region_data.get("risk_zones", [])
         
         if region_key == "default":
-            region_data["risk_zones"][0]["lat"] = request.lat
-            region_data["risk_zones"][0]["lng"] = request.lng
+            # Generic zone centred on the query
+            risk_zones = [{**zone, "lat": lat, "lng": lng} for zone in risk_zones]
+        risk_zones, total_incidents_24h = with_live_incidents(risk_zones, lat, lng)
         
-        risk_zones = region_data.get("risk_zones", [])
         avg_risk = sum(z["risk_score"] for z in risk_zones) / len(risk_zones) if risk_zones else 50
-        total_incidents_24h = sum(z["incidents_24h"] for z in risk_zones)
         
         return {
             "success": True,
-            "location": {"lat": request.lat, "lng": request.lng},
-            "region": region_data.get("country", "Unknown"),
-            "flag": region_data.get("flag", "🌍"),
+            "location": {"lat": lat, "lng": lng},
+            "region": region_label(region) if region_key == "default" and region else region_data.get("country", "Unknown"),
+            "flag": region["flag"] if region else region_data.get("flag", "🌍"),
+            "resolved_region": region,
             "overview": {
                 "avg_risk_score": round(avg_risk),
                 "total_incidents_24h": total_incidents_24h,
@@ -1562,31 +1795,240 @@ async def chronos_analyze(request: ChronosLocationRequest):
             "generated_at": datetime.now().isoformat(),
         }
 
+# Agent results per geohash cell; stale cells are served immediately and refreshed as a job
+chronos_cache = ChronosCache()
+
+async def cached_location_analysis(lat: float, lng: float,
+                                   on_progress: Optional[ProgressCallback] = None) -> Dict:
+    """Agent analysis for the point's geohash cell, from the cache whenever possible"""
+    cached, state, age_s = chronos_cache.get(lat, lng)
+    cache_info = {"status": state, "cell": chronos_cache.cell(lat, lng), "age_s": round(age_s)}
+    if cached is None:
+        # Coarse precomputed grid cell answers now; the fine cell is computed in the background
+        cached = risk_grid_store.lookup(lat, lng)
+        if cached is not None:
+            state = "precomputed"
+            cache_info["status"] = state
+            cache_info["precomputed_at"] = cached.pop("precomputed_at", None)
+    if cached is not None:
+        if state in (STALE, "precomputed"):
+            refresh_chronos_cell(lat, lng)
+        if on_progress is not None:
+            await on_progress("cache", {"status": state})
+        return {**cached, "cache": cache_info}
+    
+    result = await analyze_location_with_crewai(lat, lng, on_progress=on_progress)
+    if result.get("success"):
+        chronos_cache.put(lat, lng, result)
+    return {**result, "cache": cache_info}
+
+def refresh_chronos_cell(lat: float, lng: float):
+    """Re-run the agents for a stale cell in the background, at most one refresh per cell at a time"""
+    async def run(progress: ProgressCallback) -> Dict:
+        result = await analyze_location_with_crewai(lat, lng, on_progress=progress)
+        if result.get("success"):
+            chronos_cache.put(lat, lng, result)
+        return build_chronos_response(lat, lng, result)
+    
+    try:
+        # Own key: a user job for this cell may be the caller, and sharing its key would drop the refresh
+        chronos_jobs.submit(f"{chronos_job_key(lat, lng)}:refresh", run, {"lat": lat, "lng": lng, "refresh": True})
+    except JobQueueFull:
+        chronos_log.debug("chronos job queue full, skipping stale refresh", extra={"cell": chronos_cache.cell(lat, lng)})
+
+@app.post("/api/chronos/analyze", dependencies=[Depends(shed_when_degraded)])
+async def chronos_analyze(request: ChronosLocationRequest):
+    """Chronos Predictive Intelligence Analysis Endpoint - Powered by CrewAI Agents (synchronous)"""
+    ai_result = await cached_location_analysis(request.lat, request.lng)
+    return build_chronos_response(request.lat, request.lng, ai_result)
+
+# CrewAI crews (agents/) run on their own bounded executor; imported lazily since crewai is optional
+async def run_crew_endpoint(request: Request, entry_point: str, *args) -> Dict:
+    try:
+        import agents
+    except ImportError as e:
+        raise HTTPException(status_code=503, detail=f"CrewAI crews unavailable: {e}")
+    try:
+        return await agents.run_until_disconnect(request, getattr(agents, entry_point)(*args))
+    except agents.CrewQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "10"})
+    except agents.ClientDisconnected:
+        log.info("crew request cancelled by client disconnect", extra={"entry_point": entry_point})
+        return PlainTextResponse("client disconnected", status_code=499)
+
+@app.post("/api/crew/chronos", dependencies=[Depends(shed_when_degraded)])
+async def crew_chronos(body: ChronosLocationRequest, request: Request):
+    """Full Chronos CrewAI run (ATLAS -> CHRONICLE -> ORACLE) without blocking the event loop"""
+    return await run_crew_endpoint(request, "analyze_location_async", body.lat, body.lng)
+
+@app.post("/api/crew/dispatch", dependencies=[Depends(shed_when_degraded)])
+async def crew_dispatch(call: EmergencyCall, request: Request, plan: Optional[str] = None):
+    """
+    OmniDispatch CrewAI run on an emergency call. The fast triage picks the plan
+    (local, single, full, hierarchical) unless `plan` forces one.
+    """
+    if plan is not None and plan not in CREW_PLANS:
+        raise HTTPException(status_code=400, detail=f"plan must be one of {CREW_PLANS}")
+    coords = call.caller_location or {}
+    triage = await analyze_emergency_with_ai(call.transcript)
+    return await run_crew_endpoint(request, "process_call_async", {
+        "transcript": call.transcript,
+        "location": {"address": coords.get("address", "Unknown"), "coordinates": coords},
+        "caller_phone": call.caller_phone,
+        "timestamp": datetime.now().strftime("%Y%m%d%H%M%S"),
+        "triage": triage,
+    }, None, plan)
+
+# Chronos jobs: POST returns immediately, agents report progress over /ws and SSE
+chronos_jobs = JobManager(
+    "chronos",
+    workers=int(os.getenv("CHRONOS_JOB_WORKERS", "2")),
+    max_queued=int(os.getenv("CHRONOS_JOB_QUEUE", "32")),
+)
+
+@chronos_jobs.on_event
+async def broadcast_chronos_job_event(job, event: Dict):
+    await broadcast_update({"type": "chronos_job", **event})
+
+def chronos_job_key(lat: float, lng: float) -> str:
+    """Requests in the same cache cell share one in-flight job"""
+    return chronos_cache.cell(lat, lng)
+
+@app.post("/api/chronos/jobs", status_code=202, dependencies=[Depends(shed_when_degraded)])
+async def create_chronos_job(request: ChronosLocationRequest):
+    """Queue a Chronos analysis; poll GET /api/chronos/jobs/{job_id} or listen for chronos_job on /ws"""
+    lat, lng = request.lat, request.lng
+    
+    async def run(progress: ProgressCallback) -> Dict:
+        return build_chronos_response(lat, lng, await cached_location_analysis(lat, lng, on_progress=progress))
+    
+    try:
+        job, deduplicated = chronos_jobs.submit(chronos_job_key(lat, lng), run, {"lat": lat, "lng": lng})
+    except JobQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "10"})
+    return {
+        "success": True,
+        "job_id": job.id,
+        "status": job.status,
+        "deduplicated": deduplicated,
+        "status_url": f"/api/chronos/jobs/{job.id}",
+        "events_url": f"/api/chronos/jobs/{job.id}/events",
+    }
+
+@app.get("/api/chronos/jobs/{job_id}")
+async def get_chronos_job(job_id: str):
+    job = chronos_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired job id")
+    return {"success": True, **job.to_dict()}
+
+@app.get("/api/chronos/jobs/{job_id}/events")
+async def stream_chronos_job_events(job_id: str):
+    """Server-sent events: one per agent stage, then the final job status"""
+    job = chronos_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired job id")
+    
+    async def events():
+        async for event in chronos_jobs.subscribe(job):
+            yield f"event: {event['stage']}\ndata: {json.dumps(event)}\n\n"
+    
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+# Precomputed global risk grid: swept at BACKGROUND priority, served from memory-mapped columns
+risk_grid_store = RiskGridStore(os.getenv("RISK_GRID_DIR", "./risk_grid"))
+risk_grid_batch: Optional[RiskGridBatch] = None
+risk_grid_task: Optional[asyncio.Task] = None
+
+class RiskGridRequest(BaseModel):
+    step_deg: float = float(os.getenv("RISK_GRID_STEP_DEG", "5"))
+    populated_only: bool = True
+    concurrency: int = 2
+
+def start_risk_grid_sweep(spec: GridSpec, concurrency: int = 2) -> RiskGridBatch:
+    """Start (or resume from checkpoint) a grid sweep in the background"""
+    global risk_grid_batch, risk_grid_task
+    risk_grid_batch = RiskGridBatch(spec, risk_grid_store, analyze_location_with_crewai, concurrency)
+    risk_grid_task = asyncio.create_task(risk_grid_batch.run())
+    return risk_grid_batch
+
+def risk_grid_status() -> Dict:
+    status = risk_grid_batch.status() if risk_grid_batch else {"running": False}
+    status["available"] = risk_grid_store.available
+    if status["available"]:
+        status["stored_cells"] = risk_grid_store.meta["count"]
+        status["generated_at"] = risk_grid_store.meta["generated_at"]
+    return status
+
+@app.on_event("startup")
+async def resume_risk_grid_sweep():
+    if os.getenv("RISK_GRID_PRECOMPUTE", "0") == "1":
+        start_risk_grid_sweep(GridSpec(step_deg=float(os.getenv("RISK_GRID_STEP_DEG", "5"))))
+
+@app.post("/api/chronos/grid/precompute", status_code=202, dependencies=[Depends(shed_when_degraded)])
+async def precompute_risk_grid(request: RiskGridRequest):
+    """Sweep the global grid through the Chronos agents; resumes a matching checkpoint"""
+    if risk_grid_task is not None and not risk_grid_task.done():
+        raise HTTPException(status_code=409, detail="A risk grid sweep is already running")
+    if not 0.5 <= request.step_deg <= 30 or not 1 <= request.concurrency <= 8:
+        raise HTTPException(status_code=400, detail="step_deg must be 0.5-30 and concurrency 1-8")
+    spec = GridSpec(step_deg=request.step_deg, populated_only=request.populated_only)
+    start_risk_grid_sweep(spec, request.concurrency)
+    return {"success": True, **risk_grid_status()}
+
+@app.get("/api/chronos/grid/status")
+async def get_risk_grid_status():
+    return {"success": True, **risk_grid_status()}
+
 @app.get("/api/chronos/global-overview")
-async def chronos_global_overview():
+async def chronos_global_overview(limit: int = int(os.getenv("RISK_GRID_OVERVIEW_LIMIT", "100"))):
     """Get global disaster risk overview"""
-    global_zones = []
-    for region_key, region_data in DISASTER_PATTERNS.items():
-        if region_key != "default":
-            for zone in region_data.get("risk_zones", []):
-                global_zones.append({
-                    **zone,
-                    "country": region_data.get("country"),
-                    "flag": region_data.get("flag"),
-                })
-    
-    # Sort by risk score
-    global_zones.sort(key=lambda x: x["risk_score"], reverse=True)
+    # Zones are already in risk order; counts cover the whole grid or dataset, not just the returned page
+    if risk_grid_store.available:
+        global_zones = risk_grid_store.top_zones(limit=limit)
+        source = "precomputed_grid"
+        counts = risk_grid_store.counts()
+        total, critical, high = counts["total"], counts["critical"], counts["high"]
+    else:
+        global_zones, _ = with_live_incidents(zone_dataset.top(limit=limit))
+        source = "zone_dataset"
+        total, critical, high = zone_dataset.count, zone_dataset.critical_count, zone_dataset.high_count
     
     return {
         "success": True,
-        "total_risk_zones": len(global_zones),
-        "critical_zones": len([z for z in global_zones if z["risk_score"] >= 85]),
-        "high_risk_zones": len([z for z in global_zones if 70 <= z["risk_score"] < 85]),
+        "source": source,
+        "total_risk_zones": total,
+        "critical_zones": critical,
+        "high_risk_zones": high,
         "risk_zones": global_zones,
         "last_updated": datetime.now().isoformat(),
     }
 
+@app.get("/api/chronos/zones")
+async def chronos_viewport_zones(south: float, west: float, north: float, east: float,
+                                 limit: int = 500, min_score: int = 0):
+    """Highest-risk zones visible in a map viewport (west > east crosses the antimeridian)"""
+    if not (-90 <= south <= north <= 90 and -180 <= west <= 180 and -180 <= east <= 180 and 1 <= limit <= 5000):
+        raise HTTPException(status_code=400, detail="need -90 <= south <= north <= 90, -180 <= west/east <= 180, limit 1-5000")
+    result = zone_dataset.viewport(south, west, north, east, limit=limit, min_score=min_score)
+    result["zones"], _ = with_live_incidents(result["zones"])
+    return {
+        "success": True,
+        "viewport": {"south": south, "west": west, "north": north, "east": east},
+        **result,
+    }
+
+@app.get("/api/chronos/zones/nearest")
+async def chronos_nearest_zones(lat: float, lng: float, k: int = 5, max_km: Optional[float] = None):
+    """The k risk zones closest to a point"""
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180 and 1 <= k <= 100):
+        raise HTTPException(status_code=400, detail="lat/lng out of range or k not in 1-100")
+    return {
+        "success": True,
+        "location": {"lat": lat, "lng": lng},
+        "zones": with_live_incidents(zone_dataset.nearest(lat, lng, k=k, max_km=max_km))[0],
+    }
+
 @app.post("/api/incidents/clear")
 async def clear_incidents():
     """Clear all incidents and reset responders"""
@@ -1601,7 +2043,7 @@ async def clear_incidents():
     await broadcast_update({"type": "incidents_cleared"})
     await broadcast_update({"type": "responder_update", "responders": active_responders})
     
-    print("🧹 All incidents cleared, responders reset")
+    log.info("incidents cleared")
     return {"success": True, "message": "All incidents cleared"}
 
 # ============================================================================
@@ -1611,11 +2053,13 @@ async def clear_incidents():
 async def broadcast_update(data: Dict):
     """Broadcast update to all connected WebSocket clients"""
     disconnected = []
-    for client in connected_clients:
-        try:
-            await client.send_json(data)
-        except:
-            disconnected.append(client)
+    with trace_span("broadcast", message_type=data.get("type", "")) as span:
+        for client in connected_clients:
+            try:
+                await client.send_json(data)
+            except:
+                disconnected.append(client)
+        span.set(clients=len(connected_clients), failed=len(disconnected))
     
     for client in disconnected:
         if client in connected_clients:
@@ -1625,7 +2069,7 @@ async def broadcast_update(data: Dict):
 async def websocket_endpoint(websocket: WebSocket):
     await websocket.accept()
     connected_clients.append(websocket)
-    print(f"🔌 WebSocket client connected (total: {len(connected_clients)})")
+    log.debug("websocket connected", extra={"clients": len(connected_clients)})
     
     try:
         await websocket.send_json({
@@ -1644,11 +2088,11 @@ async def websocket_endpoint(websocket: WebSocket):
     except WebSocketDisconnect:
         pass
     except Exception as e:
-        print(f"WebSocket error: {e}")
+        log.warning("websocket error", extra={"error": str(e)})
     finally:
         if websocket in connected_clients:
             connected_clients.remove(websocket)
-        print(f"🔌 WebSocket client disconnected (remaining: {len(connected_clients)})")
+        log.debug("websocket disconnected", extra={"clients": len(connected_clients)})
 
 # ============================================================================
 # RUN SERVER
@@ -1677,7 +2121,7 @@ class LocationSearchRequest(BaseModel):
 class BuildingRequest(BaseModel):
     building_id: str
 
-@app.post("/api/guardian/search-location")
+@app.post("/api/guardian/search-location", dependencies=[Depends(shed_when_degraded)])
 async def search_location(request: LocationSearchRequest):
     """Search for a location and get nearby hospitals and emergency buildings"""
     try:
@@ -1714,8 +2158,8 @@ async def search_location(request: LocationSearchRequest):
             else:
                 # Use Google Maps API
                 async with httpx.AsyncClient() as client:
-                    geocode_response = await client.get(
-                        "https://maps.googleapis.com/maps/api/geocode/json",
+                    geocode_response = await get_google_maps(
+                        client, "geocode/json", "geocode",
                         params={
                             "address": request.location,
                             "key": GOOGLE_MAPS_API_KEY
@@ -1724,7 +2168,7 @@ async def search_location(request: LocationSearchRequest):
                     )
                     geocode_data = geocode_response.json()
                     
-                    print(f"Geocode API Status: {geocode_data.get('status')}")
+                    guardian_log.debug("geocode result", extra={"status": geocode_data.get("status")})
                     
                     if geocode_data.get("status") != "OK" or not geocode_data.get("results"):
                         return {
@@ -1761,8 +2205,8 @@ async def search_location(request: LocationSearchRequest):
             async with httpx.AsyncClient() as client:
                 for place_type, category, icon in search_types:
                     try:
-                        response = await client.get(
-                            "https://maps.googleapis.com/maps/api/place/nearbysearch/json",
+                        response = await get_google_maps(
+                            client, "place/nearbysearch/json", "places",
                             params={
                                 "location": f"{lat},{lng}",
                                 "radius": 5000,  # 5km radius
@@ -1797,12 +2241,12 @@ async def search_location(request: LocationSearchRequest):
                                     "photo_reference": result.get("photos", [{}])[0].get("photo_reference") if result.get("photos") else None
                                 })
                     except Exception as e:
-                        print(f"Error searching {place_type}: {str(e)}")
+                        guardian_log.warning("places search failed", extra={"place_type": place_type, "error": str(e)})
                         continue
         
         # If no API key or no results, generate demo data
         if not nearby_buildings:
-            print("⚠️ Using demo building data (Google Maps API not available)")
+            guardian_log.debug("using demo building data")
             demo_buildings = [
                 ("Gandhi Hospital", "Medical Facility", "🏥", "Musheerabad"),
                 ("Osmania General Hospital", "Medical Facility", "🏥", "Afzal Gunj"),
@@ -1863,7 +2307,7 @@ async def search_location(request: LocationSearchRequest):
         }
         
     except Exception as e:
-        print(f"Error in location search: {str(e)}")
+        guardian_log.warning("location search error", extra={"error": str(e)})
         return {
             "success": False,
             "error": str(e),
@@ -1932,7 +2376,7 @@ async def get_building_details(request: BuildingRequest):
         }
         
     except Exception as e:
-        print(f"Error getting building details: {str(e)}")
+        guardian_log.warning("building details error", extra={"error": str(e)})
         return {
             "success": False,
             "error": str(e),
@@ -2098,3 +2542,60 @@ def generate_safety_protocols(building_type: str, floors: int) -> List[Dict]:
         })
     
     return protocols
+
+# ============================================================================
+# KNOWLEDGE BASE SEARCH (ChromaDB, opened by a background warm-up after startup)
+# ============================================================================
+
+KNOWLEDGE_COLLECTIONS = ("incidents", "protocols", "buildings")
+
+@app.on_event("startup")
+async def warm_knowledge_base():
+    # Off the startup path: the app accepts traffic while the vector store and model load
+    if os.getenv("KB_WARM_ON_STARTUP", "1") == "1":
+        knowledge_base.start_warming()
+
+@app.get("/api/knowledge/search")
+async def knowledge_search(query: str, collection: str = "incidents", limit: int = 5,
+                           type: Optional[str] = None, severity: Optional[str] = None,
+                           category: Optional[str] = None, since: Optional[str] = None,
+                           until: Optional[str] = None, lat: Optional[float] = None,
+                           lng: Optional[float] = None, radius_km: float = 25.0):
+    """
+    Semantic search with filters evaluated inside Chroma: type/severity/date range/radius for
+    incidents, category/updated-since for protocols, type/radius for buildings.
+    type and severity take comma-separated lists.
+    """
+    if collection not in KNOWLEDGE_COLLECTIONS:
+        raise HTTPException(status_code=400, detail=f"collection must be one of {list(KNOWLEDGE_COLLECTIONS)}")
+    if not 1 <= limit <= 50:
+        raise HTTPException(status_code=400, detail="limit must be between 1 and 50")
+    if (lat is None) != (lng is None):
+        raise HTTPException(status_code=400, detail="lat and lng must be given together")
+    if radius_km <= 0:
+        raise HTTPException(status_code=400, detail="radius_km must be positive")
+    try:
+        kb = knowledge_base.get()
+    except KnowledgeBaseNotReady as e:
+        # Degrade instead of blocking on the warm-up; retries a warm-up that failed
+        knowledge_base.start_warming()
+        return {"success": False, "collection": collection, "count": 0, "results": [],
+                "error": str(e), "knowledge_base": knowledge_base.status()}
+    
+    near = (lat, lng) if lat is not None else None
+    split = lambda value: [v.strip().lower() for v in value.split(",") if v.strip()] if value else None
+    try:
+        if collection == "incidents":
+            hits = await asyncio.to_thread(
+                kb.search_similar_incidents, query, limit, split(type), split(severity),
+                since, until, near, radius_km
+            )
+        elif collection == "protocols":
+            hits = await asyncio.to_thread(kb.search_protocols, query, category, limit, since)
+        else:
+            hits = await asyncio.to_thread(
+                kb.search_buildings, query, limit, type.lower() if type else None, near, radius_km
+            )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"success": True, "collection": collection, "count": len(hits), "results": hits}
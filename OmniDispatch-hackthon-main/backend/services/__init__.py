@@ -1,6 +1,15 @@
 """
 Initialize services package
 """
-from .rag import knowledge_base, EmergencyKnowledgeBase
+from .metrics import registry
+from .tracing import trace_span, request_trace
 
-__all__ = ['knowledge_base', 'EmergencyKnowledgeBase']
+__all__ = ['knowledge_base', 'EmergencyKnowledgeBase', 'KnowledgeBaseNotReady', 'registry', 'trace_span', 'request_trace']
+
+
+def __getattr__(name):
+    # The RAG layer pulls in numpy and the embedding store, so only import it when actually requested
+    if name in ('knowledge_base', 'EmergencyKnowledgeBase', 'KnowledgeBaseNotReady'):
+        from . import rag
+        return getattr(rag, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,123 @@
+"""
+Overload Admission Control
+==========================
+Decides, per request, whether the backend serves in normal or degraded mode.
+
+Live calls are tracked while in flight and their end-to-end latency feeds an
+EWMA. When too many calls are in flight, or normal-mode calls get slower than
+the latency budget, new calls are served in degraded mode (local triage,
+cached TTS, no Places enrichment) for at least ADMISSION_HOLD_S. Non-critical
+endpoints are shed with 503 + Retry-After until the pressure clears.
+
+Environment:
+    SERVICE_MODE                 "auto" (default), or force "normal" / "degraded"
+    ADMISSION_MAX_IN_FLIGHT      concurrent live calls before degrading (default 32)
+    ADMISSION_LATENCY_BUDGET_S   normal-mode call latency EWMA that triggers degrading (default 6)
+    ADMISSION_HOLD_S             minimum time to stay degraded (default 15)
+"""
+
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+
+from .log import get_logger
+from .metrics import registry
+
+logger = get_logger("admission")
+
+NORMAL = "normal"
+DEGRADED = "degraded"
+
+SERVICE_MODE = registry.gauge(
+    "omnidispatch_service_mode", "Current service mode (0 normal, 1 degraded)"
+)
+MODE_TRANSITIONS = registry.counter(
+    "omnidispatch_service_mode_transitions_total", "Service mode changes", ["mode", "reason"]
+)
+LIVE_CALLS = registry.counter(
+    "omnidispatch_live_calls_total", "Live call requests by the mode that served them", ["mode"]
+)
+SHED_REQUESTS = registry.counter(
+    "omnidispatch_shed_requests_total", "Non-critical requests rejected with 503 while degraded", ["endpoint"]
+)
+
+
+class AdmissionController:
+    """Tracks live-call pressure and picks the service mode for new work"""
+
+    def __init__(self, max_in_flight: Optional[int] = None, latency_budget_s: Optional[float] = None,
+                 hold_s: Optional[float] = None, alpha: float = 0.3):
+        self.forced = os.getenv("SERVICE_MODE", "auto").lower()
+        self.max_in_flight = max_in_flight or int(os.getenv("ADMISSION_MAX_IN_FLIGHT", "32"))
+        self.latency_budget_s = latency_budget_s or float(os.getenv("ADMISSION_LATENCY_BUDGET_S", "6"))
+        self.hold_s = hold_s or float(os.getenv("ADMISSION_HOLD_S", "15"))
+        self.alpha = alpha
+        self.in_flight = 0
+        self.latency_ewma = 0.0
+        self.degraded_until = 0.0
+        self._mode = NORMAL
+        SERVICE_MODE.set_function(lambda: 1 if self.mode == DEGRADED else 0)
+
+    @property
+    def mode(self) -> str:
+        if self.forced in (NORMAL, DEGRADED):
+            return self.forced
+        if self._mode == DEGRADED and time.monotonic() >= self.degraded_until:
+            # Hold expired: let normal-mode calls probe the providers again from a neutral estimate
+            if self.in_flight < self.max_in_flight:
+                self.latency_ewma = self.latency_budget_s / 2
+                self._transition(NORMAL, "recovered")
+        return self._mode
+
+    def retry_after_s(self) -> int:
+        return max(1, int(self.degraded_until - time.monotonic() + 0.999))
+
+    def _degrade(self, reason: str):
+        self.degraded_until = time.monotonic() + self.hold_s
+        self._transition(DEGRADED, reason)
+
+    def _transition(self, mode: str, reason: str):
+        if self._mode == mode:
+            return
+        self._mode = mode
+        MODE_TRANSITIONS.inc(mode=mode, reason=reason)
+        logger.warning("service mode changed", extra={
+            "mode": mode, "reason": reason, "in_flight": self.in_flight,
+            "latency_ewma_s": round(self.latency_ewma, 3)
+        })
+
+    @asynccontextmanager
+    async def live_call(self) -> AsyncIterator[str]:
+        """Admit a live call; yields the mode it must be served in"""
+        if self.in_flight >= self.max_in_flight:
+            self._degrade("in_flight")
+        mode = self.mode
+        self.in_flight += 1
+        LIVE_CALLS.inc(mode=mode)
+        started = time.perf_counter()
+        try:
+            yield mode
+        finally:
+            self.in_flight -= 1
+            if mode == NORMAL:
+                # Degraded calls are fast by construction and would mask provider slowness
+                elapsed = time.perf_counter() - started
+                self.latency_ewma += self.alpha * (elapsed - self.latency_ewma)
+                if self.latency_ewma > self.latency_budget_s:
+                    self._degrade("latency")
+
+    def allow_noncritical(self, endpoint: str) -> bool:
+        """False (and counted) when a non-critical endpoint should be shed"""
+        if self.mode == DEGRADED:
+            SHED_REQUESTS.inc(endpoint=endpoint)
+            return False
+        return True
+
+    def snapshot(self) -> Dict:
+        return {
+            "mode": self.mode,
+            "in_flight": self.in_flight,
+            "latency_ewma_s": round(self.latency_ewma, 3),
+            "latency_budget_s": self.latency_budget_s,
+        }
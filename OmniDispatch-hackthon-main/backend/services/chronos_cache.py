@@ -0,0 +1,116 @@
+"""
+Chronos Result Cache
+====================
+Persists Chronos agent results in SQLite keyed by geohash cell, so repeated
+map exploration around the same area never re-runs the agent pipeline.
+
+Entries are fresh for CHRONOS_CACHE_TTL_S, then stale (still served, while a
+background refresh runs) until CHRONOS_CACHE_STALE_TTL_S, then expired.
+Expired rows are deleted by put(), at most once per purge interval.
+
+Environment:
+    CHRONOS_CACHE_PATH          SQLite file (default ./chronos_cache.db)
+    CHRONOS_CACHE_PRECISION     geohash characters per cell (default 5, ~5 km)
+    CHRONOS_CACHE_TTL_S         fresh lifetime (default 6 h)
+    CHRONOS_CACHE_STALE_TTL_S   total lifetime including stale serving (default 48 h)
+    CHRONOS_CACHE_PURGE_S       minimum time between purges of expired rows (default 1 h)
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from . import geohash
+from .metrics import registry
+
+FRESH = "fresh"
+STALE = "stale"
+MISS = "miss"
+
+CACHE_LOOKUPS = registry.counter(
+    "omnidispatch_chronos_cache_lookups_total", "Chronos cache lookups by result", ["result"]
+)
+CACHE_WRITES = registry.counter(
+    "omnidispatch_chronos_cache_writes_total", "Chronos results written to the cache"
+)
+CACHE_PURGED = registry.counter(
+    "omnidispatch_chronos_cache_purged_total", "Expired Chronos results deleted from the cache"
+)
+
+
+class ChronosCache:
+    """Geohash-cell result cache with TTL and stale-while-revalidate states"""
+
+    def __init__(self, path: Optional[str] = None, precision: Optional[int] = None,
+                 ttl_s: Optional[float] = None, stale_ttl_s: Optional[float] = None):
+        self.path = path or os.getenv("CHRONOS_CACHE_PATH", "./chronos_cache.db")
+        self.precision = precision if precision is not None else int(os.getenv("CHRONOS_CACHE_PRECISION", "5"))
+        self.ttl_s = ttl_s if ttl_s is not None else float(os.getenv("CHRONOS_CACHE_TTL_S", str(6 * 3600)))
+        self.stale_ttl_s = max(self.ttl_s, stale_ttl_s if stale_ttl_s is not None
+                               else float(os.getenv("CHRONOS_CACHE_STALE_TTL_S", str(48 * 3600))))
+        self.purge_interval_s = float(os.getenv("CHRONOS_CACHE_PURGE_S", "3600"))
+        self._last_purge = 0.0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS chronos_results ("
+            " cell TEXT PRIMARY KEY, payload TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._counts = {FRESH: 0, STALE: 0, MISS: 0}
+
+    def cell(self, lat: float, lng: float) -> str:
+        return geohash.encode(lat, lng, self.precision)
+
+    def get(self, lat: float, lng: float) -> Tuple[Optional[Dict], str, float]:
+        """(result, fresh|stale|miss, age in seconds) for the cell containing the point"""
+        cell = self.cell(lat, lng)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, created_at FROM chronos_results WHERE cell = ?", (cell,)
+            ).fetchone()
+        state, result, age = MISS, None, 0.0
+        if row is not None:
+            age = time.time() - row[1]
+            if age < self.stale_ttl_s:
+                state = FRESH if age < self.ttl_s else STALE
+                result = json.loads(row[0])
+        self._counts[state] += 1
+        CACHE_LOOKUPS.inc(result=state)
+        return result, state, age
+
+    def put(self, lat: float, lng: float, result: Dict):
+        payload = json.dumps(result, default=str)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO chronos_results (cell, payload, created_at) VALUES (?, ?, ?)",
+                (self.cell(lat, lng), payload, time.time())
+            )
+        CACHE_WRITES.inc()
+        if time.monotonic() - self._last_purge >= self.purge_interval_s:
+            self.purge_expired()
+
+    def purge_expired(self) -> int:
+        """Delete rows past the stale lifetime; returns how many"""
+        with self._lock:
+            self._last_purge = time.monotonic()
+            cursor = self._conn.execute(
+                "DELETE FROM chronos_results WHERE created_at < ?", (time.time() - self.stale_ttl_s,)
+            )
+        CACHE_PURGED.inc(cursor.rowcount)
+        return cursor.rowcount
+
+    def stats(self) -> Dict:
+        lookups = sum(self._counts.values())
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM chronos_results").fetchone()[0]
+        return {
+            "entries": entries,
+            "precision": self.precision,
+            "lookups": dict(self._counts),
+            "hit_rate": round((self._counts[FRESH] + self._counts[STALE]) / lookups, 3) if lookups else 0.0,
+        }
@@ -0,0 +1,231 @@
+"""
+Persistent Embedding Store
+==========================
+On-disk cache of text embeddings keyed by (model id, sha256 of the text), so
+re-seeding, rebuilding a collection or re-ingesting unchanged documents only
+embeds text that actually changed. Queries go through it too.
+
+    <EMBEDDING_CACHE_DIR>/<model>/
+        meta.json      model id and vector dimension
+        vectors.f32    float32 rows, appended; memory-mapped for reads
+        keys.bin       32-byte sha256 digest per row, same order as vectors.f32
+
+The digest -> row index is rebuilt from keys.bin when the store opens. Rows
+are appended under an exclusive file lock, and before appending the store
+picks up rows other processes added, so crew worker processes can share a
+directory. A torn append (vectors without a key, or a partial row) is cut
+off on open.
+
+Environment:
+    EMBEDDING_CACHE_DIR   store root (default ./embedding_cache, "" disables)
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from .log import get_logger
+from .metrics import registry
+
+logger = get_logger("embedding_store")
+
+EMBEDDING_LOOKUPS = registry.counter(
+    "omnidispatch_embedding_store_lookups_total", "Persistent embedding store lookups by result", ["model", "result"]
+)
+EMBEDDING_ROWS = registry.gauge(
+    "omnidispatch_embedding_store_rows", "Embeddings held by the persistent store", ["model"]
+)
+
+KEY_BYTES = 32
+
+
+def text_key(text: str) -> bytes:
+    return hashlib.sha256(text.encode("utf-8")).digest()
+
+
+class EmbeddingStore:
+    """Append-only float32 matrix plus sha256 index for one embedding model"""
+
+    def __init__(self, model: str, directory: Optional[str] = None):
+        root = directory if directory is not None else os.getenv("EMBEDDING_CACHE_DIR", "./embedding_cache")
+        self.model = model
+        self.directory = os.path.join(root, re.sub(r"[^A-Za-z0-9._-]+", "_", model))
+        os.makedirs(self.directory, exist_ok=True)
+        self.dim: Optional[int] = None
+        self.rows = 0
+        self._index: Dict[bytes, int] = {}
+        self._vectors: Optional[np.memmap] = None
+        self._lock = threading.Lock()
+        self._counts = {"hit": 0, "miss": 0}
+        if self._load_meta():
+            with self._file_lock():
+                self._repair()
+                self._sync()
+        EMBEDDING_ROWS.set_function(lambda: self.rows, model=model)
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    @contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        with open(self._path(".lock"), "a+") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            else:
+                # Locks the lock file's first byte; LK_LOCK retries for ~10 s before raising
+                lock.seek(0)
+                msvcrt.locking(lock.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+                else:
+                    lock.seek(0)
+                    msvcrt.locking(lock.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def _load_meta(self) -> bool:
+        """Read the vector dimension if the store has been written to; False if it is empty"""
+        if self.dim is not None:
+            return True
+        meta_path = self._path("meta.json")
+        if not os.path.exists(meta_path):
+            return False
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if meta.get("model") != self.model:
+            raise ValueError(f"{self.directory} holds embeddings for {meta.get('model')!r}, not {self.model!r}")
+        self.dim = int(meta["dim"])
+        return True
+
+    def _repair(self):
+        """Cut vectors.f32 and keys.bin back to the rows both of them hold completely"""
+        vectors, keys = self._path("vectors.f32"), self._path("keys.bin")
+        if not os.path.exists(vectors) or not os.path.exists(keys):
+            return
+        rows = min(os.path.getsize(vectors) // (4 * self.dim), os.path.getsize(keys) // KEY_BYTES)
+        for path, size in ((vectors, rows * 4 * self.dim), (keys, rows * KEY_BYTES)):
+            if os.path.getsize(path) > size:
+                logger.warning("truncating torn embedding store append", extra={"file": path, "rows": rows})
+                os.truncate(path, size)
+
+    def _sync(self):
+        """Index rows appended since the last sync, by this or another process"""
+        keys = self._path("keys.bin")
+        if not os.path.exists(keys) or not self._load_meta():
+            return
+        with open(keys, "rb") as f:
+            f.seek(self.rows * KEY_BYTES)
+            data = f.read()
+        for i in range(len(data) // KEY_BYTES):
+            self._index.setdefault(data[i * KEY_BYTES:(i + 1) * KEY_BYTES], self.rows + i)
+        self.rows += len(data) // KEY_BYTES
+
+    def _grown(self) -> bool:
+        """Whether another process appended rows since the last sync"""
+        try:
+            return os.path.getsize(self._path("keys.bin")) >= (self.rows + 1) * KEY_BYTES
+        except OSError:
+            return False
+
+    def _matrix(self) -> np.memmap:
+        if self._vectors is None or len(self._vectors) < self.rows:
+            self._vectors = np.memmap(self._path("vectors.f32"), dtype=np.float32, mode="r",
+                                      shape=(self.rows, self.dim))
+        return self._vectors
+
+    def get_many(self, texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """Stored embedding per text, None where missing"""
+        with self._lock:
+            keys = [text_key(text) for text in texts]
+            rows = [self._index.get(key) for key in keys]
+            if None in rows and self._grown():
+                self._sync()
+                rows = [self._index.get(key) for key in keys]
+            matrix = self._matrix() if self.rows and any(r is not None for r in rows) else None
+            found = [np.array(matrix[row]) if row is not None else None for row in rows]
+        hits = sum(v is not None for v in found)
+        self._counts["hit"] += hits
+        self._counts["miss"] += len(found) - hits
+        EMBEDDING_LOOKUPS.inc(hits, model=self.model, result="hit")
+        EMBEDDING_LOOKUPS.inc(len(found) - hits, model=self.model, result="miss")
+        return found
+
+    def put_many(self, texts: Sequence[str], vectors: Sequence) -> int:
+        """Append embeddings for texts not stored yet; returns how many were added"""
+        if not texts:
+            return 0
+        matrix = np.asarray(vectors, dtype=np.float32)
+        with self._lock, self._file_lock():
+            if not self._load_meta():
+                self.dim = int(matrix.shape[1])
+                with open(self._path("meta.json"), "w") as f:
+                    json.dump({"model": self.model, "dim": self.dim}, f)
+            elif matrix.shape[1] != self.dim:
+                raise ValueError(f"{self.model} embeddings have dimension {self.dim}, got {matrix.shape[1]}")
+            self._repair()
+            self._sync()
+            new_rows, new_keys, seen = [], [], set()
+            for i, text in enumerate(texts):
+                key = text_key(text)
+                if key not in self._index and key not in seen:
+                    seen.add(key)
+                    new_rows.append(i)
+                    new_keys.append(key)
+            if not new_rows:
+                return 0
+            # Vectors first: a crash between the writes leaves rows without keys, which _repair cuts off
+            with open(self._path("vectors.f32"), "ab") as f:
+                f.write(matrix[new_rows].tobytes())
+            with open(self._path("keys.bin"), "ab") as f:
+                f.write(b"".join(new_keys))
+            for key in new_keys:
+                self._index[key] = self.rows
+                self.rows += 1
+        return len(new_rows)
+
+    def embed(self, texts: Sequence[str], embed_fn: Callable[[List[str]], Sequence]) -> List[np.ndarray]:
+        """Embeddings for texts, calling embed_fn once on the ones not stored yet"""
+        found = self.get_many(texts)
+        missing = [i for i, vector in enumerate(found) if vector is None]
+        if missing:
+            computed = embed_fn([texts[i] for i in missing])
+            for i, vector in zip(missing, computed):
+                found[i] = np.asarray(vector, dtype=np.float32)
+            self.put_many([texts[i] for i in missing], computed)
+        return found
+
+    def stats(self) -> Dict:
+        lookups = sum(self._counts.values())
+        return {"model": self.model, "rows": self.rows, "dim": self.dim,
+                "size_mb": round(self.rows * ((self.dim or 0) * 4 + KEY_BYTES) / 1e6, 2),
+                "lookups": dict(self._counts),
+                "hit_rate": round(self._counts["hit"] / lookups, 3) if lookups else 0.0}
+
+
+class CachingEmbeddingFunction:
+    """
+    Chroma embedding function that serves stored embeddings and only runs the
+    wrapped model on new text; attach it to collections so ingestion uses it too
+    """
+
+    def __init__(self, inner: Callable, store: EmbeddingStore):
+        self.inner = inner
+        self.store = store
+        self.MODEL_NAME = store.model
+
+    def __call__(self, input: List[str]) -> List[np.ndarray]:
+        # Chroma requires the parameter to be called `input`
+        return self.store.embed(list(input), self.inner)
@@ -0,0 +1,93 @@
+"""
+Geohash Encoding
+================
+Base-32 geohashes for bucketing coordinates into cells. Precision 5 is a
+~4.9 km x 4.9 km cell, 6 is ~1.2 km x 0.6 km, 4 is ~39 km x 20 km.
+"""
+
+import math
+from typing import Dict, Optional, Tuple
+
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+_DECODE = {c: i for i, c in enumerate(BASE32)}
+
+# Approximate (width, height) of a cell in km at the equator; width shrinks with cos(lat)
+CELL_KM = {2: (1250.0, 625.0), 3: (156.0, 156.0), 4: (39.0, 19.5), 5: (4.9, 4.9), 6: (1.2, 0.61)}
+
+
+def encode(lat: float, lng: float, precision: int = 5) -> str:
+    """Geohash of a coordinate at the given number of characters"""
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    value = 0
+    even = True  # bits alternate longitude, latitude
+    while len(chars) < precision:
+        rng, coord = (lng_range, lng) if even else (lat_range, lat)
+        mid = (rng[0] + rng[1]) / 2
+        value <<= 1
+        if coord >= mid:
+            value |= 1
+            rng[0] = mid
+        else:
+            rng[1] = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(BASE32[value])
+            bits = 0
+            value = 0
+    return "".join(chars)
+
+
+def bounds(geohash: str) -> Tuple[float, float, float, float]:
+    """(min_lat, min_lng, max_lat, max_lng) of a geohash cell"""
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    even = True
+    for char in geohash:
+        value = _DECODE[char]
+        for shift in range(4, -1, -1):
+            rng = lng_range if even else lat_range
+            mid = (rng[0] + rng[1]) / 2
+            if (value >> shift) & 1:
+                rng[0] = mid
+            else:
+                rng[1] = mid
+            even = not even
+    return lat_range[0], lng_range[0], lat_range[1], lng_range[1]
+
+
+def decode(geohash: str) -> Tuple[float, float]:
+    """Center (lat, lng) of a geohash cell"""
+    min_lat, min_lng, max_lat, max_lng = bounds(geohash)
+    return (min_lat + max_lat) / 2, (min_lng + max_lng) / 2
+
+
+def neighbors(geohash: str) -> Dict[str, str]:
+    """The eight surrounding cells, keyed by compass direction"""
+    min_lat, min_lng, max_lat, max_lng = bounds(geohash)
+    lat, lng = (min_lat + max_lat) / 2, (min_lng + max_lng) / 2
+    dlat, dlng = max_lat - min_lat, max_lng - min_lng
+    offsets = {"n": (1, 0), "ne": (1, 1), "e": (0, 1), "se": (-1, 1),
+               "s": (-1, 0), "sw": (-1, -1), "w": (0, -1), "nw": (1, -1)}
+    result = {}
+    for direction, (dy, dx) in offsets.items():
+        n_lat = max(-90.0, min(90.0, lat + dy * dlat))
+        n_lng = (lng + dx * dlng + 180.0) % 360.0 - 180.0
+        result[direction] = encode(n_lat, n_lng, len(geohash))
+    return result
+
+
+def precision_for_radius(radius_km: float, lat: float = 0.0) -> Optional[int]:
+    """
+    Finest precision whose cell and eight neighbours still cover `radius_km` around a
+    point at latitude `lat` (the radius fits the cell's smaller side); None if too wide
+    """
+    shrink = max(math.cos(math.radians(lat)), 0.01)
+    for precision in (6, 5, 4, 3, 2):
+        width, height = CELL_KM[precision]
+        if radius_km <= min(width * shrink, height):
+            return precision
+    return None
@@ -0,0 +1,160 @@
+"""
+Incident Time-Series Stats
+==========================
+Rolling incident counts per series (overall, per type, per priority, per
+zone cell) in preallocated NumPy ring buffers of fixed-width time buckets.
+
+    counts  (series, buckets)  int32  one column per bucket, reused as the ring wraps
+    totals  (windows, series)  int64  running sum of each window, per series
+
+Recording adds to the current bucket and to every window's running total.
+When the clock moves into a new bucket, the buckets that just fell out of
+each window are subtracted from its totals (one vectorised column operation
+per window per bucket step), so a windowed count is a single array read no
+matter how much history has been recorded. Windows are aligned to bucket
+boundaries: "1h" is the current partial bucket plus the eleven before it.
+
+Series keys are plain strings; the caller decides the dimensions
+("all", "type:fire", "priority:high", "cell:125:319", ...).
+
+Environment:
+    INCIDENT_STATS_BUCKET_S     bucket width in seconds (default 300)
+    INCIDENT_STATS_MAX_SERIES   initial series capacity, doubled when full (default 1024)
+"""
+
+import math
+import os
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .metrics import registry
+
+INCIDENTS_RECORDED = registry.counter(
+    "omnidispatch_incidents_recorded_total", "Incidents recorded into the time-series stats", ["type"]
+)
+STATS_SERIES = registry.gauge(
+    "omnidispatch_incident_stats_series", "Distinct series tracked by the incident stats"
+)
+
+WINDOWS: Dict[str, int] = {"1h": 3600, "24h": 86400, "7d": 7 * 86400}
+
+
+def zone_cell(lat: float, lng: float, cell_deg: float) -> str:
+    """Series key suffix of the lat/lng cell containing a point"""
+    row = min(int(180 / cell_deg) - 1, max(0, int((lat + 90) // cell_deg)))
+    col = min(int(360 / cell_deg) - 1, max(0, int((lng + 180) // cell_deg)))
+    return f"{row}:{col}"
+
+
+def cell_center(cell: str, cell_deg: float) -> Tuple[float, float]:
+    row, col = (int(part) for part in cell.split(":"))
+    return -90 + (row + 0.5) * cell_deg, -180 + (col + 0.5) * cell_deg
+
+
+class IncidentStats:
+    """Ring-buffered bucket counts with O(1) windowed totals per series"""
+
+    def __init__(self, bucket_s: Optional[int] = None, capacity: Optional[int] = None,
+                 clock: Callable[[], float] = time.time):
+        self.bucket_s = bucket_s or int(os.getenv("INCIDENT_STATS_BUCKET_S", "300"))
+        capacity = capacity or int(os.getenv("INCIDENT_STATS_MAX_SERIES", "1024"))
+        self.clock = clock
+        self.window_names = list(WINDOWS)
+        self.window_buckets = np.array([math.ceil(WINDOWS[w] / self.bucket_s) for w in self.window_names])
+        self.n_buckets = int(self.window_buckets.max())
+        self.counts = np.zeros((capacity, self.n_buckets), dtype=np.int32)
+        self.totals = np.zeros((len(self.window_names), capacity), dtype=np.int64)
+        self.series: Dict[str, int] = {}
+        self.head = int(self.clock() // self.bucket_s)
+        STATS_SERIES.set_function(lambda: len(self.series))
+
+    # ------------------------------------------------------------------
+    # Ring maintenance
+    # ------------------------------------------------------------------
+
+    def _advance(self, now: float):
+        """Move the head to the bucket containing `now`, expiring buckets from each window"""
+        bucket = int(now // self.bucket_s)
+        steps = bucket - self.head
+        if steps <= 0:
+            return
+        n = len(self.series)
+        if steps >= self.n_buckets:
+            self.counts[:n] = 0
+            self.totals[:, :n] = 0
+        else:
+            for b in range(self.head + 1, bucket + 1):
+                for w, length in enumerate(self.window_buckets):
+                    # Bucket b - length has just left window w
+                    self.totals[w, :n] -= self.counts[:n, (b - length) % self.n_buckets]
+                # The slot b reuses held b - n_buckets, already expired from the longest window above
+                self.counts[:n, b % self.n_buckets] = 0
+        self.head = bucket
+
+    def _index(self, key: str) -> int:
+        index = self.series.get(key)
+        if index is None:
+            index = len(self.series)
+            if index == len(self.counts):
+                self.counts = np.concatenate([self.counts, np.zeros_like(self.counts)])
+                self.totals = np.concatenate([self.totals, np.zeros_like(self.totals)], axis=1)
+            self.series[key] = index
+        return index
+
+    # ------------------------------------------------------------------
+    # Recording and queries
+    # ------------------------------------------------------------------
+
+    def record(self, keys: List[str], at: Optional[float] = None):
+        """Count one event in each series; `at` (unix seconds) may be in the past"""
+        now = self.clock()
+        self._advance(now)
+        bucket = int(min(at if at is not None else now, now) // self.bucket_s)
+        age = self.head - bucket
+        if age >= self.n_buckets:
+            return  # older than the longest window
+        rows = [self._index(key) for key in keys]
+        self.counts[rows, bucket % self.n_buckets] += 1
+        for w, length in enumerate(self.window_buckets):
+            if age < length:
+                self.totals[w, rows] += 1
+
+    def count(self, key: str, window: str = "24h") -> int:
+        """Events in `key` over the window; O(1)"""
+        self._advance(self.clock())
+        index = self.series.get(key)
+        if index is None:
+            return 0
+        return int(self.totals[self.window_names.index(window), index])
+
+    def counts_for(self, keys: List[str], window: str = "24h") -> List[int]:
+        """count() for many series at once"""
+        self._advance(self.clock())
+        w = self.window_names.index(window)
+        return [int(self.totals[w, self.series[k]]) if k in self.series else 0 for k in keys]
+
+    def windows(self, key: str) -> Dict[str, int]:
+        """Counts over every window for one series"""
+        self._advance(self.clock())
+        index = self.series.get(key)
+        return {w: int(self.totals[i, index]) if index is not None else 0 for i, w in enumerate(self.window_names)}
+
+    def breakdown(self, prefix: str, window: str = "24h", limit: Optional[int] = None) -> Dict[str, int]:
+        """Non-zero series starting with `prefix`, largest first, keyed without the prefix"""
+        self._advance(self.clock())
+        w = self.window_names.index(window)
+        matched = [(key[len(prefix):], int(self.totals[w, i])) for key, i in self.series.items() if key.startswith(prefix)]
+        matched = sorted((kv for kv in matched if kv[1] > 0), key=lambda kv: kv[1], reverse=True)
+        return dict(matched[:limit] if limit else matched)
+
+    def timeline(self, key: str, window: str = "24h") -> List[int]:
+        """Per-bucket counts over the window, oldest first"""
+        self._advance(self.clock())
+        length = int(self.window_buckets[self.window_names.index(window)])
+        index = self.series.get(key)
+        if index is None:
+            return [0] * length
+        slots = np.arange(self.head - length + 1, self.head + 1) % self.n_buckets
+        return self.counts[index, slots].tolist()
@@ -0,0 +1,221 @@
+"""
+Background Job Manager
+======================
+Runs long analyses (Chronos) off the request path. Submitting returns a job
+id immediately; a fixed pool of worker tasks drains a bounded queue, progress
+events are pushed to listeners (WebSocket broadcast, SSE subscribers) as each
+stage finishes, and results stay fetchable by id for a retention window.
+
+Jobs are deduplicated by key: submitting work for a key that already has a
+queued or running job returns that job instead of starting another.
+"""
+
+import asyncio
+import time
+import uuid
+from datetime import datetime
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from .log import get_logger
+from .metrics import QUEUE_DEPTH, registry
+
+logger = get_logger("jobs")
+
+JOBS_TOTAL = registry.counter(
+    "omnidispatch_jobs_total", "Background jobs by queue and outcome", ["queue", "status"]
+)
+JOB_DURATION = registry.histogram(
+    "omnidispatch_job_duration_seconds", "Background job run time (excluding queue wait)", ["queue"]
+)
+JOB_WAIT = registry.histogram(
+    "omnidispatch_job_queue_wait_seconds", "Time background jobs spent queued", ["queue"]
+)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+ProgressCallback = Callable[[str, Dict], Awaitable[None]]
+JobFunction = Callable[[ProgressCallback], Awaitable[Dict]]
+
+
+class JobQueueFull(Exception):
+    """Raised when the queue is at capacity; callers should retry later"""
+
+
+class Job:
+    """One unit of background work and everything observed about it"""
+
+    def __init__(self, key: str, fn: JobFunction, params: Dict):
+        self.id = uuid.uuid4().hex[:12]
+        self.key = key
+        self.fn = fn
+        self.params = params
+        self.status = QUEUED
+        self.progress: List[Dict] = []
+        self.result: Optional[Dict] = None
+        self.error: Optional[str] = None
+        self.created_at = datetime.now().isoformat()
+        self.enqueued = time.monotonic()
+        self.finished: Optional[float] = None
+        self._listeners: List[asyncio.Queue] = []
+
+    @property
+    def done(self) -> bool:
+        return self.status in (SUCCEEDED, FAILED)
+
+    def to_dict(self, include_result: bool = True) -> Dict:
+        record = {
+            "job_id": self.id,
+            "status": self.status,
+            "params": self.params,
+            "progress": self.progress,
+            "created_at": self.created_at,
+        }
+        if self.error:
+            record["error"] = self.error
+        if include_result and self.result is not None:
+            record["result"] = self.result
+        return record
+
+
+class JobManager:
+    """
+    Bounded queue plus worker pool for one kind of background job
+    """
+
+    def __init__(self, name: str, workers: int = 2, max_queued: int = 32,
+                 retention_s: float = 3600, max_retained: int = 500):
+        self.name = name
+        self.workers = workers
+        self.max_queued = max_queued
+        self.retention_s = retention_s
+        self.max_retained = max_retained
+        self.jobs: Dict[str, Job] = {}
+        self._active_by_key: Dict[str, Job] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker_tasks: List[asyncio.Task] = []
+        self._event_handlers: List[Callable[[Job, Dict], Awaitable[None]]] = []
+        QUEUE_DEPTH.set_function(lambda: self._queue.qsize() if self._queue else 0, queue=f"jobs_{name}")
+
+    def on_event(self, handler: Callable[[Job, Dict], Awaitable[None]]):
+        """Register a coroutine called with (job, event) for every status/progress event"""
+        self._event_handlers.append(handler)
+        return handler
+
+    def _ensure_workers(self):
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queued)
+        self._worker_tasks = [t for t in self._worker_tasks if not t.done()]
+        while len(self._worker_tasks) < self.workers:
+            self._worker_tasks.append(asyncio.get_running_loop().create_task(self._worker()))
+
+    def submit(self, key: str, fn: JobFunction, params: Dict) -> Tuple[Job, bool]:
+        """Queue a job, or return the in-flight job for the same key. Returns (job, deduplicated)"""
+        existing = self._active_by_key.get(key)
+        if existing is not None and not existing.done:
+            return existing, True
+
+        self._ensure_workers()
+        self._prune()
+        job = Job(key, fn, params)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            JOBS_TOTAL.inc(queue=self.name, status="rejected")
+            raise JobQueueFull(f"{self.name} queue is full ({self.max_queued} jobs)")
+        self.jobs[job.id] = job
+        self._active_by_key[key] = job
+        JOBS_TOTAL.inc(queue=self.name, status=QUEUED)
+        return job, False
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.jobs.get(job_id)
+
+    async def subscribe(self, job: Job) -> AsyncIterator[Dict]:
+        """Yield the job's past events, then live ones until it finishes"""
+        listener: asyncio.Queue = asyncio.Queue()
+        for event in job.progress:
+            listener.put_nowait(event)
+        if job.done:
+            listener.put_nowait(self._status_event(job))
+        else:
+            job._listeners.append(listener)
+        try:
+            while True:
+                event = await listener.get()
+                yield event
+                if event.get("status") in (SUCCEEDED, FAILED):
+                    return
+        finally:
+            if listener in job._listeners:
+                job._listeners.remove(listener)
+
+    def _status_event(self, job: Job) -> Dict:
+        event = {"job_id": job.id, "stage": "job", "status": job.status}
+        if job.error:
+            event["error"] = job.error
+        return event
+
+    async def _emit(self, job: Job, event: Dict, record: bool = True):
+        if record:
+            job.progress.append(event)
+        for listener in job._listeners:
+            listener.put_nowait(event)
+        for handler in self._event_handlers:
+            try:
+                await handler(job, event)
+            except Exception as e:
+                logger.warning("job event handler failed", extra={"queue": self.name, "error": str(e)})
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: Job):
+        JOB_WAIT.observe(time.monotonic() - job.enqueued, queue=self.name)
+        job.status = RUNNING
+        await self._emit(job, self._status_event(job), record=False)
+
+        async def progress(stage: str, details: Dict):
+            await self._emit(job, {"job_id": job.id, "stage": stage, **details,
+                                   "elapsed_ms": round((time.monotonic() - started) * 1000, 1)})
+
+        started = time.monotonic()
+        try:
+            job.result = await job.fn(progress)
+            job.status = SUCCEEDED
+        except Exception as e:
+            job.status = FAILED
+            job.error = str(e) or type(e).__name__
+            logger.exception("job failed", extra={"queue": self.name, "job_id": job.id})
+        job.finished = time.monotonic()
+        JOB_DURATION.observe(job.finished - started, queue=self.name)
+        JOBS_TOTAL.inc(queue=self.name, status=job.status)
+        if self._active_by_key.get(job.key) is job:
+            del self._active_by_key[job.key]
+        await self._emit(job, self._status_event(job), record=False)
+
+    def _prune(self):
+        """Forget finished jobs past retention, oldest first, and cap how many are kept"""
+        now = time.monotonic()
+        finished = [j for j in self.jobs.values() if j.done]
+        expired = {j.id for j in finished if now - j.finished > self.retention_s}
+        overflow = len(self.jobs) - len(expired) - self.max_retained
+        if overflow > 0:
+            oldest = sorted((j for j in finished if j.id not in expired), key=lambda j: j.finished)
+            expired.update(j.id for j in oldest[:overflow])
+        for job_id in expired:
+            del self.jobs[job_id]
+
+    def stats(self) -> Dict:
+        counts: Dict[str, int] = {}
+        for job in self.jobs.values():
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return {"queued": self._queue.qsize() if self._queue else 0, "max_queued": self.max_queued,
+                "workers": self.workers, "jobs": counts}
@@ -0,0 +1,277 @@
+"""
+Streaming JSON Extraction
+=========================
+Parses the JSON object an LLM is generating while its tokens are still
+arriving. IncrementalJSONParser is fed raw deltas and reports each top-level
+field as soon as its value is complete, so a triage reply's emergency_type
+and priority are usable long before caller_reassurance has been written.
+
+Replies that are not valid JSON (markdown fences, prose around the object,
+trailing commas, single quotes, Python literals, missing commas, raw
+newlines in strings, truncation at max_tokens) are repaired rather than
+discarded; parse_json_lenient is the one-shot entry point.
+"""
+
+import json
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from .metrics import registry
+
+JSON_REPAIRS = registry.counter(
+    "omnidispatch_llm_json_repairs_total", "LLM JSON replies that failed strict parsing, by repair outcome", ["result"]
+)
+
+_PY_LITERALS = {"True": "true", "False": "false", "None": "null"}
+_WORD = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+def extract_json_text(content: str) -> str:
+    """The part of a reply that should hold the JSON object: inside code fences, from the first brace"""
+    if "```" in content:
+        fenced = content.split("```", 2)[1]
+        if fenced.startswith("json"):
+            fenced = fenced[4:]
+        content = fenced
+    start = content.find("{")
+    return content[start:] if start != -1 else content.strip()
+
+
+def repair_json(text: str) -> str:
+    """Best-effort rewrite of malformed or truncated LLM JSON into parseable JSON"""
+    out: List[str] = []
+    stack: List[str] = []
+    # (output length, stack depth) at each comma outside strings: rollback points for truncated tails
+    commas: List[Tuple[int, int]] = []
+    quote: Optional[str] = None
+    escape = False
+    i = 0
+
+    def last_significant() -> str:
+        for ch in reversed(out):
+            if not ch.isspace():
+                return ch
+        return ""
+
+    def needs_comma() -> bool:
+        # A new key/value directly after a finished value means the model dropped a comma
+        prev = last_significant()
+        return bool(stack) and (prev in '"}]' or prev.isdigit() or prev in "el")
+
+    while i < len(text):
+        c = text[i]
+        if quote is not None:
+            if escape:
+                escape = False
+                out.append(c)
+            elif c == "\\":
+                escape = True
+                out.append(c)
+            elif c == quote:
+                quote = None
+                out.append('"')
+            elif c == '"':
+                out.append('\\"')  # double quote inside a single-quoted string
+            elif c == "\n":
+                out.append("\\n")
+            elif c == "\t":
+                out.append("\\t")
+            elif ord(c) < 0x20:
+                out.append(f"\\u{ord(c):04x}")
+            else:
+                out.append(c)
+            i += 1
+            continue
+
+        if c in "\"'":
+            if needs_comma():
+                out.append(",")
+            quote = c
+            out.append('"')
+        elif c in "{[":
+            if needs_comma():
+                out.append(",")
+            stack.append(c)
+            out.append(c)
+        elif c in "}]":
+            while out and (out[-1].isspace() or out[-1] == ","):
+                out.pop()
+            if stack:
+                out.append(_CLOSERS[stack.pop()])
+            if not stack:
+                break  # end of the top-level value; ignore trailing prose or fences
+        elif c == ",":
+            commas.append((len(out), len(stack)))
+            out.append(c)
+        elif c.isalpha() or c == "_":
+            word = _WORD.match(text, i).group()
+            prev = last_significant()
+            if prev.isdigit() or prev == ".":
+                out.append(word)  # exponent or similar inside a number
+            else:
+                rest = text[i + len(word):].lstrip()
+                if needs_comma():
+                    out.append(",")
+                if rest.startswith(":"):
+                    out.append(json.dumps(word))  # unquoted key
+                else:
+                    out.append(_PY_LITERALS.get(word, word))
+            i += len(word)
+            continue
+        elif (c.isdigit() or c == "-") and needs_comma() and out[-1] not in "0123456789.eE+-":
+            out.append(",")
+            out.append(c)
+        else:
+            out.append(c)
+        i += 1
+
+    if quote is not None:
+        if escape:
+            out.pop()
+        out.append('"')
+    candidate = _close("".join(out), stack)
+    try:
+        json.loads(candidate)
+        return candidate
+    except ValueError:
+        pass
+    # Truncated mid-field: drop the incomplete trailing member and close again
+    for length, depth in reversed(commas):
+        candidate = _close("".join(out[:length]), stack[:depth])
+        try:
+            json.loads(candidate)
+            return candidate
+        except ValueError:
+            continue
+    return candidate
+
+
+def _close(text: str, stack: List[str]) -> str:
+    text = text.rstrip().rstrip(",").rstrip()
+    if text.endswith(":"):
+        text += " null"
+    return text + "".join(_CLOSERS[b] for b in reversed(stack))
+
+
+def parse_json_lenient(content: str) -> Dict:
+    """Parse the JSON object in an LLM reply, repairing it if needed. Raises ValueError"""
+    text = extract_json_text(content)
+    try:
+        value, _ = json.JSONDecoder().raw_decode(text)
+    except ValueError:
+        try:
+            value = json.loads(repair_json(text))
+        except ValueError:
+            JSON_REPAIRS.inc(result="failed")
+            raise
+        JSON_REPAIRS.inc(result="repaired")
+    if not isinstance(value, dict):
+        raise ValueError(f"expected a JSON object, got {type(value).__name__}")
+    return value
+
+
+class IncrementalJSONParser:
+    """
+    Consumes a streamed reply and yields top-level fields of its JSON object
+    as each value completes. Text before the first '{' (fences, prose) is skipped.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.fields: Dict[str, Any] = {}
+        self.done = False
+        self._pos = 0
+        self._start: Optional[int] = None
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._phase = "key"  # key -> colon -> value -> after
+        self._key_start = 0
+        self._key: Optional[str] = None
+        self._value_start: Optional[int] = None
+        self._value_kind = ""
+
+    def feed(self, chunk: str) -> List[str]:
+        """Add streamed text; returns the names of fields completed by it"""
+        self.buffer += chunk
+        completed: List[str] = []
+        buf = self.buffer
+        while self._pos < len(buf) and not self.done:
+            i, c = self._pos, buf[self._pos]
+            self._pos += 1
+            if self._start is None:
+                if c == "{":
+                    self._start, self._depth = i, 1
+                continue
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._phase == "key":
+                        try:
+                            self._key = _loads_fragment(buf[self._key_start:i + 1])
+                        except ValueError:
+                            self._key = None
+                        self._phase = "colon"
+                    elif self._depth == 1 and self._value_kind == "string":
+                        self._emit(buf[self._value_start:i + 1], completed)
+                continue
+            if c == '"':
+                self._in_string = True
+                if self._depth == 1 and self._phase == "key":
+                    self._key_start = i
+                elif self._depth == 1 and self._phase == "value" and self._value_start is None:
+                    self._value_start, self._value_kind = i, "string"
+            elif c in "{[":
+                if self._depth == 1 and self._phase == "value" and self._value_start is None:
+                    self._value_start, self._value_kind = i, "container"
+                self._depth += 1
+            elif c in "}]":
+                self._depth -= 1
+                if self._depth == 1 and self._value_kind == "container":
+                    self._emit(buf[self._value_start:i + 1], completed)
+                elif self._depth == 0:
+                    if self._value_kind == "scalar":
+                        self._emit(buf[self._value_start:i], completed)
+                    self.done = True
+            elif self._depth == 1:
+                if c == ":" and self._phase == "colon":
+                    self._phase, self._value_start, self._value_kind = "value", None, ""
+                elif c == ",":
+                    if self._value_kind == "scalar":
+                        self._emit(buf[self._value_start:i], completed)
+                    self._phase = "key"
+                elif self._phase == "value" and self._value_start is None and not c.isspace():
+                    self._value_start, self._value_kind = i, "scalar"
+        return completed
+
+    def _emit(self, text: str, completed: List[str]):
+        key = self._key
+        self._phase, self._value_start, self._value_kind = "after", None, ""
+        if not isinstance(key, str):
+            return
+        try:
+            self.fields[key] = _loads_fragment(text.strip())
+        except ValueError:
+            return  # left for the repair pass in result()
+        completed.append(key)
+
+    def result(self) -> Dict:
+        """The whole object, repaired if malformed or truncated; fields seen so far as a last resort"""
+        try:
+            return parse_json_lenient(self.buffer)
+        except ValueError:
+            if self.fields:
+                return dict(self.fields)
+            raise
+
+
+def _loads_fragment(text: str) -> Any:
+    try:
+        return json.loads(text)
+    except ValueError:
+        return json.loads(repair_json(text) if text[:1] in "{[" else _PY_LITERALS.get(text, text))
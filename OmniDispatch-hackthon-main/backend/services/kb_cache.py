@@ -0,0 +1,154 @@
+"""
+Knowledge Base Caches
+=====================
+In-process LRU caches with a TTL in front of the vector store. During a live
+incident the same address and protocol categories are looked up again and
+again; these skip both the query embedding and the vector search.
+
+    results     raw Chroma query results keyed by (collection, normalized query,
+                where filter, n_results), dropped per collection on any write
+    embeddings  query embeddings keyed by (model, normalized query); unaffected
+                by writes since an embedding depends only on the text
+
+Per-collection invalidation uses a generation counter: a search records the
+generation when it starts and its result is only stored if no write to the
+collection happened meanwhile, so a search racing a write never caches
+pre-write results.
+
+Environment:
+    KB_RESULT_CACHE_SIZE      cached query results (default 1024, 0 disables)
+    KB_RESULT_CACHE_TTL_S     result lifetime (default 300)
+    KB_EMBEDDING_CACHE_SIZE   cached query embeddings (default 4096, 0 disables)
+    KB_EMBEDDING_CACHE_TTL_S  embedding lifetime (default 86400)
+"""
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from .metrics import registry
+
+KB_CACHE_LOOKUPS = registry.counter(
+    "omnidispatch_kb_cache_lookups_total", "Knowledge base cache lookups by result", ["cache", "result"]
+)
+KB_CACHE_HIT_RATIO = registry.gauge(
+    "omnidispatch_kb_cache_hit_ratio", "Share of knowledge base cache lookups served from the cache", ["cache"]
+)
+KB_CACHE_ENTRIES = registry.gauge(
+    "omnidispatch_kb_cache_entries", "Entries held by a knowledge base cache", ["cache"]
+)
+
+HIT = "hit"
+MISS = "miss"
+EXPIRED = "expired"
+
+
+def normalize_query(query: str) -> str:
+    """Case- and whitespace-insensitive form of a query (the default embedding model is uncased)"""
+    return " ".join(query.lower().split())
+
+
+def filter_key(where: Optional[Dict]) -> str:
+    return json.dumps(where, sort_keys=True, default=str) if where else ""
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries also expire after ttl_s"""
+
+    def __init__(self, name: str, max_entries: int, ttl_s: float, clock=time.monotonic):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.clock = clock
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counts = {HIT: 0, MISS: 0, EXPIRED: 0}
+        KB_CACHE_HIT_RATIO.set_function(self.hit_rate, cache=name)
+        KB_CACHE_ENTRIES.set_function(lambda: len(self._entries), cache=name)
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        """(found, value); expired entries count as misses and are dropped"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                result = MISS
+            elif self.clock() - entry[0] > self.ttl_s:
+                del self._entries[key]
+                result = EXPIRED
+            else:
+                self._entries.move_to_end(key)
+                result = HIT
+            self._counts[result] += 1
+        KB_CACHE_LOOKUPS.inc(cache=self.name, result=result)
+        return (True, entry[1]) if result == HIT else (False, None)
+
+    def put(self, key: Hashable, value: Any):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (self.clock(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def discard(self, predicate) -> int:
+        """Drop every entry whose key matches predicate; returns how many"""
+        with self._lock:
+            stale = [key for key in self._entries if predicate(key)]
+            for key in stale:
+                del self._entries[key]
+        return len(stale)
+
+    def hit_rate(self) -> float:
+        lookups = sum(self._counts.values())
+        return self._counts[HIT] / lookups if lookups else 0.0
+
+    def stats(self) -> Dict:
+        return {"entries": len(self._entries), "max_entries": self.max_entries, "ttl_s": self.ttl_s,
+                "lookups": dict(self._counts), "hit_rate": round(self.hit_rate(), 3)}
+
+
+class ResultCache:
+    """Query results per collection, invalidated by generation on every write"""
+
+    def __init__(self, max_entries: Optional[int] = None, ttl_s: Optional[float] = None):
+        self.cache = TTLCache(
+            "results",
+            max_entries if max_entries is not None else int(os.getenv("KB_RESULT_CACHE_SIZE", "1024")),
+            ttl_s if ttl_s is not None else float(os.getenv("KB_RESULT_CACHE_TTL_S", "300")),
+        )
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def generation(self, collection: str) -> int:
+        return self._generations.get(collection, 0)
+
+    def key(self, collection: str, query: str, where: Optional[Dict], n_results: int) -> Tuple:
+        return (collection, self.generation(collection), normalize_query(query), filter_key(where), n_results)
+
+    def get(self, key: Tuple) -> Tuple[bool, Any]:
+        return self.cache.get(key)
+
+    def put(self, key: Tuple, value: Any):
+        # Skip results of a search that overlapped a write to its collection
+        if key[1] == self.generation(key[0]):
+            self.cache.put(key, value)
+
+    def invalidate(self, collection: str) -> int:
+        with self._lock:
+            self._generations[collection] = self.generation(collection) + 1
+        return self.cache.discard(lambda key: key[0] == collection)
+
+    def stats(self) -> Dict:
+        return {**self.cache.stats(), "generations": dict(self._generations)}
+
+
+def embedding_cache() -> TTLCache:
+    return TTLCache(
+        "embeddings",
+        int(os.getenv("KB_EMBEDDING_CACHE_SIZE", "4096")),
+        float(os.getenv("KB_EMBEDDING_CACHE_TTL_S", "86400")),
+    )
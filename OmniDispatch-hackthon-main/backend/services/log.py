@@ -0,0 +1,160 @@
+"""
+Non-Blocking Structured Logging
+===============================
+Log records are pushed onto a bounded in-memory queue by the request path and
+written out as JSON lines by a background listener thread, so a slow stdout
+pipe or container log driver never stalls the event loop.
+
+Environment:
+    OMNIDISPATCH_ENV   "production" turns request-path verbosity and CrewAI verbose mode off
+    LOG_LEVEL          default level for omnidispatch.* loggers (INFO, WARNING in production)
+    LOG_LEVELS         per-module overrides, e.g. "chronos=DEBUG,jarvis=WARNING"
+    LOG_FORMAT         "json" (default) or "text"
+    LOG_QUEUE_SIZE     records buffered before new ones are dropped (default 10000)
+    CREW_VERBOSE       force CrewAI agent verbosity on/off
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+from .metrics import QUEUE_DEPTH, registry
+
+ROOT_LOGGER = "omnidispatch"
+
+LOG_RECORDS_DROPPED = registry.counter(
+    "omnidispatch_log_records_dropped_total", "Log records dropped because the log queue was full"
+)
+
+# Attributes every LogRecord has; anything else was passed via extra= and is structured data
+_RESERVED_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_log_queue: Optional[queue.Queue] = None
+_configure_lock = threading.Lock()
+
+
+def is_production() -> bool:
+    return os.getenv("OMNIDISPATCH_ENV", "development").lower() in ("production", "prod")
+
+
+def agent_verbose() -> bool:
+    """Whether CrewAI agents and crews should run with verbose=True"""
+    override = os.getenv("CREW_VERBOSE")
+    if override is not None:
+        return override.lower() in ("1", "true", "yes", "on")
+    return not is_production()
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: timestamp, level, logger, message plus extra= fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_info:
+            payload["exc"] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str, ensure_ascii=False)
+
+
+class TextFormatter(logging.Formatter):
+    """Human-readable single line with extra= fields appended as key=value"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = f"{self.formatTime(record, '%H:%M:%S')} {record.levelname:<7} {record.name}: {record.getMessage()}"
+        fields = {k: v for k, v in vars(record).items() if k not in _RESERVED_ATTRS and not k.startswith("_")}
+        if fields:
+            line += " " + " ".join(f"{k}={v}" for k, v in fields.items())
+        if record.exc_info:
+            line += "\n" + self.formatException(record.exc_info)
+        return line
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops (and counts) records instead of blocking when the queue is full"""
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.inc()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Render the message now so the listener thread never touches request objects
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def _parse_levels(spec: str) -> Dict[str, str]:
+    levels = {}
+    for item in spec.split(","):
+        if "=" not in item:
+            continue
+        name, level = item.split("=", 1)
+        name = name.strip()
+        if name and not name.startswith(ROOT_LOGGER):
+            name = f"{ROOT_LOGGER}.{name}"
+        levels[name or ROOT_LOGGER] = level.strip().upper()
+    return levels
+
+
+def configure_logging(stream=None) -> logging.Logger:
+    """Install the queue-backed handler on the omnidispatch logger (idempotent)"""
+    global _listener, _log_queue
+    with _configure_lock:
+        root = logging.getLogger(ROOT_LOGGER)
+        if _listener is not None:
+            return root
+
+        default_level = os.getenv("LOG_LEVEL", "WARNING" if is_production() else "INFO").upper()
+        root.setLevel(default_level)
+        root.propagate = False
+        for name, level in _parse_levels(os.getenv("LOG_LEVELS", "")).items():
+            logging.getLogger(name).setLevel(level)
+
+        output = logging.StreamHandler(stream or sys.stdout)
+        output.setFormatter(TextFormatter() if os.getenv("LOG_FORMAT", "json") == "text" else JsonFormatter())
+
+        _log_queue = queue.Queue(maxsize=int(os.getenv("LOG_QUEUE_SIZE", "10000")))
+        root.handlers = [NonBlockingQueueHandler(_log_queue)]
+        _listener = logging.handlers.QueueListener(_log_queue, output, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+        return root
+
+
+def shutdown_logging():
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    with _configure_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Logger under the omnidispatch namespace, configuring logging on first use"""
+    configure_logging()
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+
+def queue_depth() -> int:
+    return _log_queue.qsize() if _log_queue is not None else 0
+
+
+QUEUE_DEPTH.set_function(queue_depth, queue="log")
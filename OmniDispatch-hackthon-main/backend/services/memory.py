@@ -0,0 +1,199 @@
+"""
+Token-Budgeted Conversation Memory
+==================================
+Keeps JARVIS prompts inside a per-request token budget: the newest turns are
+sent verbatim, older turns are folded into a rolling summary in the
+background, and only the survival-manual sections relevant to the current
+emergency are inlined.
+"""
+
+import asyncio
+import os
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from .log import get_logger
+from .metrics import registry
+
+logger = get_logger("memory")
+
+PROMPT_TOKENS = registry.histogram(
+    "omnidispatch_jarvis_prompt_tokens", "Estimated prompt tokens sent per JARVIS request",
+    buckets=(100, 200, 400, 600, 800, 1000, 1500, 2000, 3000, 4000)
+)
+SUMMARIES = registry.counter(
+    "omnidispatch_conversation_summaries_total", "Conversation summarization passes by result", ["result"]
+)
+
+# ============================================================================
+# SURVIVAL KNOWLEDGE
+# ============================================================================
+
+SURVIVAL_KNOWLEDGE: Dict[str, str] = {
+    "disaster": """FOR FLOODS:
+- Move to highest floor/point immediately
+- If water is rising in room: find furniture/objects to climb on
+- Look for any drainage (holes, windows) to reduce water
+- If trapped: signal from window, use flashlight/phone light
+- Don't touch electrical outlets if wet
+- If must enter water: remove heavy clothing, hold something buoyant""",
+    "fire": """FOR FIRES:
+- Stay low - smoke rises, cleaner air is near floor
+- Feel doors before opening - if hot, find another exit
+- Cover mouth with wet cloth if available
+- If clothes catch fire: STOP, DROP, ROLL
+- Close doors behind you to slow fire spread
+- If trapped: seal door cracks, signal from window""",
+    "medical": """FOR MEDICAL:
+- Keep patient still and calm
+- Apply pressure to bleeding wounds
+- For choking: back blows then abdominal thrusts
+- For unconscious: check breathing, recovery position
+- For chest pain: have them chew aspirin if available, sit upright""",
+    "crime": """FOR CRIMES:
+- Stay hidden and quiet if intruder present
+- Lock/barricade if possible
+- Note descriptions: height, clothing, direction of travel
+- Don't confront armed individuals""",
+    "accident": """FOR ACCIDENTS:
+- Don't move injured unless in immediate danger
+- Turn off vehicle ignition if possible
+- Direct traffic away if safe to do so
+- Check for breathing and consciousness""",
+}
+
+# Mentions in the caller's latest message that pull in another section
+SECTION_KEYWORDS: Dict[str, List[str]] = {
+    "disaster": ["flood", "water", "rising", "drown"],
+    "fire": ["fire", "smoke", "burning", "flames"],
+    "medical": ["bleeding", "breathing", "unconscious", "choking", "chest", "injured", "hurt"],
+    "crime": ["intruder", "gun", "weapon", "break-in", "attacker"],
+    "accident": ["crash", "car", "vehicle", "collision"],
+}
+
+
+def relevant_survival_knowledge(emergency_type: Optional[str], transcript: str = "") -> str:
+    """Manual sections for the emergency type plus any the caller just mentioned"""
+    text = transcript.lower()
+    sections = []
+    if emergency_type in SURVIVAL_KNOWLEDGE:
+        sections.append(emergency_type)
+    for name, keywords in SECTION_KEYWORDS.items():
+        if name not in sections and any(word in text for word in keywords):
+            sections.append(name)
+    if not sections:
+        # Unknown situation: the full manual is still cheaper than bad advice
+        sections = list(SURVIVAL_KNOWLEDGE)
+    return "\n\n".join(SURVIVAL_KNOWLEDGE[name] for name in sections)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough Llama-style token estimate (~4 characters per token)"""
+    return len(text) // 4 + 1
+
+
+def _message_tokens(message: Dict) -> int:
+    # Chat templates add a few tokens of role/formatting overhead per message
+    return estimate_tokens(message.get("content", "")) + 4
+
+
+# ============================================================================
+# CONVERSATION MEMORY
+# ============================================================================
+
+Summarizer = Callable[[str, List[Dict]], Awaitable[str]]
+
+
+def local_summary(previous_summary: str, turns: List[Dict], max_chars: int = 600) -> str:
+    """Extractive fallback: keep what the caller said, newest last, within max_chars"""
+    caller_lines = [t["content"].strip() for t in turns if t["role"] == "user"]
+    combined = " | ".join(filter(None, [previous_summary] + caller_lines))
+    return combined[-max_chars:]
+
+
+class ConversationMemory:
+    """
+    Per-call conversation history with a token budget and rolling summary
+    """
+
+    def __init__(self, token_budget: Optional[int] = None, keep_recent: int = 4,
+                 summarize_after: int = 8, max_turns: int = 40,
+                 summarizer: Optional[Summarizer] = None):
+        self.token_budget = token_budget or int(os.getenv("JARVIS_TOKEN_BUDGET", "1200"))
+        self.keep_recent = keep_recent
+        self.summarize_after = summarize_after
+        self.max_turns = max_turns
+        self.summarizer = summarizer
+        self.turns: List[Dict] = []
+        self.summary = ""
+        self._summary_task: Optional[asyncio.Task] = None
+
+    def add(self, role: str, content: str):
+        self.turns.append({"role": role, "content": content})
+        if len(self.turns) > self.max_turns:
+            # Summarizer is falling behind; fold synchronously so history stays bounded
+            overflow = self.turns[:len(self.turns) - self.keep_recent]
+            self.summary = local_summary(self.summary, overflow)
+            self.turns = self.turns[len(overflow):]
+            SUMMARIES.inc(result="overflow")
+
+    def build_messages(self, system_prompt: str) -> List[Dict]:
+        """System prompt, rolling summary and as many recent turns as the budget allows"""
+        messages = [{"role": "system", "content": system_prompt}]
+        if self.summary:
+            messages.append({"role": "system", "content": f"EARLIER IN THIS CALL: {self.summary}"})
+        used = sum(_message_tokens(m) for m in messages)
+
+        recent: List[Dict] = []
+        for turn in reversed(self.turns):
+            cost = _message_tokens(turn)
+            # The caller's latest message is always sent, even over budget
+            if recent and used + cost > self.token_budget:
+                break
+            recent.append(turn)
+            used += cost
+        messages.extend(reversed(recent))
+        PROMPT_TOKENS.observe(used)
+        return messages
+
+    def schedule_summary(self):
+        """Fold older turns into the summary in the background once enough have piled up"""
+        if self._summary_task is not None and not self._summary_task.done():
+            return
+        if len(self.turns) <= self.summarize_after:
+            return
+        try:
+            self._summary_task = asyncio.get_running_loop().create_task(self._summarize_older_turns())
+        except RuntimeError:
+            self.add_summary_locally()
+
+    def add_summary_locally(self):
+        older = self.turns[:len(self.turns) - self.keep_recent]
+        self.summary = local_summary(self.summary, older)
+        self.turns = self.turns[len(older):]
+
+    async def _summarize_older_turns(self):
+        older = self.turns[:len(self.turns) - self.keep_recent]
+        if not older:
+            return
+        previous = self.summary
+        try:
+            summary = await self.summarizer(previous, older) if self.summarizer else ""
+            result = "llm" if summary else "local"
+        except Exception as e:
+            logger.warning("conversation summarization failed", extra={"error": str(e)})
+            summary, result = "", "local"
+        if not summary:
+            summary = local_summary(previous, older)
+        # reset() may have started a new call while we were summarizing
+        if self.turns[:len(older)] != older:
+            return
+        self.summary = summary.strip()
+        self.turns = self.turns[len(older):]
+        SUMMARIES.inc(result=result)
+
+    def reset(self):
+        if self._summary_task is not None and not self._summary_task.done():
+            self._summary_task.cancel()
+        self._summary_task = None
+        self.turns = []
+        self.summary = ""
@@ -0,0 +1,183 @@
+"""
+Crew Plan Router
+================
+Picks how much of the dispatch crew an emergency call gets, from the fast
+triage result that is already available before any agent runs. A sprained
+knee does not need three agents with full prompts; a multi-casualty hazmat
+fire does.
+
+Plans, cheapest first:
+
+    local         no agents: units are dispatched straight from the triage
+    single        the orchestrator alone, on a compact prompt fed the triage
+    full          intake + historian + orchestrator (DISPATCH_CREW_MODE)
+    hierarchical  the full crew under a manager LLM that delegates and reviews
+
+The complexity score adds up priority, victim count, agencies involved,
+special equipment, immediate danger and disasters from the triage, plus cues
+in the caller's own words (the triage description is often a truncated
+summary): hazardous scenes, life threats, active threats and mass-casualty
+language. Reassurance from the caller ("nobody is hurt", "minor") lowers
+the score of a single-victim call with none of those cues. The plan is the
+most expensive one whose threshold the score reaches. Critical priority sets
+a floor of the full crew, and a call with no triage gets the full crew.
+
+Routing is off by default (CREW_ROUTING=full): every call runs the full
+crew. The cue terms and thresholds were tuned on the labelled calls in
+benchmarks/plan_routing.py and under-route critical calls in its held-out
+set, which the harness reports separately. Enable adaptive routing only once
+the held-out set shows no under-routed critical calls.
+
+Environment:
+    CREW_ROUTING             "full" (default) or "adaptive" to route calls by complexity
+    CREW_ROUTER_THRESHOLDS   minimum score per plan (default "single=2,full=4,hierarchical=8")
+"""
+
+import os
+import re
+from typing import Dict, List, Optional
+
+from .metrics import registry
+
+CREW_PLANS = registry.counter(
+    "omnidispatch_crew_plans_total", "Dispatch crew execution plans chosen by the router", ["plan"]
+)
+
+PLANS: List[str] = ["local", "single", "full", "hierarchical"]
+
+DEFAULT_THRESHOLDS: Dict[str, int] = {"single": 2, "full": 4, "hierarchical": 8}
+
+PRIORITY_POINTS: Dict[str, int] = {"low": 0, "medium": 1, "high": 2, "critical": 4}
+
+# Cheapest plan allowed for a priority, whatever the score. High has no floor: the keyword triage marks
+# nearly every injury high, and its low-acuity calls must still be able to route local
+PRIORITY_FLOOR: Dict[str, str] = {"critical": "full"}
+
+# Cue terms are whole words or phrases: "armed" must not match "alarmed", nor "shot" "screenshot"
+HAZARD_TERMS = ("hazmat", "chemical", "chemicals", "toxic", "fumes", "gas leak", "smell of gas", "radiation",
+                "explosion", "exploded", "explosive", "collapse", "collapsed", "trapped", "extrication", "buried",
+                "tanker")
+LIFE_THREAT_TERMS = ("not breathing", "unconscious", "unresponsive", "cpr", "chest pain", "stabbed", "shot",
+                     "bleeding from", "bleeding a lot", "severe bleeding", "overdose", "overdosed", "seizure",
+                     "stroke", "choking")
+ACTIVE_THREAT_TERMS = ("gunman", "shooter", "shooting", "shots fired", "armed", "hostage", "bomb")
+# Language implying many victims when the triage counted only one or two
+MASS_CASUALTY_TERMS = ("multiple", "several people", "many people", "lots of", "dozens", "passengers", "workers",
+                       "people inside")
+
+
+def _cue(terms) -> re.Pattern:
+    return re.compile(r"\b(?:" + "|".join(map(re.escape, terms)) + r")\b")
+
+
+HAZARD_CUE = _cue(HAZARD_TERMS)
+LIFE_THREAT_CUE = _cue(LIFE_THREAT_TERMS)
+ACTIVE_THREAT_CUE = _cue(ACTIVE_THREAT_TERMS)
+MASS_CASUALTY_CUE = _cue(MASS_CASUALTY_TERMS)
+# Reassurance that lowers the score, ignored when any danger cue above is present
+LOW_ACUITY_TERMS = ("nobody is hurt", "nobody's hurt", "nobody hurt", "nobody is injured", "nobody's injured",
+                    "no one is hurt", "no one's hurt", "no one hurt", "no one is injured", "no one injured",
+                    "no injuries", "not injured", "uninjured", "minor", "small", "a bit", "a little", "mild",
+                    "awake and talking", "talking normally", "breathing normally", "last night", "yesterday")
+LOW_ACUITY_CUE = _cue(LOW_ACUITY_TERMS)
+LOW_ACUITY_POINTS = 2
+
+
+def _parse_thresholds(spec: str) -> Dict[str, int]:
+    thresholds = dict(DEFAULT_THRESHOLDS)
+    for item in spec.split(","):
+        name, _, value = item.partition("=")
+        if name.strip() in thresholds and value.strip():
+            thresholds[name.strip()] = int(value)
+    return thresholds
+
+
+def _victims(triage: Dict) -> int:
+    try:
+        return max(0, int(triage.get("number_of_victims") or 0))
+    except (TypeError, ValueError):
+        return 0
+
+
+def complexity(triage: Dict, transcript: str = "") -> Dict:
+    """Score a triage result and the caller's transcript; returns {"score", "reasons"}"""
+    score, reasons = 0, []
+
+    def add(points: int, reason: str):
+        nonlocal score
+        if points:
+            score += points
+            reasons.append(f"{reason} (+{points})")
+
+    priority = str(triage.get("priority", "medium")).lower()
+    add(PRIORITY_POINTS.get(priority, 1), f"{priority} priority")
+
+    victims = _victims(triage)
+    victim_points = 3 if victims >= 10 else 2 if victims >= 5 else 1 if victims >= 2 else 0
+    add(victim_points, f"{victims} victims")
+
+    agencies = sum(bool(triage.get(k)) for k in ("requires_fire", "requires_medical", "requires_police"))
+    add(agencies - 1 if agencies > 1 else 0, f"{agencies} agencies")
+
+    equipment = [str(e) for e in triage.get("special_equipment") or [] if e]
+    add(min(len(equipment), 2), "special equipment")
+
+    text = " ".join(equipment + [str(triage.get("description", "")), transcript]).lower()
+    hazard, life_threat, active_threat, mass_casualty = (
+        bool(cue.search(text)) for cue in (HAZARD_CUE, LIFE_THREAT_CUE, ACTIVE_THREAT_CUE, MASS_CASUALTY_CUE)
+    )
+    add(2 if hazard else 0, "hazardous scene")
+    add(2 if life_threat else 0, "life threat")
+    add(2 if active_threat else 0, "active threat")
+    add(3 - victim_points if mass_casualty else 0, "mass casualty language")
+
+    add(1 if triage.get("immediate_danger") else 0, "immediate danger")
+    add(1 if str(triage.get("emergency_type", "")).lower() == "disaster" else 0, "disaster")
+    danger = hazard or life_threat or active_threat or mass_casualty
+    if victims <= 1 and not danger and LOW_ACUITY_CUE.search(text):
+        score -= LOW_ACUITY_POINTS
+        reasons.append(f"low acuity language (-{LOW_ACUITY_POINTS})")
+    return {"score": score, "reasons": reasons}
+
+
+class PlanRouter:
+    """Maps triage results to crew execution plans"""
+
+    def __init__(self, thresholds: Optional[Dict[str, int]] = None, adaptive: Optional[bool] = None):
+        self.thresholds = thresholds or _parse_thresholds(os.getenv("CREW_ROUTER_THRESHOLDS", ""))
+        self.adaptive = adaptive if adaptive is not None else os.getenv("CREW_ROUTING", "full") == "adaptive"
+
+    def route(self, triage: Optional[Dict], transcript: str = "") -> Dict:
+        """The plan for a call: {"plan", "score", "reasons"}"""
+        if not triage:
+            decision = {"plan": "full", "score": None, "reasons": ["no triage available"]}
+        elif not self.adaptive:
+            decision = {"plan": "full", "score": None, "reasons": ["adaptive routing disabled"]}
+        else:
+            decision = complexity(triage, transcript)
+            plan = "local"
+            for name in PLANS[1:]:
+                if decision["score"] >= self.thresholds[name]:
+                    plan = name
+            floor = PRIORITY_FLOOR.get(str(triage.get("priority", "")).lower())
+            if floor and PLANS.index(plan) < PLANS.index(floor):
+                plan = floor
+                decision["reasons"].append(f"{triage.get('priority')} priority requires at least {floor}")
+            decision["plan"] = plan
+        CREW_PLANS.inc(plan=decision["plan"])
+        return decision
+
+
+def local_dispatch(triage: Dict) -> str:
+    """The dispatch summary a local plan returns in place of agent output"""
+    units = [unit for flag, unit in (("requires_fire", "fire engine"), ("requires_medical", "ambulance"),
+                                     ("requires_police", "police unit")) if triage.get(flag)]
+    return (
+        f"{str(triage.get('priority', 'medium')).upper()} {triage.get('emergency_type', 'general')} call: "
+        f"{triage.get('description', '')}\n"
+        f"Dispatch: {', '.join(units) or 'ambulance'} to the caller's location.\n"
+        f"Caller guidance: {triage.get('caller_reassurance', 'Help is on the way.')}"
+    )
+
+
+plan_router = PlanRouter()
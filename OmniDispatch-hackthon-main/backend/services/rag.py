@@ -2,12 +2,257 @@
 RAG Knowledge Base Integration
 ==============================
 ChromaDB for historical incidents and safety protocols (Local Storage)
+
+Bulk loading: upsert_incidents / upsert_buildings / upsert_protocols take any
+iterable of records (a generator over a file is fine), cut it into chunks of
+CHROMA_BATCH_SIZE, look up which ids of a chunk are already stored and write
+the rest with one upsert per chunk, so embeddings are computed a chunk at a
+time. Existing ids are skipped (or overwritten with replace=True) instead of
+raising. From the command line, records stream from CSV or JSONL:
+
+    python -m services.rag load incidents incidents.jsonl --batch-size 1000
+
+Documents: only descriptive text is embedded ("Fire incident at 123 Main St.
+Structure fire in ..."), never a dict repr. Structured fields go into
+metadata so searches can filter on them inside Chroma: type, severity, the
+date as epoch seconds (date_ts), lat/lng and geohash2..geohash6 cells, plus
+the original record as JSON. Search filters are translated to a Chroma
+`where` (build_where), so a query only ranks the matching candidates; a
+`near` filter selects the 3x3 geohash block covering the radius and the exact
+distance is checked afterwards. Records stored before this layout keep their
+old documents until re-loaded with replace=True.
+
+Searches go through two in-process caches (services/kb_cache.py): raw query
+results, dropped per collection whenever that collection is written, and
+query embeddings, so a repeated query skips both the model and the index.
+Behind those, every embedding (documents on ingest, queries on search) goes
+through the persistent store in services/embedding_store.py, keyed by model
+and sha256 of the text, so rebuilds only embed text that changed.
+
+Startup: importing this module opens nothing. `knowledge_base` is a
+LazyKnowledgeBase handle; the app warms it on a worker thread after startup
+(opening the Chroma client, the collections and the embedding model), and
+until it is ready get() raises KnowledgeBaseNotReady instead of blocking, so
+a restarted worker serves traffic immediately and searches degrade.
+
+Environment:
+    CHROMA_PERSIST_DIRECTORY   storage directory (default ./chroma_db)
+    CHROMA_BATCH_SIZE          records per write (default 512, capped by the server's limit)
+    KB_WARM_RETRY_S            wait before retrying a failed warm-up (default 30)
 """
 
+import argparse
+import asyncio
+import csv
+import json
+import math
+import copy
 import os
-from typing import List, Dict
-import chromadb
-from chromadb.config import Settings
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from . import geohash
+from .embedding_store import CachingEmbeddingFunction, EmbeddingStore
+from .kb_cache import ResultCache, embedding_cache, normalize_query
+from .log import get_logger
+from .metrics import registry
+from .tracing import trace_span
+
+logger = get_logger("rag")
+
+KB_INGESTED = registry.counter(
+    "omnidispatch_kb_ingested_total", "Knowledge base records processed by bulk loads", ["collection", "result"]
+)
+KB_READY = registry.gauge(
+    "omnidispatch_kb_ready", "1 once the knowledge base is open and its embedding model loaded"
+)
+
+# (id, document, metadata) as written to a collection
+Record = Tuple[str, str, Dict]
+
+# progress(collection, stats so far) after every chunk
+ProgressCallback = Callable[[str, Dict], None]
+
+
+GEOHASH_PRECISIONS = (2, 3, 4, 5, 6)
+
+# A date filter value: epoch seconds or an ISO date/datetime string
+DateLike = Union[int, float, str]
+
+
+def _int(value, default: int = 0) -> int:
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return default
+
+
+def to_epoch(value: Optional[DateLike]) -> Optional[int]:
+    """Epoch seconds from a number or an ISO date/datetime (naive values are UTC); None if unparseable"""
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    try:
+        return int(float(value))
+    except ValueError:
+        pass
+    try:
+        parsed = datetime.fromisoformat(str(value).strip().replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp())
+
+
+def _coordinates(data: Dict) -> Optional[Tuple[float, float]]:
+    coords = data.get("coordinates") if isinstance(data.get("coordinates"), dict) else data
+    try:
+        return float(coords["lat"]), float(coords.get("lng", coords.get("lon")))
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def _location_fields(data: Dict) -> Dict:
+    """lat/lng and one geohash field per precision, when the record has coordinates"""
+    point = _coordinates(data)
+    if point is None:
+        return {}
+    cell = geohash.encode(*point, precision=max(GEOHASH_PRECISIONS))
+    return {"lat": point[0], "lng": point[1],
+            **{f"geohash{p}": cell[:p] for p in GEOHASH_PRECISIONS}}
+
+
+def _text(*parts: Any) -> str:
+    return " ".join(str(p).strip() for p in parts if p is not None and str(p).strip())
+
+
+def _with_date(metadata: Dict, field: str, value: Any) -> Dict:
+    epoch = to_epoch(value)
+    if epoch is not None:
+        metadata[field] = epoch  # Chroma metadata cannot hold None, so absent dates stay absent
+    return metadata
+
+
+def incident_record(incident_id: str, data: Dict) -> Record:
+    incident_type = str(data.get("type", "unknown")).lower()
+    location = data.get("location", "")
+    document = _text(
+        f"{incident_type.capitalize()} incident" + (f" at {location}." if location else "."),
+        data.get("description"), data.get("notes"),
+    )
+    metadata = {
+        "type": incident_type,
+        "location": location,
+        "date": data.get("date", ""),
+        "severity": str(data.get("severity", "medium")).lower(),
+        **_location_fields(data),
+        "record": json.dumps(data, default=str),
+    }
+    return incident_id, document, _with_date(metadata, "date_ts", data.get("date"))
+
+
+def building_record(building_id: str, data: Dict) -> Record:
+    floors = _int(data.get("floors", 0))
+    building_type = str(data.get("type", "residential")).lower()
+    address = data.get("address", "")
+    document = _text(
+        (f"{floors}-story " if floors else "") + f"{building_type} building" + (f" at {address}." if address else "."),
+        data.get("description"),
+    )
+    return building_id, document, {
+        "address": address,
+        "floors": floors,
+        "type": building_type,
+        "exits": _int(data.get("exits", 0)),
+        **_location_fields(data),
+        "record": json.dumps(data, default=str),
+    }
+
+
+def protocol_record(protocol_id: str, data: Dict) -> Record:
+    metadata = {
+        "title": data.get("title", ""),
+        "category": str(data.get("category", "")).lower(),
+        "version": str(data.get("version", "1.0")),
+        "updated": data.get("updated", "")
+    }
+    return protocol_id, _text(f"{data['title']}." if data.get("title") else None, data.get("content")), _with_date(metadata, "updated_ts", data.get("updated"))
+
+
+def build_where(equals: Optional[Dict[str, Any]] = None, since: Optional[DateLike] = None,
+                until: Optional[DateLike] = None, date_field: str = "date_ts",
+                near: Optional[Tuple[float, float]] = None, radius_km: float = 25.0,
+                where: Optional[Dict] = None) -> Optional[Dict]:
+    """
+    Chroma `where` for the given filters: exact matches (a list means any of),
+    a date range on `date_field`, and the geohash block around `near`. Raises ValueError
+    for an unparseable date.
+    """
+    clauses: List[Dict] = [where] if where else []
+    for field, value in (equals or {}).items():
+        if value is None or value == [] or value == "":
+            continue
+        if isinstance(value, (list, tuple, set)):
+            clauses.append({field: {"$in": list(value)}})
+        else:
+            clauses.append({field: {"$eq": value}})
+    for op, value in (("$gte", since), ("$lte", until)):
+        if value is not None and value != "":
+            epoch = to_epoch(value)
+            if epoch is None:
+                raise ValueError(f"unparseable date {value!r}")
+            clauses.append({date_field: {op: epoch}})
+    if near is not None:
+        precision = geohash.precision_for_radius(radius_km, near[0])
+        if precision is not None:
+            cell = geohash.encode(near[0], near[1], precision)
+            cells = sorted({cell, *geohash.neighbors(cell).values()})
+            clauses.append({f"geohash{precision}": {"$in": cells}})
+    if not clauses:
+        return None
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+
+def _haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    dlat, dlng = math.radians(lat2 - lat1), math.radians(lng2 - lng1)
+    a = math.sin(dlat / 2) ** 2 + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(dlng / 2) ** 2
+    return 6371.0 * 2 * math.asin(math.sqrt(a))
+
+
+def _hits(results: Dict, near: Optional[Tuple[float, float]] = None, radius_km: Optional[float] = None) -> List[Dict]:
+    """Flatten a single-query Chroma result, parsing stored records and applying the exact radius"""
+    hits = []
+    for i in range(len(results['ids'][0])):
+        metadata = dict(results['metadatas'][0][i] or {})
+        record = metadata.pop("record", None)
+        hit = {
+            "id": results['ids'][0][i],
+            "document": results['documents'][0][i],
+            "metadata": metadata,
+            "record": json.loads(record) if record else None,
+            "distance": results['distances'][0][i] if results.get('distances') else None,
+        }
+        if near is not None and "lat" in metadata:
+            hit["distance_km"] = round(_haversine_km(near[0], near[1], metadata["lat"], metadata["lng"]), 3)
+            if radius_km is not None and hit["distance_km"] > radius_km:
+                continue
+        hits.append(hit)
+    return hits
+
+
+def _chunks(items: Iterable, size: int) -> Iterator[List]:
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
 
 class EmergencyKnowledgeBase:
     """
@@ -15,10 +260,26 @@ class EmergencyKnowledgeBase:
     """
     
     def __init__(self):
+        # Imported here so that importing this module stays cheap and works without chromadb
+        import chromadb
+        from chromadb.utils import embedding_functions
+
         # Initialize ChromaDB with persistent storage
         persist_dir = os.getenv("CHROMA_PERSIST_DIRECTORY", "./chroma_db")
         self.client = chromadb.PersistentClient(path=persist_dir)
         
+        # Queries are embedded here (and cached) rather than inside Chroma; documents and queries
+        # both go through the on-disk embedding store unless EMBEDDING_CACHE_DIR is empty
+        model = self._model = embedding_functions.DefaultEmbeddingFunction()
+        self.embedding_model = getattr(model, "MODEL_NAME", type(model).__name__)
+        self.embedding_store: Optional[EmbeddingStore] = None
+        if os.getenv("EMBEDDING_CACHE_DIR", "./embedding_cache"):
+            self.embedding_store = EmbeddingStore(self.embedding_model)
+            model = CachingEmbeddingFunction(model, self.embedding_store)
+        self.embedding_function = model
+        self.result_cache = ResultCache()
+        self.embedding_cache = embedding_cache()
+        
         # Create collections
         self.incidents_collection = self._get_or_create_collection("historical_incidents")
         self.buildings_collection = self._get_or_create_collection("building_blueprints")
@@ -27,73 +288,164 @@ class EmergencyKnowledgeBase:
     def _get_or_create_collection(self, name: str):
         """Get or create a ChromaDB collection"""
         try:
-            return self.client.get_collection(name)
+            return self.client.get_collection(name, embedding_function=self.embedding_function)
         except:
-            return self.client.create_collection(name)
+            return self.client.create_collection(name, embedding_function=self.embedding_function)
+    
+    def warm(self):
+        """Load the embedding model and touch each collection ahead of the first query"""
+        # The raw model: a stored embedding would skip loading it
+        self._model(["warm-up"])
+        for collection in (self.incidents_collection, self.buildings_collection, self.protocols_collection):
+            collection.count()
+    
+    def _embed_query(self, query: str):
+        """Embedding of a normalized query, from the embedding cache when possible"""
+        text = normalize_query(query)
+        key = (self.embedding_model, text)
+        found, embedding = self.embedding_cache.get(key)
+        if not found:
+            with trace_span("embed_query", model=self.embedding_model):
+                embedding = self.embedding_function([text])[0]
+            self.embedding_cache.put(key, embedding)
+        return embedding
+    
+    def _query(self, collection, query: str, n_results: int, where: Optional[Dict]) -> Dict:
+        """collection.query() behind the result cache; callers get their own copy"""
+        key = self.result_cache.key(collection.name, query, where, n_results)
+        found, results = self.result_cache.get(key)
+        if not found:
+            embedding = self._embed_query(query)
+            with trace_span("chroma_query", collection=collection.name, filtered=where is not None):
+                results = collection.query(query_embeddings=[embedding], n_results=n_results, where=where)
+            self.result_cache.put(key, results)
+        return copy.deepcopy(results)
+    
+    def _written(self, collection):
+        self.result_cache.invalidate(collection.name)
+    
+    def cache_stats(self) -> Dict:
+        return {"results": self.result_cache.stats(), "embeddings": self.embedding_cache.stats(),
+                "embedding_model": self.embedding_model,
+                "embedding_store": self.embedding_store.stats() if self.embedding_store else None}
+    
+    def _batch_size(self, batch_size: Optional[int]) -> int:
+        size = batch_size or int(os.getenv("CHROMA_BATCH_SIZE", "512"))
+        # The server caps how many records one call may carry
+        limit = getattr(self.client, "get_max_batch_size", None)
+        limit = limit() if callable(limit) else getattr(self.client, "max_batch_size", None)
+        return min(size, limit) if limit else size
+    
+    def _bulk_upsert(self, collection, records: Iterable[Record], batch_size: Optional[int] = None,
+                     replace: bool = False, on_progress: Optional[ProgressCallback] = None) -> Dict:
+        """Write records a chunk at a time; returns counts of added, replaced and skipped ids"""
+        size = self._batch_size(batch_size)
+        stats = {"seen": 0, "added": 0, "replaced": 0, "skipped": 0, "batches": 0}
+        started = time.perf_counter()
+        for chunk in _chunks(records, size):
+            stats["seen"] += len(chunk)
+            # Last occurrence wins when an id repeats within a chunk
+            unique = {record[0]: record for record in chunk}
+            duplicates = len(chunk) - len(unique)
+            existing = set(collection.get(ids=list(unique), include=[])["ids"])
+            if not replace:
+                for record_id in existing:
+                    del unique[record_id]
+            if unique:
+                with trace_span("chroma_upsert", collection=collection.name):
+                    collection.upsert(
+                        ids=list(unique),
+                        documents=[record[1] for record in unique.values()],
+                        metadatas=[record[2] for record in unique.values()],
+                    )
+                self._written(collection)
+            replaced = len(existing) if replace else 0
+            skipped = duplicates + (0 if replace else len(existing))
+            stats["added"] += len(unique) - replaced
+            stats["replaced"] += replaced
+            stats["skipped"] += skipped
+            stats["batches"] += 1
+            KB_INGESTED.inc(len(unique) - replaced, collection=collection.name, result="added")
+            KB_INGESTED.inc(replaced, collection=collection.name, result="replaced")
+            KB_INGESTED.inc(skipped, collection=collection.name, result="skipped")
+            if on_progress:
+                on_progress(collection.name, dict(stats))
+        stats["seconds"] = round(time.perf_counter() - started, 3)
+        logger.info("bulk upsert complete", extra={"collection": collection.name, **stats})
+        return stats
+    
+    def upsert_incidents(self, incidents: Iterable[Dict], **options) -> Dict:
+        """
+        Bulk-load historical incidents (dicts with an "id"); see _bulk_upsert for options
+        """
+        return self._bulk_upsert(self.incidents_collection,
+                                 (incident_record(str(i["id"]), i) for i in incidents), **options)
+    
+    def upsert_buildings(self, buildings: Iterable[Dict], **options) -> Dict:
+        """
+        Bulk-load building records (dicts with an "id")
+        """
+        return self._bulk_upsert(self.buildings_collection,
+                                 (building_record(str(b["id"]), b) for b in buildings), **options)
+    
+    def upsert_protocols(self, protocols: Iterable[Dict], **options) -> Dict:
+        """
+        Bulk-load safety protocols (dicts with an "id")
+        """
+        return self._bulk_upsert(self.protocols_collection,
+                                 (protocol_record(str(p["id"]), p) for p in protocols), **options)
     
     def add_incident(self, incident_id: str, data: Dict):
         """
         Add a historical incident to the knowledge base
         """
-        self.incidents_collection.add(
-            ids=[incident_id],
-            documents=[str(data)],
-            metadatas=[{
-                "type": data.get("type", "unknown"),
-                "location": data.get("location", ""),
-                "date": data.get("date", ""),
-                "severity": data.get("severity", "medium")
-            }]
-        )
-    
-    def search_similar_incidents(self, query: str, n_results: int = 5) -> List[Dict]:
-        """
-        Search for similar historical incidents
-        """
-        results = self.incidents_collection.query(
-            query_texts=[query],
-            n_results=n_results
-        )
-        
-        return [
-            {
-                "id": results['ids'][0][i],
-                "document": results['documents'][0][i],
-                "metadata": results['metadatas'][0][i],
-                "distance": results['distances'][0][i]
-            }
-            for i in range(len(results['ids'][0]))
-        ]
+        record_id, document, metadata = incident_record(incident_id, data)
+        self.incidents_collection.add(ids=[record_id], documents=[document], metadatas=[metadata])
+        self._written(self.incidents_collection)
+    
+    def search_similar_incidents(self, query: str, n_results: int = 5,
+                                 incident_type: Optional[Union[str, List[str]]] = None,
+                                 severity: Optional[Union[str, List[str]]] = None,
+                                 since: Optional[DateLike] = None, until: Optional[DateLike] = None,
+                                 near: Optional[Tuple[float, float]] = None, radius_km: float = 25.0,
+                                 where: Optional[Dict] = None) -> List[Dict]:
+        """
+        Search for similar historical incidents, optionally filtered by type, severity,
+        date range and distance from `near` (lat, lng); filters run inside Chroma
+        """
+        where = build_where({"type": incident_type, "severity": severity}, since, until,
+                            near=near, radius_km=radius_km, where=where)
+        results = self._query(self.incidents_collection, query, n_results, where)
+        return _hits(results, near, radius_km if near is not None else None)
     
     def add_building(self, building_id: str, data: Dict):
         """
         Add building information and blueprints
         """
-        self.buildings_collection.add(
-            ids=[building_id],
-            documents=[str(data)],
-            metadatas=[{
-                "address": data.get("address", ""),
-                "floors": data.get("floors", 0),
-                "type": data.get("type", "residential"),
-                "exits": data.get("exits", 0)
-            }]
-        )
-    
-    def get_building_info(self, address: str) -> Dict:
-        """
-        Retrieve building information by address
-        """
-        results = self.buildings_collection.query(
-            query_texts=[address],
-            n_results=1
-        )
-        
-        if results['ids'][0]:
+        record_id, document, metadata = building_record(building_id, data)
+        self.buildings_collection.add(ids=[record_id], documents=[document], metadatas=[metadata])
+        self._written(self.buildings_collection)
+    
+    def search_buildings(self, query: str, n_results: int = 3, building_type: Optional[str] = None,
+                         near: Optional[Tuple[float, float]] = None, radius_km: float = 1.0,
+                         where: Optional[Dict] = None) -> List[Dict]:
+        """
+        Search building records, optionally by type and distance from `near`
+        """
+        where = build_where({"type": building_type}, near=near, radius_km=radius_km, where=where)
+        results = self._query(self.buildings_collection, query, n_results, where)
+        return _hits(results, near, radius_km if near is not None else None)
+    
+    def get_building_info(self, address: str, near: Optional[Tuple[float, float]] = None) -> Dict:
+        """
+        Retrieve building information by address, within 1 km of `near` if given
+        """
+        hits = self.search_buildings(address, n_results=1, near=near)
+        if hits:
             return {
-                "id": results['ids'][0][0],
-                "data": results['documents'][0][0],
-                "metadata": results['metadatas'][0][0]
+                "id": hits[0]["id"],
+                "data": hits[0]["record"] or hits[0]["document"],
+                "metadata": hits[0]["metadata"]
             }
         return {}
     
@@ -101,36 +453,27 @@ class EmergencyKnowledgeBase:
         """
         Add safety protocol document
         """
-        self.protocols_collection.add(
-            ids=[protocol_id],
-            documents=[data.get("content", "")],
-            metadatas=[{
-                "title": data.get("title", ""),
-                "category": data.get("category", ""),
-                "version": data.get("version", "1.0"),
-                "updated": data.get("updated", "")
-            }]
-        )
+        record_id, document, metadata = protocol_record(protocol_id, data)
+        self.protocols_collection.add(ids=[record_id], documents=[document], metadatas=[metadata])
+        self._written(self.protocols_collection)
     
-    def search_protocols(self, query: str, category: str = None) -> List[Dict]:
+    def search_protocols(self, query: str, category: str = None, n_results: int = 3,
+                         updated_since: Optional[DateLike] = None, where: Optional[Dict] = None) -> List[Dict]:
         """
         Search safety protocols
         """
-        where_filter = {"category": category} if category else None
-        
-        results = self.protocols_collection.query(
-            query_texts=[query],
-            n_results=3,
-            where=where_filter
-        )
+        where_filter = build_where({"category": category.lower() if category else None},
+                                   since=updated_since, date_field="updated_ts", where=where)
         
+        results = self._query(self.protocols_collection, query, n_results, where_filter)
         return [
             {
-                "id": results['ids'][0][i],
-                "content": results['documents'][0][i],
-                "metadata": results['metadatas'][0][i]
+                "id": hit["id"],
+                "content": hit["document"],
+                "metadata": hit["metadata"],
+                "distance": hit["distance"]
             }
-            for i in range(len(results['ids'][0]))
+            for hit in _hits(results)
         ]
     
     def seed_sample_data(self):
@@ -157,11 +500,7 @@ class EmergencyKnowledgeBase:
             }
         ]
         
-        for incident in incidents:
-            try:
-                self.add_incident(incident["id"], incident)
-            except:
-                pass
+        self.upsert_incidents(incidents)
         
         # Sample buildings
         buildings = [
@@ -175,11 +514,7 @@ class EmergencyKnowledgeBase:
             }
         ]
         
-        for building in buildings:
-            try:
-                self.add_building(building["id"], building)
-            except:
-                pass
+        self.upsert_buildings(buildings)
         
         # Sample protocols
         protocols = [
@@ -193,11 +528,142 @@ class EmergencyKnowledgeBase:
             }
         ]
         
-        for protocol in protocols:
+        self.upsert_protocols(protocols)
+
+class KnowledgeBaseNotReady(RuntimeError):
+    """The knowledge base is still warming up, or failed to open"""
+
+
+COLD = "cold"
+WARMING = "warming"
+READY = "ready"
+FAILED = "failed"
+
+
+class LazyKnowledgeBase:
+    """
+    Handle that builds the EmergencyKnowledgeBase on warm() rather than at import;
+    get() never blocks, attribute access (scripts, the CLI) warms on demand
+    """
+
+    def __init__(self, factory: Callable[[], EmergencyKnowledgeBase] = EmergencyKnowledgeBase):
+        self._factory = factory
+        self._instance: Optional[EmergencyKnowledgeBase] = None
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.state = COLD
+        self.error: Optional[str] = None
+        self.warm_ms: Optional[float] = None
+        self.failed_at: Optional[float] = None
+        self.retry_s = float(os.getenv("KB_WARM_RETRY_S", "30"))
+        KB_READY.set_function(lambda: 1.0 if self.state == READY else 0.0)
+
+    @property
+    def ready(self) -> bool:
+        return self.state == READY
+
+    def warm(self) -> EmergencyKnowledgeBase:
+        """Build and warm the knowledge base once; blocks, safe to call from several threads"""
+        with self._lock:
+            if self._instance is not None:
+                return self._instance
+            self.state, self.error = WARMING, None
+            start = time.perf_counter()
             try:
-                self.add_protocol(protocol["id"], protocol)
-            except:
-                pass
+                with trace_span("kb_warm"):
+                    instance = self._factory()
+                    instance.warm()
+            except Exception as e:
+                self.state, self.error = FAILED, f"{type(e).__name__}: {e}"
+                self.failed_at = time.monotonic()
+                logger.warning("knowledge base failed to open", extra={"error": self.error})
+                raise
+            self.warm_ms = round((time.perf_counter() - start) * 1000, 1)
+            self._instance, self.state = instance, READY
+            logger.info("knowledge base ready", extra={"warm_ms": self.warm_ms})
+            return instance
+
+    async def warm_async(self):
+        """warm() on a worker thread; a failure is recorded in state/error rather than raised"""
+        try:
+            await asyncio.to_thread(self.warm)
+        except Exception:
+            pass
+
+    def start_warming(self) -> Optional[asyncio.Task]:
+        """Schedule warm_async() on the running loop unless it is ready, warming or failed within retry_s"""
+        if self.state == FAILED and time.monotonic() - self.failed_at < self.retry_s:
+            return self._task
+        if self.state != READY and (self._task is None or self._task.done()):
+            self.state = WARMING
+            self._task = asyncio.get_running_loop().create_task(self.warm_async())
+        return self._task
+
+    def get(self) -> EmergencyKnowledgeBase:
+        """The knowledge base if it is ready; raises KnowledgeBaseNotReady instead of waiting"""
+        if self._instance is None:
+            raise KnowledgeBaseNotReady(self.error or f"knowledge base is {self.state}")
+        return self._instance
+
+    def status(self) -> Dict:
+        return {"state": self.state, "ready": self.ready, "error": self.error, "warm_ms": self.warm_ms}
+
+    def __getattr__(self, name: str):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.warm(), name)
+
+
+# Shared handle; nothing is opened until it is warmed or used
+knowledge_base = LazyKnowledgeBase()
+
+
+# ============================================================================
+# CLI LOADER
+# ============================================================================
+
+def read_records(path: str, fmt: Optional[str] = None) -> Iterator[Dict]:
+    """Stream dicts from a CSV (header row) or JSONL file without loading it whole"""
+    fmt = fmt or ("csv" if path.lower().endswith(".csv") else "jsonl")
+    with open(path, newline="" if fmt == "csv" else None, encoding="utf-8") as f:
+        if fmt == "csv":
+            for row in csv.DictReader(f):
+                yield row
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-load the emergency knowledge base")
+    sub = parser.add_subparsers(dest="command", required=True)
+    load = sub.add_parser("load", help="Stream records from CSV or JSONL into a collection")
+    load.add_argument("kind", choices=["incidents", "buildings", "protocols"])
+    load.add_argument("path")
+    load.add_argument("--format", choices=["csv", "jsonl"], help="Default: from the file extension")
+    load.add_argument("--id-field", default="id", help="Field holding the record id (default: id)")
+    load.add_argument("--batch-size", type=int)
+    load.add_argument("--replace", action="store_true", help="Overwrite existing ids instead of skipping them")
+    args = parser.parse_args()
+
+    def with_id(records: Iterator[Dict]) -> Iterator[Dict]:
+        for line, record in enumerate(records, 1):
+            if not record.get(args.id_field):
+                logger.warning("record without id skipped", extra={"record": line})
+                continue
+            yield {**record, "id": record[args.id_field]}
+
+    def progress(collection: str, stats: Dict):
+        print(f"\r{collection}: {stats['seen']} read, {stats['added']} added, "
+              f"{stats['replaced']} replaced, {stats['skipped']} skipped", end="", file=sys.stderr)
+
+    upsert = getattr(knowledge_base, f"upsert_{args.kind}")
+    stats = upsert(with_id(read_records(args.path, args.format)), batch_size=args.batch_size,
+                   replace=args.replace, on_progress=progress)
+    print(file=sys.stderr)
+    print(json.dumps(stats))
+
 
-# Singleton instance
-knowledge_base = EmergencyKnowledgeBase()
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,338 @@
+"""
+Region Resolver
+===============
+Point -> country (and admin-1 where the boundary file has it) lookups.
+
+Boundaries come from a GeoJSON FeatureCollection of Polygon/MultiPolygon
+features with properties iso_a2, name, level ("country" or "admin1") and an
+optional code. The first load compiles them into a flat binary index (.npz):
+
+    vertices      (V, 2) float64   every ring vertex, lng/lat
+    ring_offsets  (R + 1)          vertex range of each ring
+    part_rings    (P + 1)          ring range of each polygon part (exterior first, then holes)
+    part_bbox     (P, 4)           min_lng, min_lat, max_lng, max_lat
+    part_area     (P)              planar area, used to prefer the most specific match
+    node_*                         STR-packed R-tree over the part boxes
+
+Later startups load that file instead of parsing GeoJSON; it is rebuilt when
+the GeoJSON's sha256 changes. A lookup walks the R-tree to the parts whose
+box contains the point and runs an even-odd ray test on just those rings.
+
+The bundled data/regions.geojson is a coarse hand-simplified set (about 45
+hazard-relevant countries and a few US states) meant for labelling, not
+border-accurate geocoding. Point REGIONS_GEOJSON at Natural Earth admin-0 /
+admin-1 files (with iso_a2/name/level properties) for full coverage.
+
+Environment:
+    REGIONS_GEOJSON      boundary file (default data/regions.geojson beside main.py)
+    REGIONS_INDEX_PATH   compiled index (default ./region_index.npz)
+"""
+
+import hashlib
+import json
+import math
+import os
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .log import get_logger
+from .metrics import registry
+
+logger = get_logger("regions")
+
+REGION_LOOKUPS = registry.counter(
+    "omnidispatch_region_lookups_total", "Point-in-polygon region lookups by result", ["result"]
+)
+
+NODE_CAPACITY = 8
+# Rings longer than this use the vectorised ray test; shorter ones are cheaper in plain Python
+NUMPY_RING_MIN = 256
+DEFAULT_GEOJSON = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "regions.geojson")
+_ARRAYS = ("vertices", "ring_offsets", "part_rings", "part_feature", "part_bbox", "part_area",
+           "node_bbox", "node_start", "node_end", "tree_entries")
+
+
+def flag_emoji(iso_a2: str) -> str:
+    """Regional-indicator flag for a two-letter country code"""
+    if len(iso_a2) != 2 or not iso_a2.isalpha():
+        return "🌍"
+    return "".join(chr(0x1F1E6 + ord(c) - ord("A")) for c in iso_a2.upper())
+
+
+def _ring_area(ring: np.ndarray) -> float:
+    x, y = ring[:, 0], ring[:, 1]
+    return 0.5 * abs(float(np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1))))
+
+
+def _str_groups(boxes: np.ndarray, capacity: int) -> List[np.ndarray]:
+    """Sort-Tile-Recursive packing: vertical slices by x-center, then runs of `capacity` by y-center"""
+    count = len(boxes)
+    slices = max(1, math.ceil(math.sqrt(math.ceil(count / capacity))))
+    slice_size = slices * capacity
+    cx = (boxes[:, 0] + boxes[:, 2]) / 2
+    cy = (boxes[:, 1] + boxes[:, 3]) / 2
+    order = np.argsort(cx, kind="stable")
+    groups = []
+    for s in range(0, count, slice_size):
+        column = order[s:s + slice_size]
+        column = column[np.argsort(cy[column], kind="stable")]
+        groups.extend(column[g:g + capacity] for g in range(0, len(column), capacity))
+    return groups
+
+
+def _union(boxes: np.ndarray) -> List[float]:
+    return [boxes[:, 0].min(), boxes[:, 1].min(), boxes[:, 2].max(), boxes[:, 3].max()]
+
+
+class RegionIndex:
+    """Compiled boundary polygons plus an STR R-tree over their bounding boxes"""
+
+    def __init__(self, arrays: Dict[str, np.ndarray], features: List[Dict], source_sha256: str = ""):
+        self.arrays = arrays
+        self.features = features
+        self.source_sha256 = source_sha256
+        self.countries = {f["iso_a2"]: f["name"] for f in features if f.get("level", "country") == "country"}
+        # The tree walk touches a handful of scalars per lookup; lists beat numpy indexing there
+        self._node_bbox = arrays["node_bbox"].tolist()
+        self._node_start = arrays["node_start"].tolist()
+        self._node_end = arrays["node_end"].tolist()
+        self._tree_entries = arrays["tree_entries"].tolist()
+        self._part_bbox = arrays["part_bbox"].tolist()
+        self._part_rings = arrays["part_rings"].tolist()
+        self._ring_offsets = arrays["ring_offsets"].tolist()
+        self._part_feature = arrays["part_feature"].tolist()
+        self._part_area = arrays["part_area"].tolist()
+        vertices = arrays["vertices"]
+        self._small_rings = {
+            ring: vertices[start:end].tolist()
+            for ring, (start, end) in enumerate(zip(self._ring_offsets, self._ring_offsets[1:]))
+            if end - start < NUMPY_RING_MIN
+        }
+        self._leaf_nodes = int(arrays["leaf_nodes"]) if "leaf_nodes" in arrays else 0
+
+    # ------------------------------------------------------------------
+    # Building and persistence
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def from_geojson(cls, path: str) -> "RegionIndex":
+        with open(path, "rb") as f:
+            raw = f.read()
+        collection = json.loads(raw)
+        features: List[Dict] = []
+        vertices: List[np.ndarray] = []
+        ring_offsets = [0]
+        part_rings = [0]
+        part_feature: List[int] = []
+        part_bbox: List[List[float]] = []
+        part_area: List[float] = []
+
+        for feature in collection.get("features", []):
+            geometry = feature.get("geometry") or {}
+            if geometry.get("type") == "Polygon":
+                polygons = [geometry["coordinates"]]
+            elif geometry.get("type") == "MultiPolygon":
+                polygons = geometry["coordinates"]
+            else:
+                continue
+            props = feature.get("properties") or {}
+            feature_id = len(features)
+            features.append({
+                "iso_a2": str(props.get("iso_a2", "")).upper(),
+                "name": props.get("name", ""),
+                "level": props.get("level", "country"),
+                "code": props.get("code"),
+            })
+            for polygon in polygons:
+                area = 0.0
+                for k, ring in enumerate(polygon):
+                    ring = np.asarray(ring, dtype=np.float64)[:, :2]
+                    if len(ring) > 1 and np.array_equal(ring[0], ring[-1]):
+                        ring = ring[:-1]
+                    if len(ring) < 3:
+                        continue
+                    vertices.append(ring)
+                    ring_offsets.append(ring_offsets[-1] + len(ring))
+                    area += _ring_area(ring) * (1 if k == 0 else -1)
+                    if k == 0:
+                        part_bbox.append([ring[:, 0].min(), ring[:, 1].min(), ring[:, 0].max(), ring[:, 1].max()])
+                part_rings.append(len(ring_offsets) - 1)
+                part_feature.append(feature_id)
+                part_area.append(area)
+
+        boxes = np.array(part_bbox, dtype=np.float64).reshape(-1, 4)
+        arrays = {
+            "vertices": np.concatenate(vertices) if vertices else np.zeros((0, 2)),
+            "ring_offsets": np.array(ring_offsets, dtype=np.int64),
+            "part_rings": np.array(part_rings, dtype=np.int64),
+            "part_feature": np.array(part_feature, dtype=np.int32),
+            "part_bbox": boxes,
+            "part_area": np.array(part_area, dtype=np.float64),
+        }
+        arrays.update(cls._build_tree(boxes))
+        return cls(arrays, features, hashlib.sha256(raw).hexdigest())
+
+    @staticmethod
+    def _build_tree(boxes: np.ndarray) -> Dict[str, np.ndarray]:
+        """Bottom-up STR bulk load. Leaf nodes come first; the root is the last node"""
+        node_bbox: List[List[float]] = []
+        node_start: List[int] = []
+        node_end: List[int] = []
+        entries: List[int] = []
+        if len(boxes):
+            for group in _str_groups(boxes, NODE_CAPACITY):
+                node_start.append(len(entries))
+                entries.extend(int(i) for i in group)
+                node_end.append(len(entries))
+                node_bbox.append(_union(boxes[group]))
+        leaf_nodes = len(node_bbox)
+        level_start, level_end = 0, len(node_bbox)
+        while level_end - level_start > 1:
+            level_boxes = np.array(node_bbox[level_start:level_end])
+            for group in _str_groups(level_boxes, NODE_CAPACITY):
+                # Internal nodes list child node ids in tree_entries, leaves list part ids
+                node_start.append(len(entries))
+                entries.extend(level_start + int(i) for i in group)
+                node_end.append(len(entries))
+                node_bbox.append(_union(level_boxes[group]))
+            level_start, level_end = level_end, len(node_bbox)
+        return {
+            "node_bbox": np.array(node_bbox, dtype=np.float64).reshape(-1, 4),
+            "node_start": np.array(node_start, dtype=np.int64),
+            "node_end": np.array(node_end, dtype=np.int64),
+            "tree_entries": np.array(entries, dtype=np.int64),
+            "leaf_nodes": np.array(leaf_nodes, dtype=np.int64),
+        }
+
+    def save(self, path: str):
+        tmp = f"{path}.tmp.npz"
+        np.savez(tmp, features=np.array(json.dumps(self.features)), source_sha256=np.array(self.source_sha256),
+                 leaf_nodes=self.arrays["leaf_nodes"], **{name: self.arrays[name] for name in _ARRAYS})
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> "RegionIndex":
+        with np.load(path) as data:
+            arrays = {name: data[name] for name in _ARRAYS}
+            arrays["leaf_nodes"] = data["leaf_nodes"]
+            return cls(arrays, json.loads(str(data["features"])), str(data["source_sha256"]))
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def _candidate_parts(self, lng: float, lat: float) -> List[int]:
+        if not self._node_bbox:
+            return []
+        hits = []
+        stack = [len(self._node_bbox) - 1]
+        while stack:
+            node = stack.pop()
+            min_x, min_y, max_x, max_y = self._node_bbox[node]
+            if not (min_x <= lng <= max_x and min_y <= lat <= max_y):
+                continue
+            children = self._tree_entries[self._node_start[node]:self._node_end[node]]
+            if node < self._leaf_nodes:
+                for part in children:
+                    min_x, min_y, max_x, max_y = self._part_bbox[part]
+                    if min_x <= lng <= max_x and min_y <= lat <= max_y:
+                        hits.append(part)
+            else:
+                stack.extend(children)
+        return hits
+
+    def _part_contains(self, part: int, lng: float, lat: float) -> bool:
+        """Even-odd rule across the part's exterior ring and holes"""
+        inside = False
+        for ring in range(self._part_rings[part], self._part_rings[part + 1]):
+            points = self._small_rings.get(ring)
+            if points is not None:
+                crossings = 0
+                x0, y0 = points[-1]
+                for x1, y1 in points:
+                    if (y1 > lat) != (y0 > lat) and lng < x1 + (lat - y1) * (x0 - x1) / (y0 - y1):
+                        crossings += 1
+                    x0, y0 = x1, y1
+            else:
+                pts = self.arrays["vertices"][self._ring_offsets[ring]:self._ring_offsets[ring + 1]]
+                x, y = pts[:, 0], pts[:, 1]
+                nx, ny = np.roll(x, -1), np.roll(y, -1)
+                crosses = (y > lat) != (ny > lat)
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    x_at = x + (lat - y) * (nx - x) / (ny - y)
+                crossings = int(np.count_nonzero(crosses & (lng < x_at)))
+            if crossings % 2:
+                inside = not inside
+        return inside
+
+    def resolve(self, lat: float, lng: float) -> Optional[Dict]:
+        """Country (and admin-1 if known) containing the point, or None over ocean/uncovered land"""
+        best: Dict[str, tuple] = {}
+        for part in self._candidate_parts(lng, lat):
+            if not self._part_contains(part, lng, lat):
+                continue
+            feature = self.features[self._part_feature[part]]
+            level = feature["level"]
+            area = self._part_area[part]
+            # Coarse shared borders overlap; the smaller polygon is the more specific answer
+            if level not in best or area < best[level][0]:
+                best[level] = (area, feature)
+        if not best:
+            REGION_LOOKUPS.inc(result="miss")
+            return None
+        REGION_LOOKUPS.inc(result="hit")
+        admin1 = best.get("admin1", (0, None))[1]
+        country = best.get("country", (0, None))[1]
+        iso = (country or admin1)["iso_a2"]
+        return {
+            "iso_a2": iso,
+            "country": country["name"] if country else self.countries.get(iso, iso),
+            "admin1": admin1["name"] if admin1 else None,
+            "admin1_code": admin1.get("code") if admin1 else None,
+            "flag": flag_emoji(iso),
+        }
+
+    def stats(self) -> Dict:
+        return {
+            "features": len(self.features),
+            "parts": len(self.arrays["part_area"]),
+            "vertices": len(self.arrays["vertices"]),
+            "tree_nodes": len(self._node_bbox),
+        }
+
+
+def load_region_index(geojson_path: Optional[str] = None, index_path: Optional[str] = None) -> RegionIndex:
+    """Load the compiled index, rebuilding it from GeoJSON when missing or stale"""
+    geojson_path = geojson_path or os.getenv("REGIONS_GEOJSON", DEFAULT_GEOJSON)
+    index_path = index_path or os.getenv("REGIONS_INDEX_PATH", "./region_index.npz")
+    started = time.perf_counter()
+    if not os.path.exists(geojson_path):
+        logger.warning("region boundaries not found, region lookups disabled", extra={"path": geojson_path})
+        return RegionIndex(RegionIndex._build_tree(np.zeros((0, 4))) | {
+            "vertices": np.zeros((0, 2)), "ring_offsets": np.zeros(1, dtype=np.int64),
+            "part_rings": np.zeros(1, dtype=np.int64), "part_feature": np.zeros(0, dtype=np.int32),
+            "part_bbox": np.zeros((0, 4)), "part_area": np.zeros(0),
+        }, [])
+    with open(geojson_path, "rb") as f:
+        source_sha256 = hashlib.sha256(f.read()).hexdigest()
+    if os.path.exists(index_path):
+        try:
+            index = RegionIndex.load(index_path)
+            if index.source_sha256 == source_sha256:
+                logger.info("region index loaded", extra={
+                    **index.stats(), "load_ms": round((time.perf_counter() - started) * 1000, 2)
+                })
+                return index
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning("region index unreadable, rebuilding", extra={"path": index_path, "error": str(e)})
+    index = RegionIndex.from_geojson(geojson_path)
+    try:
+        index.save(index_path)
+    except OSError as e:
+        logger.warning("could not write region index", extra={"path": index_path, "error": str(e)})
+    logger.info("region index built", extra={
+        **index.stats(), "build_ms": round((time.perf_counter() - started) * 1000, 2)
+    })
+    return index
@@ -0,0 +1,493 @@
+"""
+Precomputed Global Risk Grid
+============================
+A batch job sweeps a regular lat/lng grid (optionally only cells near major
+population centers) through the Chronos agent pipeline at BACKGROUND priority
+and writes the results into a columnar store on disk:
+
+    <RISK_GRID_DIR>/
+        CURRENT                  name of the published snapshot directory
+        checkpoint.jsonl         completed cells, appended as the batch runs
+        snap-<ns>/
+            meta.json            grid spec, vocabularies, row count
+            lat.npy lng.npy      cell centers (float32)
+            risk_score.npy       0-100 (int16)
+            level.npy threat.npy vocabulary codes (int16)
+            updated_at.npy       unix seconds (float64)
+            cell_index.npy       grid position -> row, -1 if not computed (int32)
+            payload.bin          full agent results as JSON, one after another
+            payload_offsets.npy  byte offsets into payload.bin (int64, rows + 1)
+
+Columns are memory-mapped, so the overview reads three arrays and a location
+lookup is one index computation plus one slice of payload.bin. The batch
+appends every finished cell to checkpoint.jsonl and resumes from it. A
+snapshot rewrites the whole store, so the batch publishes at most once per
+RISK_GRID_PUBLISH_S, on a worker thread and one write at a time.
+
+Each snapshot is written into a fresh snap-<ns>/ directory and published by
+atomically replacing CURRENT, so a reader always opens the files of exactly
+one snapshot. The previous snapshot is kept for readers still mapping it;
+older ones are removed.
+
+Environment:
+    RISK_GRID_DIR          store directory (default ./risk_grid)
+    RISK_GRID_STEP_DEG     cell size in degrees (default 5)
+    RISK_GRID_PRECOMPUTE   "1" to start a sweep at startup (default off)
+    RISK_GRID_PUBLISH_S    minimum time between snapshots during a sweep (default 30)
+"""
+
+import asyncio
+import json
+import math
+import os
+import shutil
+import time
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .log import get_logger
+from .metrics import registry
+from .risk_zones import CRITICAL_SCORE, HIGH_SCORE
+from .scheduler import Priority, priority_scope
+
+logger = get_logger("risk_grid")
+
+GRID_CELLS = registry.counter(
+    "omnidispatch_risk_grid_cells_total", "Risk grid cells processed by the precompute batch", ["result"]
+)
+GRID_LOOKUPS = registry.counter(
+    "omnidispatch_risk_grid_lookups_total", "Location lookups against the precomputed grid", ["result"]
+)
+
+# Major population centers (lat, lng); cells near one of these count as populated
+POPULATED_PLACES: List[Tuple[float, float]] = [
+    (35.68, 139.69), (34.69, 135.50), (37.57, 126.98), (39.90, 116.41), (31.23, 121.47), (23.13, 113.26),
+    (22.32, 114.17), (30.57, 104.07), (25.03, 121.57), (14.60, 120.98), (13.76, 100.50), (10.82, 106.63),
+    (21.03, 105.85), (3.14, 101.69), (1.35, 103.82), (-6.21, 106.85), (-7.25, 112.75), (16.87, 96.20),
+    (23.81, 90.41), (22.57, 88.36), (28.61, 77.21), (19.08, 72.88), (12.97, 77.59), (17.39, 78.49),
+    (13.08, 80.27), (24.86, 67.01), (31.55, 74.34), (33.69, 73.05), (34.53, 69.17), (35.69, 51.39),
+    (33.31, 44.37), (24.71, 46.68), (25.20, 55.27), (41.01, 28.98), (39.93, 32.86), (30.04, 31.24),
+    (6.52, 3.38), (9.06, 7.49), (5.60, -0.19), (14.72, -17.47), (-1.29, 36.82), (9.03, 38.74),
+    (-6.79, 39.21), (-4.44, 15.27), (-26.20, 28.05), (-33.92, 18.42), (33.57, -7.59), (36.75, 3.06),
+    (55.76, 37.62), (59.93, 30.34), (50.45, 30.52), (52.23, 21.01), (52.52, 13.40), (48.86, 2.35),
+    (51.51, -0.13), (40.42, -3.70), (41.90, 12.50), (45.46, 9.19), (37.98, 23.73), (44.43, 26.10),
+    (40.71, -74.01), (34.05, -118.24), (41.88, -87.63), (29.76, -95.37), (25.76, -80.19), (37.77, -122.42),
+    (47.61, -122.33), (43.65, -79.38), (45.50, -73.57), (19.43, -99.13), (20.67, -103.35), (14.63, -90.51),
+    (4.71, -74.07), (-12.05, -77.04), (-0.18, -78.47), (10.48, -66.90), (-23.55, -46.63), (-22.91, -43.17),
+    (-15.79, -47.88), (-34.60, -58.38), (-33.45, -70.67), (-33.87, 151.21), (-37.81, 144.96), (-36.85, 174.76),
+]
+
+
+class GridSpec:
+    """A regular lat/lng grid; row/col index cells from (lat_min, lng_min)"""
+
+    def __init__(self, step_deg: float = 5.0, lat_min: float = -60.0, lat_max: float = 75.0,
+                 populated_only: bool = True, populated_radius_deg: Optional[float] = None):
+        self.step_deg = step_deg
+        self.lat_min = lat_min
+        self.lat_max = lat_max
+        self.lng_min = -180.0
+        self.rows = int(math.ceil((lat_max - lat_min) / step_deg))
+        self.cols = int(math.ceil(360.0 / step_deg))
+        self.populated_only = populated_only
+        self.populated_radius_deg = populated_radius_deg if populated_radius_deg is not None else step_deg
+
+    def center(self, row: int, col: int) -> Tuple[float, float]:
+        return (self.lat_min + (row + 0.5) * self.step_deg, self.lng_min + (col + 0.5) * self.step_deg)
+
+    def locate(self, lat: float, lng: float) -> Optional[Tuple[int, int]]:
+        row = int((lat - self.lat_min) // self.step_deg)
+        col = int(((lng - self.lng_min) % 360.0) // self.step_deg)
+        if not 0 <= row < self.rows:
+            return None
+        return row, min(col, self.cols - 1)
+
+    def cells(self) -> List[Tuple[int, int]]:
+        """Grid positions to compute, populated-first order so the useful cells land early"""
+        if not self.populated_only:
+            return [(r, c) for r in range(self.rows) for c in range(self.cols)]
+        radius = self.populated_radius_deg
+        selected = {}
+        for lat, lng in POPULATED_PLACES:
+            for dlat in np.arange(-radius, radius + 1e-9, self.step_deg):
+                for dlng in np.arange(-radius, radius + 1e-9, self.step_deg):
+                    position = self.locate(lat + dlat, lng + dlng)
+                    if position is not None:
+                        # Cells containing a city sort before their neighbours
+                        distance = abs(dlat) + abs(dlng)
+                        selected[position] = min(selected.get(position, distance), distance)
+        return sorted(selected, key=lambda p: (selected[p], p))
+
+    def to_dict(self) -> Dict:
+        return {"step_deg": self.step_deg, "lat_min": self.lat_min, "lat_max": self.lat_max,
+                "populated_only": self.populated_only, "populated_radius_deg": self.populated_radius_deg}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "GridSpec":
+        return cls(**data)
+
+
+# ============================================================================
+# COLUMNAR STORE
+# ============================================================================
+
+_COLUMNS = ("lat", "lng", "risk_score", "level", "threat", "updated_at", "cell_index", "payload_offsets")
+
+
+class RiskGridStore:
+    """Memory-mapped columnar store of precomputed cells"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._loaded: Optional[str] = None
+        self.meta: Optional[Dict] = None
+        self.spec: Optional[GridSpec] = None
+        self.columns: Dict[str, np.ndarray] = {}
+        self._payload: Optional[np.memmap] = None
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _current(self) -> Optional[str]:
+        """Directory of the published snapshot"""
+        try:
+            with open(self._path("CURRENT")) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            # Flat layout written before snapshots got their own directories
+            return "." if os.path.exists(self._path("meta.json")) else None
+
+    def _open(self, snapshot: str):
+        path = lambda name: os.path.join(self.directory, snapshot, name)
+        with open(path("meta.json")) as f:
+            meta = json.load(f)
+        columns = {name: np.load(path(f"{name}.npy"), mmap_mode="r") for name in _COLUMNS}
+        size = os.path.getsize(path("payload.bin"))
+        payload = np.memmap(path("payload.bin"), dtype=np.uint8, mode="r") if size else None
+        # Swap in only once every file of the snapshot opened
+        self.meta, self.columns, self._payload = meta, columns, payload
+        self.spec = GridSpec.from_dict(meta["spec"])
+        self._loaded = snapshot
+
+    def _refresh(self) -> bool:
+        """(Re)open the columns if the batch has published a newer snapshot"""
+        for _ in range(3):
+            snapshot = self._current()
+            if snapshot is None:
+                return self._loaded is not None
+            if snapshot == self._loaded:
+                return True
+            try:
+                self._open(snapshot)
+                return True
+            except FileNotFoundError:
+                continue  # pruned while we were opening it; CURRENT has moved on
+        return self._loaded is not None
+
+    @property
+    def available(self) -> bool:
+        return self._refresh() and self.meta["count"] > 0
+
+    def counts(self) -> Dict[str, int]:
+        """Whole-grid totals, computed when the snapshot was written: {"total", "critical", "high"}"""
+        if not self.available:
+            return {"total": 0, "critical": 0, "high": 0}
+        if "counts" not in self.meta:
+            # Snapshot written before counts were recorded; scan the column once per snapshot
+            scores = np.asarray(self.columns["risk_score"])
+            critical = int(np.count_nonzero(scores >= CRITICAL_SCORE))
+            self.meta["counts"] = {"total": self.meta["count"], "critical": critical,
+                                   "high": int(np.count_nonzero(scores >= HIGH_SCORE)) - critical}
+        return dict(self.meta["counts"])
+
+    def _payload_row(self, row: int) -> Dict:
+        offsets = self.columns["payload_offsets"]
+        return json.loads(bytes(self._payload[offsets[row]:offsets[row + 1]]))
+
+    def lookup(self, lat: float, lng: float) -> Optional[Dict]:
+        """Full precomputed agent result for the grid cell containing the point"""
+        if not self.available:
+            return None
+        position = self.spec.locate(lat, lng)
+        row = -1
+        if position is not None:
+            row = int(self.columns["cell_index"][position[0] * self.spec.cols + position[1]])
+        if row < 0:
+            GRID_LOOKUPS.inc(result="miss")
+            return None
+        GRID_LOOKUPS.inc(result="hit")
+        result = self._payload_row(row)
+        result["precomputed_at"] = datetime.fromtimestamp(float(self.columns["updated_at"][row])).isoformat()
+        return result
+
+    def top_zones(self, limit: int = 100, min_score: int = 0) -> List[Dict]:
+        """Highest-risk cells as overview zones, read from the columns only"""
+        if not self.available:
+            return []
+        scores = np.asarray(self.columns["risk_score"])
+        order = np.argsort(-scores, kind="stable")
+        order = order[scores[order] >= min_score][:limit]
+        levels, threats = self.meta["vocab"]["level"], self.meta["vocab"]["threat"]
+        names, countries = self.meta["vocab"]["name"], self.meta["vocab"]["country"]
+        return [
+            {
+                "name": names[i] if i < len(names) else "",
+                "country": countries[i] if i < len(countries) else "",
+                "lat": round(float(self.columns["lat"][i]), 4),
+                "lng": round(float(self.columns["lng"][i]), 4),
+                "risk_score": int(scores[i]),
+                "risk_level": levels[int(self.columns["level"][i])],
+                "primary_risk": threats[int(self.columns["threat"][i])],
+                "incidents_24h": 0,
+            }
+            for i in (int(i) for i in order)
+        ]
+
+    def write(self, spec: GridSpec, records: List[Dict]):
+        """Write a new snapshot directory, then publish it by replacing CURRENT"""
+        snapshot = f"snap-{time.time_ns()}"
+        os.makedirs(self._path(snapshot))
+        path = lambda name: os.path.join(self.directory, snapshot, name)
+        levels: List[str] = []
+        threats: List[str] = []
+
+        def code(vocab: List[str], value: str) -> int:
+            if value not in vocab:
+                vocab.append(value)
+            return vocab.index(value)
+
+        count = len(records)
+        cell_index = np.full(spec.rows * spec.cols, -1, dtype=np.int32)
+        payloads = [json.dumps(r["result"], default=str).encode() for r in records]
+        offsets = np.zeros(count + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(p) for p in payloads]) if payloads else []
+        for i, r in enumerate(records):
+            cell_index[r["row"] * spec.cols + r["col"]] = i
+        columns = {
+            "lat": np.array([r["lat"] for r in records], dtype=np.float32),
+            "lng": np.array([r["lng"] for r in records], dtype=np.float32),
+            "risk_score": np.array([r["risk_score"] for r in records], dtype=np.int16),
+            "level": np.array([code(levels, r["risk_level"]) for r in records], dtype=np.int16),
+            "threat": np.array([code(threats, r["primary_threat"]) for r in records], dtype=np.int16),
+            "updated_at": np.array([r["updated_at"] for r in records], dtype=np.float64),
+            "cell_index": cell_index,
+            "payload_offsets": offsets,
+        }
+        for name, array in columns.items():
+            np.save(path(f"{name}.npy"), array)
+        with open(path("payload.bin"), "wb") as f:
+            for payload in payloads:
+                f.write(payload)
+        scores = columns["risk_score"]
+        critical = int(np.count_nonzero(scores >= CRITICAL_SCORE))
+        meta = {
+            "spec": spec.to_dict(),
+            "count": count,
+            "counts": {"total": count, "critical": critical,
+                       "high": int(np.count_nonzero(scores >= HIGH_SCORE)) - critical},
+            "generated_at": datetime.now().isoformat(),
+            # Names are per row (free text); level/threat are small vocabularies
+            "vocab": {"level": levels, "threat": threats,
+                      "name": [r["location_name"] for r in records],
+                      "country": [r["country"] for r in records]},
+        }
+        with open(path("meta.json"), "w") as f:
+            json.dump(meta, f)
+        previous = self._current()
+        with open(self._path("CURRENT.tmp"), "w") as f:
+            f.write(snapshot)
+        os.replace(self._path("CURRENT.tmp"), self._path("CURRENT"))
+        self._prune(keep={snapshot, previous})
+
+    def _prune(self, keep):
+        """Remove snapshot directories other than `keep` (best effort: a reader may hold files open)"""
+        for name in os.listdir(self.directory):
+            if name.startswith("snap-") and name not in keep:
+                shutil.rmtree(self._path(name), ignore_errors=True)
+
+
+# ============================================================================
+# PRECOMPUTE BATCH
+# ============================================================================
+
+Analyzer = Callable[[float, float], Awaitable[Dict]]
+
+
+def _record(row: int, col: int, lat: float, lng: float, result: Dict) -> Dict:
+    threats = result.get("primary_threats") or ["Unknown"]
+    try:
+        score = int(float(result.get("risk_score", 0)))
+    except (TypeError, ValueError):
+        score = 0
+    return {
+        "row": row, "col": col, "lat": lat, "lng": lng,
+        "risk_score": max(0, min(100, score)),
+        "risk_level": str(result.get("overall_risk_level", "unknown")).lower(),
+        "primary_threat": str(threats[0]),
+        "location_name": str(result.get("location_name", "")),
+        "country": str(result.get("country", "")),
+        "updated_at": time.time(),
+        "result": result,
+    }
+
+
+class RiskGridBatch:
+    """
+    Sweeps a GridSpec through an analyzer at BACKGROUND priority,
+    checkpointing each finished cell and publishing snapshots as it goes
+    """
+
+    def __init__(self, spec: GridSpec, store: RiskGridStore, analyze: Analyzer,
+                 concurrency: int = 2, publish_interval_s: Optional[float] = None):
+        self.spec = spec
+        self.store = store
+        self.analyze = analyze
+        self.concurrency = concurrency
+        self.publish_interval_s = (publish_interval_s if publish_interval_s is not None
+                                   else float(os.getenv("RISK_GRID_PUBLISH_S", "30")))
+        self.checkpoint_path = os.path.join(store.directory, "checkpoint.jsonl")
+        self.total = len(spec.cells())
+        self.completed = 0
+        self.failed = 0
+        self.resumed = 0
+        self.started_at = time.time()
+        self.finished_at: Optional[float] = None
+        self._records: Dict[Tuple[int, int], Dict] = {}
+        self._published_at = time.monotonic()
+        self._publishing: Optional[asyncio.Task] = None
+
+    def _load_checkpoint(self):
+        """Completed cells from a previous run with the same grid spec"""
+        if not os.path.exists(self.checkpoint_path):
+            return
+        with open(self.checkpoint_path) as f:
+            header = f.readline()
+            if not header or json.loads(header).get("spec") != self.spec.to_dict():
+                logger.info("risk grid spec changed, starting a fresh sweep")
+                self._records = {}
+                return
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    break  # torn final line from a crash mid-write
+                self._records[(record["row"], record["col"])] = record
+        self.resumed = len(self._records)
+
+    def _open_checkpoint(self):
+        os.makedirs(self.store.directory, exist_ok=True)
+        if self.resumed:
+            # Rewrite without any torn tail so appends start on a clean line
+            with open(self.checkpoint_path + ".tmp", "w") as f:
+                f.write(json.dumps({"spec": self.spec.to_dict()}) + "\n")
+                for record in self._records.values():
+                    f.write(json.dumps(record, default=str) + "\n")
+            os.replace(self.checkpoint_path + ".tmp", self.checkpoint_path)
+            return open(self.checkpoint_path, "a")
+        f = open(self.checkpoint_path, "w")
+        f.write(json.dumps({"spec": self.spec.to_dict()}) + "\n")
+        return f
+
+    def _write_snapshot(self, records: List[Dict]):
+        self.store.write(self.spec, sorted(records, key=lambda r: (r["row"], r["col"])))
+
+    async def _publish(self):
+        """Write a snapshot of the cells so far on a worker thread, off the event loop"""
+        self._published_at = time.monotonic()
+        await asyncio.to_thread(self._write_snapshot, list(self._records.values()))
+
+    async def _publish_in_background(self):
+        try:
+            await self._publish()
+        except Exception as e:
+            logger.warning("risk grid snapshot failed", extra={"error": str(e)})
+
+    def _maybe_publish(self):
+        """Start a background snapshot if the interval has passed and none is being written"""
+        if self._publishing is not None and not self._publishing.done():
+            return
+        if time.monotonic() - self._published_at >= self.publish_interval_s:
+            self._published_at = time.monotonic()
+            self._publishing = asyncio.get_running_loop().create_task(self._publish_in_background())
+
+    async def run(self):
+        self._load_checkpoint()
+        pending = [p for p in self.spec.cells() if p not in self._records]
+        self.completed = len(self._records)
+        logger.info("risk grid sweep started", extra={
+            "cells": self.total, "resumed": self.resumed, "pending": len(pending), "step_deg": self.spec.step_deg
+        })
+        queue: asyncio.Queue = asyncio.Queue()
+        for position in pending:
+            queue.put_nowait(position)
+        checkpoint = self._open_checkpoint()
+
+        async def worker():
+            while not queue.empty():
+                row, col = queue.get_nowait()
+                lat, lng = self.spec.center(row, col)
+                try:
+                    result = await self.analyze(lat, lng)
+                except Exception as e:
+                    logger.warning("risk grid cell failed", extra={"row": row, "col": col, "error": str(e)})
+                    result = {}
+                if not result.get("success"):
+                    self.failed += 1
+                    GRID_CELLS.inc(result="failed")
+                    continue
+                record = _record(row, col, lat, lng, result)
+                self._records[(row, col)] = record
+                checkpoint.write(json.dumps(record, default=str) + "\n")
+                checkpoint.flush()
+                self.completed += 1
+                GRID_CELLS.inc(result="ok")
+                self._maybe_publish()
+
+        try:
+            with priority_scope(Priority.BACKGROUND):
+                await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+        finally:
+            checkpoint.close()
+            if self._publishing is not None:
+                await self._publishing
+            if self._records:
+                await self._publish()
+            self.finished_at = time.time()
+            logger.info("risk grid sweep finished", extra=self.status())
+
+    def status(self) -> Dict:
+        elapsed = (self.finished_at or time.time()) - self.started_at
+        done_this_run = self.completed - self.resumed
+        remaining = self.total - self.completed
+        rate = done_this_run / elapsed if elapsed > 0 else 0.0
+        return {
+            "running": self.finished_at is None,
+            "spec": self.spec.to_dict(),
+            "total_cells": self.total,
+            "completed": self.completed,
+            "failed": self.failed,
+            "resumed_from_checkpoint": self.resumed,
+            "elapsed_s": round(elapsed, 1),
+            "eta_s": round(remaining / rate, 1) if rate > 0 and self.finished_at is None else None,
+        }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Precompute the global Chronos risk grid")
+    parser.add_argument("--step", type=float, default=float(os.getenv("RISK_GRID_STEP_DEG", "5")))
+    parser.add_argument("--all-cells", action="store_true", help="Sweep every cell, not just populated ones")
+    parser.add_argument("--concurrency", type=int, default=2)
+    parser.add_argument("--dir", default=os.getenv("RISK_GRID_DIR", "./risk_grid"))
+    args = parser.parse_args()
+
+    from main import analyze_location_with_crewai
+
+    spec = GridSpec(step_deg=args.step, populated_only=not args.all_cells)
+    batch = RiskGridBatch(spec, RiskGridStore(args.dir), analyze_location_with_crewai, args.concurrency)
+    print(f"Sweeping {batch.total} cells at {args.step}° into {args.dir}")
+    asyncio.run(batch.run())
+    print(json.dumps(batch.status(), indent=2))
@@ -0,0 +1,398 @@
+"""
+Risk Zone Dataset
+=================
+Curated risk zones, historical patterns and incident history, loaded from
+data/risk_zones.json (plus optional JSONL files of extra zones) and compiled
+into memory-mapped columns:
+
+    <RISK_ZONES_DIR>/
+        meta.json              regions (patterns, history, weather), vocabularies, source hash
+        lat.npy lng.npy        zone centers (float32)
+        risk_score.npy         0-100 (int16)
+        threat.npy             primary risk vocabulary code (int16)
+        country.npy            country vocabulary code (int16)
+        region.npy             index into meta regions, -1 for extra zones (int16)
+        incidents_24h.npy      (int32)
+        names.bin              zone names, UTF-8, back to back
+        name_offsets.npy       byte offsets into names.bin (int64, rows + 1)
+        cell_start.npy         spatial index, see below (int32)
+        by_risk.npy            row ids by descending risk score (int32)
+
+Rows are stored grouped by a regular lat/lng index cell (row-major), so the
+zones of one grid row between two longitudes are one contiguous slice and
+cell_start[c]..cell_start[c + 1] holds cell c. A viewport query is one slice
+per grid row plus an exact bounds filter; nearest-zone queries widen a
+window around the point until k zones are provably the closest.
+
+The compiled directory is rebuilt when the source files' sha256 changes.
+The region keyed "default" is the fallback template for uncovered areas;
+its zones are placeholders and stay out of the spatial index.
+
+Extra zone files hold one JSON object per line:
+    {"name": ..., "lat": ..., "lng": ..., "risk_score": ..., "primary_risk": ...,
+     "incidents_24h": 0, "country": ..., "flag": ...}
+
+Environment:
+    RISK_ZONES_SOURCE     curated dataset (default data/risk_zones.json beside main.py)
+    RISK_ZONES_EXTRA      comma-separated JSONL files of additional zones
+    RISK_ZONES_DIR        compiled columns (default ./risk_zones)
+    RISK_ZONES_CELL_DEG   spatial index cell size in degrees (default 1)
+"""
+
+import hashlib
+import json
+import math
+import os
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .log import get_logger
+from .metrics import registry
+
+logger = get_logger("risk_zones")
+
+ZONE_QUERIES = registry.counter(
+    "omnidispatch_risk_zone_queries_total", "Risk zone dataset queries by kind", ["kind"]
+)
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEG = math.pi * EARTH_RADIUS_KM / 180
+CRITICAL_SCORE = 85
+HIGH_SCORE = 70
+DEFAULT_SOURCE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "risk_zones.json")
+_COLUMNS = ("lat", "lng", "risk_score", "threat", "country", "region", "incidents_24h",
+            "name_offsets", "cell_start", "by_risk")
+
+
+def haversine_km(lat: float, lng: float, lats: np.ndarray, lngs: np.ndarray) -> np.ndarray:
+    """Great-circle distance from one point to many"""
+    p1, p2 = math.radians(lat), np.radians(lats)
+    dlat = p2 - p1
+    dlng = np.radians(lngs) - math.radians(lng)
+    a = np.sin(dlat / 2) ** 2 + math.cos(p1) * np.cos(p2) * np.sin(dlng / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class RiskZoneDataset:
+    """Memory-mapped zone columns with a grid-bucket spatial index"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        with open(self._path("meta.json")) as f:
+            self.meta = json.load(f)
+        self.columns: Dict[str, np.ndarray] = {
+            name: np.load(self._path(f"{name}.npy"), mmap_mode="r") for name in _COLUMNS
+        }
+        size = os.path.getsize(self._path("names.bin"))
+        self._names = np.memmap(self._path("names.bin"), dtype=np.uint8, mode="r") if size else None
+        self.cell_deg = float(self.meta["cell_deg"])
+        self.rows = int(round(180 / self.cell_deg))
+        self.cols = int(round(360 / self.cell_deg))
+        self.count = int(self.meta["count"])
+        self.regions: List[Dict] = self.meta["regions"]
+        self._region_by_key = {r["key"]: i for i, r in enumerate(self.regions)}
+        self._region_by_iso = {r["iso_a2"]: r["key"] for r in self.regions if r.get("iso_a2")}
+        ranked = np.asarray(self.columns["risk_score"])[np.asarray(self.columns["by_risk"])]
+        self.critical_count = int(np.count_nonzero(ranked >= CRITICAL_SCORE))
+        self.high_count = int(np.count_nonzero(ranked >= HIGH_SCORE)) - self.critical_count
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    # ------------------------------------------------------------------
+    # Compilation
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def compile(directory: str, source: str, extra: List[str], cell_deg: float, source_sha256: str):
+        """Write the columns for `source` + `extra`; meta.json is replaced last"""
+        with open(source) as f:
+            dataset = json.load(f)
+        threats: List[str] = []
+        countries: List[List[str]] = []
+        regions: List[Dict] = []
+        zones: List[Dict] = []
+
+        def code(vocab: list, value) -> int:
+            if value not in vocab:
+                vocab.append(value)
+            return vocab.index(value)
+
+        for region in dataset.get("regions", []):
+            meta = {k: v for k, v in region.items() if k != "risk_zones"}
+            if region["key"] == "default":
+                meta["template_zones"] = region.get("risk_zones", [])
+            else:
+                for zone in region.get("risk_zones", []):
+                    zones.append({**zone, "region": len(regions),
+                                  "country": region.get("country", ""), "flag": region.get("flag", "")})
+            regions.append(meta)
+        for path in extra:
+            with open(path) as f:
+                for line_no, line in enumerate(f, 1):
+                    if not line.strip():
+                        continue
+                    try:
+                        zone = json.loads(line)
+                        float(zone["lat"]), float(zone["lng"]), int(zone["risk_score"])
+                    except (ValueError, KeyError, TypeError) as e:
+                        logger.warning("skipping bad zone line", extra={"path": path, "line": line_no, "error": str(e)})
+                        continue
+                    zones.append({**zone, "region": -1})
+
+        count = len(zones)
+        rows, cols = int(round(180 / cell_deg)), int(round(360 / cell_deg))
+        # Bucketed on the stored float32 values so index cells agree with the columns
+        lat = np.array([z["lat"] for z in zones], dtype=np.float32).reshape(-1).astype(np.float64)
+        lng = np.array([z["lng"] for z in zones], dtype=np.float32).reshape(-1).astype(np.float64)
+        score = np.array([z["risk_score"] for z in zones], dtype=np.int16).reshape(-1)
+        cell = (np.clip(((lat + 90) // cell_deg).astype(np.int64), 0, rows - 1) * cols
+                + np.clip(((lng + 180) // cell_deg).astype(np.int64), 0, cols - 1))
+        # Grouped by cell, highest risk first within a cell
+        order = np.lexsort((-score, cell))
+        names = [str(zones[i].get("name", "")).encode() for i in order]
+        name_offsets = np.zeros(count + 1, dtype=np.int64)
+        name_offsets[1:] = np.cumsum([len(n) for n in names]) if names else []
+        sorted_score = score[order]
+        columns = {
+            "lat": lat[order].astype(np.float32),
+            "lng": lng[order].astype(np.float32),
+            "risk_score": sorted_score,
+            "threat": np.array([code(threats, zones[i].get("primary_risk", "")) for i in order], dtype=np.int16),
+            "country": np.array([code(countries, [zones[i].get("country", ""), zones[i].get("flag", "")])
+                                 for i in order], dtype=np.int16),
+            "region": np.array([zones[i]["region"] for i in order], dtype=np.int16),
+            "incidents_24h": np.array([zones[i].get("incidents_24h", 0) for i in order], dtype=np.int32),
+            "name_offsets": name_offsets,
+            "cell_start": np.searchsorted(cell[order], np.arange(rows * cols + 1)).astype(np.int32),
+            "by_risk": np.argsort(-sorted_score, kind="stable").astype(np.int32),
+        }
+
+        os.makedirs(directory, exist_ok=True)
+        for name, array in columns.items():
+            tmp = os.path.join(directory, f"{name}.npy.tmp.npy")
+            np.save(tmp, array)
+            os.replace(tmp, os.path.join(directory, f"{name}.npy"))
+        with open(os.path.join(directory, "names.bin.tmp"), "wb") as f:
+            for name in names:
+                f.write(name)
+        os.replace(os.path.join(directory, "names.bin.tmp"), os.path.join(directory, "names.bin"))
+        meta = {
+            "count": count,
+            "cell_deg": cell_deg,
+            "source_sha256": source_sha256,
+            "vocab": {"threat": threats, "country": countries},
+            "regions": regions,
+        }
+        with open(os.path.join(directory, "meta.json.tmp"), "w") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(os.path.join(directory, "meta.json.tmp"), os.path.join(directory, "meta.json"))
+
+    # ------------------------------------------------------------------
+    # Rows -> API zones
+    # ------------------------------------------------------------------
+
+    def _name(self, row: int) -> str:
+        offsets = self.columns["name_offsets"]
+        return bytes(self._names[offsets[row]:offsets[row + 1]]).decode() if self._names is not None else ""
+
+    def zone(self, row: int) -> Dict:
+        country, flag = self.meta["vocab"]["country"][int(self.columns["country"][row])]
+        return {
+            "name": self._name(row),
+            "lat": round(float(self.columns["lat"][row]), 4),
+            "lng": round(float(self.columns["lng"][row]), 4),
+            "risk_score": int(self.columns["risk_score"][row]),
+            "primary_risk": self.meta["vocab"]["threat"][int(self.columns["threat"][row])],
+            "incidents_24h": int(self.columns["incidents_24h"][row]),
+            "country": country,
+            "flag": flag,
+        }
+
+    def _ranked(self, rows: np.ndarray) -> np.ndarray:
+        """`rows` in descending risk order"""
+        if len(rows) > self.count // 8:
+            # Large selections: filter the precomputed order instead of sorting
+            mask = np.zeros(self.count, dtype=bool)
+            mask[rows] = True
+            by_risk = np.asarray(self.columns["by_risk"])
+            return by_risk[mask[by_risk]]
+        scores = np.asarray(self.columns["risk_score"])[rows]
+        return rows[np.argsort(-scores, kind="stable")]
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def top(self, limit: int = 100, min_score: int = 0) -> List[Dict]:
+        """Highest-risk zones worldwide"""
+        ZONE_QUERIES.inc(kind="top")
+        by_risk = self.columns["by_risk"]
+        rows = []
+        for row in by_risk[:limit]:
+            if self.columns["risk_score"][row] < min_score:
+                break
+            rows.append(int(row))
+        return [self.zone(row) for row in rows]
+
+    def _window_rows(self, south: float, west: float, north: float, east: float) -> np.ndarray:
+        """Candidate rows from the index cells overlapping a box; west > east crosses the antimeridian"""
+        r0 = max(0, int((south + 90) // self.cell_deg))
+        r1 = min(self.rows - 1, int((north + 90) // self.cell_deg))
+        spans = [(west, east)] if west <= east else [(west, 180.0), (-180.0, east)]
+        cell_start = self.columns["cell_start"]
+        slices = []
+        for w, e in spans:
+            c0 = max(0, int((w + 180) // self.cell_deg))
+            c1 = min(self.cols - 1, int((e + 180) // self.cell_deg))
+            for r in range(r0, r1 + 1):
+                start, end = int(cell_start[r * self.cols + c0]), int(cell_start[r * self.cols + c1 + 1])
+                if end > start:
+                    slices.append(np.arange(start, end))
+        if not slices:
+            return np.zeros(0, dtype=np.int64)
+        rows = np.concatenate(slices)
+        # float64 so the bounds are not rounded to the columns' float32
+        lat = np.asarray(self.columns["lat"])[rows].astype(np.float64)
+        lng = np.asarray(self.columns["lng"])[rows].astype(np.float64)
+        inside_lng = (lng >= west) & (lng <= east) if west <= east else (lng >= west) | (lng <= east)
+        return rows[(lat >= south) & (lat <= north) & inside_lng]
+
+    def viewport(self, south: float, west: float, north: float, east: float,
+                 limit: int = 500, min_score: int = 0) -> Dict:
+        """Highest-risk zones inside a map viewport"""
+        ZONE_QUERIES.inc(kind="viewport")
+        rows = self._window_rows(south, west, north, east)
+        if min_score:
+            rows = rows[np.asarray(self.columns["risk_score"])[rows] >= min_score]
+        ranked = self._ranked(rows)
+        return {
+            "zones": [self.zone(int(row)) for row in ranked[:limit]],
+            "total_in_view": int(len(rows)),
+            "truncated": bool(len(rows) > limit),
+        }
+
+    def nearest(self, lat: float, lng: float, k: int = 5, max_km: Optional[float] = None) -> List[Dict]:
+        """The k zones closest to a point, with distance_km"""
+        ZONE_QUERIES.inc(kind="nearest")
+        if not self.count:
+            return []
+        radius = self.cell_deg
+        while True:
+            south, north = max(-90.0, lat - radius), min(90.0, lat + radius)
+            extreme = max(abs(south), abs(north))
+            # Longitude span that still covers `radius` degrees of great circle at the window's edge
+            lng_radius = radius / math.cos(math.radians(extreme)) if extreme < 89.9 else 360.0
+            if lng_radius >= 180:
+                west, east = -180.0, 180.0
+            else:
+                west = (lng - lng_radius + 180) % 360 - 180
+                east = (lng + lng_radius + 180) % 360 - 180
+            rows = self._window_rows(south, west, north, east)
+            distances = haversine_km(lat, lng, np.asarray(self.columns["lat"])[rows],
+                                     np.asarray(self.columns["lng"])[rows])
+            covered_km = radius * KM_PER_DEG
+            whole_globe = south <= -90 and north >= 90 and lng_radius >= 180
+            if (np.count_nonzero(distances <= covered_km) >= k or whole_globe
+                    or (max_km is not None and covered_km >= max_km)):
+                break
+            radius *= 2
+        order = np.argsort(distances, kind="stable")[:k]
+        zones = []
+        for i in order:
+            if max_km is not None and distances[i] > max_km:
+                break
+            zones.append({**self.zone(int(rows[i])), "distance_km": round(float(distances[i]), 1)})
+        return zones
+
+    def region(self, key: str) -> Dict:
+        """A region's patterns and zones, highest risk first ("default" is the generic template)"""
+        region = self.regions[self._region_by_key.get(key, self._region_by_key["default"])]
+        if "template_zones" in region:
+            zones = [dict(z) for z in region["template_zones"]]
+        else:
+            code = self._region_by_key[region["key"]]
+            rows = np.flatnonzero(np.asarray(self.columns["region"]) == code)
+            zones = [
+                {k: v for k, v in self.zone(int(row)).items() if k not in ("country", "flag")}
+                for row in self._ranked(rows)
+            ]
+        return {
+            "country": region.get("country"),
+            "flag": region.get("flag"),
+            "risk_zones": zones,
+            "historical_patterns": region.get("historical_patterns", []),
+            "incidents_history": region.get("incidents_history", []),
+            "weather_correlation": region.get("weather_correlation", {}),
+        }
+
+    def region_for_iso(self, iso_a2: str) -> str:
+        """Curated region key for a country code, "default" if there is none"""
+        return self._region_by_iso.get(iso_a2, "default")
+
+    def stats(self) -> Dict:
+        return {"zones": self.count, "regions": len(self.regions), "cell_deg": self.cell_deg}
+
+
+def _sources_sha256(paths: List[str]) -> str:
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def load_risk_zones(source: Optional[str] = None, extra: Optional[List[str]] = None,
+                    directory: Optional[str] = None) -> RiskZoneDataset:
+    """Open the compiled dataset, recompiling it when the sources have changed"""
+    source = source or os.getenv("RISK_ZONES_SOURCE", DEFAULT_SOURCE)
+    if extra is None:
+        extra = [p.strip() for p in os.getenv("RISK_ZONES_EXTRA", "").split(",") if p.strip()]
+    directory = directory or os.getenv("RISK_ZONES_DIR", "./risk_zones")
+    cell_deg = float(os.getenv("RISK_ZONES_CELL_DEG", "1"))
+    started = time.perf_counter()
+    source_sha256 = _sources_sha256([source, *extra])
+    meta_path = os.path.join(directory, "meta.json")
+    try:
+        with open(meta_path) as f:
+            meta = json.load(f)
+        stale = meta.get("source_sha256") != source_sha256 or meta.get("cell_deg") != cell_deg
+    except (OSError, ValueError):
+        stale = True
+    if stale:
+        RiskZoneDataset.compile(directory, source, extra, cell_deg, source_sha256)
+    dataset = RiskZoneDataset(directory)
+    logger.info("risk zones compiled" if stale else "risk zones loaded", extra={
+        **dataset.stats(), "load_ms": round((time.perf_counter() - started) * 1000, 2)
+    })
+    return dataset
+
+
+def main():
+    """Generate a synthetic JSONL zone file for load testing the spatial queries"""
+    import argparse
+    import random
+
+    parser = argparse.ArgumentParser(description="Write synthetic risk zones as JSONL (for RISK_ZONES_EXTRA)")
+    parser.add_argument("--count", type=int, default=50000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", default="synthetic_zones.jsonl")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    threats = ["Earthquake", "Flood", "Cyclone", "Wildfire", "Landslide", "Heat Wave", "Volcano"]
+    with open(args.output, "w") as f:
+        for i in range(args.count):
+            lat = math.degrees(math.asin(rng.uniform(-0.95, 0.95)))
+            f.write(json.dumps({
+                "name": f"Zone {i}", "lat": round(lat, 4), "lng": round(rng.uniform(-180, 180), 4),
+                "risk_score": rng.randint(10, 99), "primary_risk": rng.choice(threats),
+                "incidents_24h": rng.randint(0, 5), "country": "Synthetic", "flag": "🌍",
+            }) + "\n")
+    print(f"wrote {args.count} zones to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
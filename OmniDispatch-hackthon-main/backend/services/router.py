@@ -0,0 +1,182 @@
+"""
+Adaptive LLM Provider Router
+============================
+Tracks per-provider latency (EWMA), error rate and rate limiting, trips a
+circuit breaker on repeated failures and decides, per call, which provider to
+try first. An open breaker is probed again with a single half-open request
+after a cooldown that doubles on every failed probe.
+"""
+
+import os
+import time
+from typing import Dict, List, Optional, Sequence
+
+from .log import get_logger
+from .metrics import registry
+
+logger = get_logger("router")
+
+ROUTE_DECISIONS = registry.counter(
+    "omnidispatch_router_decisions_total", "Provider chosen first for a call, by purpose", ["purpose", "provider"]
+)
+ROUTE_FALLBACKS = registry.counter(
+    "omnidispatch_router_fallbacks_total", "Calls that moved on to the next provider", ["purpose", "provider"]
+)
+CIRCUIT_STATE = registry.gauge(
+    "omnidispatch_router_circuit_state", "Circuit breaker state (0 closed, 1 half-open, 2 open)", ["provider"]
+)
+CIRCUIT_TRANSITIONS = registry.counter(
+    "omnidispatch_router_circuit_transitions_total", "Circuit breaker state changes", ["provider", "state"]
+)
+LATENCY_EWMA = registry.gauge(
+    "omnidispatch_router_latency_ewma_seconds", "Smoothed provider latency used for routing", ["provider"]
+)
+ERROR_RATE_EWMA = registry.gauge(
+    "omnidispatch_router_error_rate_ewma", "Smoothed provider error rate used for routing", ["provider"]
+)
+
+CLOSED = "closed"
+HALF_OPEN = "half_open"
+OPEN = "open"
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class ProviderHealth:
+    """Rolling health statistics and breaker state for one provider"""
+
+    def __init__(self, name: str, prior_latency_s: float):
+        self.name = name
+        self.latency_ewma = prior_latency_s
+        self.error_ewma = 0.0
+        self.samples = 0
+        self.consecutive_failures = 0
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.cooldown_s = 0.0
+        self.probe_in_flight = False
+        self.rate_limited_until = 0.0
+
+    def to_dict(self) -> Dict:
+        return {
+            "state": self.state,
+            "latency_ewma_ms": round(self.latency_ewma * 1000, 1),
+            "error_rate": round(self.error_ewma, 3),
+            "consecutive_failures": self.consecutive_failures,
+            "samples": self.samples,
+            "rate_limited_for_s": round(max(0.0, self.rate_limited_until - time.monotonic()), 1),
+        }
+
+
+class ProviderRouter:
+    """
+    Orders providers per call: a single half-open probe once a breaker's
+    cooldown expires, then healthy ones by expected latency, open ones never.
+    """
+
+    def __init__(self, providers: Sequence[str], alpha: Optional[float] = None,
+                 failure_threshold: Optional[int] = None, error_rate_threshold: float = 0.5,
+                 cooldown_s: Optional[float] = None, max_cooldown_s: float = 300.0,
+                 error_penalty: float = 4.0, prior_latency_s: float = 1.0):
+        self.alpha = alpha or float(os.getenv("ROUTER_EWMA_ALPHA", "0.3"))
+        self.failure_threshold = failure_threshold or int(os.getenv("ROUTER_FAILURE_THRESHOLD", "3"))
+        self.error_rate_threshold = error_rate_threshold
+        self.base_cooldown_s = cooldown_s or float(os.getenv("ROUTER_COOLDOWN_S", "30"))
+        self.max_cooldown_s = max_cooldown_s
+        self.error_penalty = error_penalty
+        # Configured order breaks ties until real latencies are measured
+        self.providers: Dict[str, ProviderHealth] = {}
+        for index, name in enumerate(providers):
+            self.providers[name] = ProviderHealth(name, prior_latency_s + index * 0.01)
+            self._publish(self.providers[name])
+
+    def _score(self, health: ProviderHealth) -> float:
+        return health.latency_ewma * (1 + self.error_penalty * health.error_ewma)
+
+    def order(self, candidates: Sequence[str], purpose: str = "") -> List[str]:
+        """Providers to try for this call, best first (empty if every breaker is open)"""
+        now = time.monotonic()
+        ready, probes = [], []
+        for name in candidates:
+            health = self.providers[name]
+            if health.rate_limited_until > now:
+                continue
+            if health.state == OPEN and now - health.opened_at >= health.cooldown_s:
+                self._transition(health, HALF_OPEN)
+            if health.state == CLOSED:
+                ready.append(health)
+            elif health.state == HALF_OPEN and not health.probe_in_flight:
+                probes.append(health)
+
+        ordered = sorted(ready, key=self._score)
+        if probes:
+            # One trial request goes to a recovering provider; the healthy ones back it up
+            probe = min(probes, key=lambda h: h.latency_ewma)
+            probe.probe_in_flight = True
+            ordered.insert(0, probe)
+        names = [h.name for h in ordered]
+        if names:
+            ROUTE_DECISIONS.inc(purpose=purpose, provider=names[0])
+        return names
+
+    def record_success(self, provider: str, latency_s: float):
+        health = self.providers[provider]
+        health.samples += 1
+        health.latency_ewma += self.alpha * (latency_s - health.latency_ewma)
+        health.error_ewma *= 1 - self.alpha
+        health.consecutive_failures = 0
+        health.probe_in_flight = False
+        if health.state != CLOSED:
+            health.cooldown_s = 0.0
+            self._transition(health, CLOSED)
+        self._publish(health)
+
+    def record_failure(self, provider: str, latency_s: Optional[float] = None,
+                       status_code: Optional[int] = None, retry_after_s: Optional[float] = None):
+        health = self.providers[provider]
+        health.samples += 1
+        health.error_ewma += self.alpha * (1 - health.error_ewma)
+        if latency_s is not None:
+            health.latency_ewma += self.alpha * (latency_s - health.latency_ewma)
+        health.probe_in_flight = False
+
+        if status_code == 429:
+            # Rate limited: the provider is healthy, just busy - sit it out without tripping the breaker
+            health.rate_limited_until = time.monotonic() + (retry_after_s or 5.0)
+        else:
+            health.consecutive_failures += 1
+            error_rate_tripped = health.samples >= 5 and health.error_ewma >= self.error_rate_threshold
+            if health.state == HALF_OPEN:
+                self._open(health, min(self.max_cooldown_s, max(health.cooldown_s, self.base_cooldown_s) * 2))
+            elif health.state == CLOSED and (health.consecutive_failures >= self.failure_threshold or error_rate_tripped):
+                self._open(health, self.base_cooldown_s)
+        self._publish(health)
+
+    def release(self, provider: str):
+        """Free a half-open probe slot whose request was cancelled before it finished"""
+        self.providers[provider].probe_in_flight = False
+
+    def note_fallback(self, purpose: str, provider: str):
+        ROUTE_FALLBACKS.inc(purpose=purpose, provider=provider)
+
+    def snapshot(self) -> Dict[str, Dict]:
+        return {name: health.to_dict() for name, health in self.providers.items()}
+
+    def _open(self, health: ProviderHealth, cooldown_s: float):
+        health.opened_at = time.monotonic()
+        health.cooldown_s = cooldown_s
+        self._transition(health, OPEN)
+        logger.warning("circuit opened", extra={
+            "provider": health.name, "cooldown_s": cooldown_s, "error_rate": round(health.error_ewma, 3)
+        })
+
+    def _transition(self, health: ProviderHealth, state: str):
+        if health.state == state:
+            return
+        health.state = state
+        CIRCUIT_TRANSITIONS.inc(provider=health.name, state=state)
+        self._publish(health)
+
+    def _publish(self, health: ProviderHealth):
+        CIRCUIT_STATE.set(_STATE_VALUES[health.state], provider=health.name)
+        LATENCY_EWMA.set(health.latency_ewma, provider=health.name)
+        ERROR_RATE_EWMA.set(health.error_ewma, provider=health.name)
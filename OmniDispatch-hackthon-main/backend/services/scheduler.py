@@ -0,0 +1,245 @@
+"""
+Priority-Aware LLM Request Scheduler
+====================================
+Every outbound LLM request takes a slot from its provider's limiter before it
+is sent. Limiters enforce a concurrency cap plus request and token buckets,
+and hand out capacity strictly by priority:
+
+    TRIAGE (live call) > JARVIS (follow-ups) > CHRONOS > BACKGROUND
+
+Part of each limit (concurrency slots and bucket headroom) is reserved for
+TRIAGE and JARVIS, so a Chronos batch can never drain the capacity a 911
+classification needs.
+
+Environment (per provider, e.g. CEREBRAS_MAX_CONCURRENCY):
+    <PROVIDER>_MAX_CONCURRENCY   in-flight requests (default 16)
+    <PROVIDER>_RPM               requests per minute (default 600)
+    <PROVIDER>_TPM               prompt + completion tokens per minute (default 600000)
+    LLM_RESERVED_SLOTS           concurrency slots only live-call work may use (default 4)
+    LLM_RESERVED_FRACTION        bucket headroom only live-call work may use (default 0.25)
+"""
+
+import asyncio
+import heapq
+import itertools
+import os
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import AsyncIterator, Dict, Iterator, List, Optional
+
+from .metrics import QUEUE_DEPTH, registry
+
+SCHEDULER_WAIT = registry.histogram(
+    "omnidispatch_llm_scheduler_wait_seconds", "Time LLM requests waited for a provider slot",
+    ["provider", "priority"]
+)
+SCHEDULER_IN_FLIGHT = registry.gauge(
+    "omnidispatch_llm_scheduler_in_flight", "LLM requests holding a provider slot", ["provider"]
+)
+SCHEDULER_REJECTED = registry.counter(
+    "omnidispatch_llm_scheduler_timeouts_total", "LLM requests that gave up waiting for a slot",
+    ["provider", "priority"]
+)
+
+
+class Priority(IntEnum):
+    TRIAGE = 0
+    JARVIS = 1
+    CHRONOS = 2
+    BACKGROUND = 3
+
+
+# Purposes passed to complete_chat; chronos_* stages share one class
+PURPOSE_PRIORITIES: Dict[str, Priority] = {
+    "triage": Priority.TRIAGE,
+    "jarvis": Priority.JARVIS,
+    "chronos": Priority.CHRONOS,
+    "memory_summary": Priority.BACKGROUND,
+}
+
+
+_priority_override: ContextVar[Optional[Priority]] = ContextVar("omnidispatch_llm_priority", default=None)
+
+
+@contextmanager
+def priority_scope(priority: Priority) -> Iterator[None]:
+    """Run every LLM call made in this context (and its child tasks) at `priority`"""
+    token = _priority_override.set(priority)
+    try:
+        yield
+    finally:
+        _priority_override.reset(token)
+
+
+def priority_for(purpose: str) -> Priority:
+    override = _priority_override.get()
+    if override is not None:
+        return override
+    if purpose in PURPOSE_PRIORITIES:
+        return PURPOSE_PRIORITIES[purpose]
+    return PURPOSE_PRIORITIES.get(purpose.split("_")[0], Priority.BACKGROUND)
+
+
+def _is_live(priority: Priority) -> bool:
+    return priority <= Priority.JARVIS
+
+
+class TokenBucket:
+    """Continuous-refill bucket; `floor` keeps headroom that a caller may not spend"""
+
+    def __init__(self, capacity: float, per_second: float):
+        self.capacity = capacity
+        self.per_second = per_second
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.per_second)
+        self.updated = now
+
+    def wait_time(self, amount: float, floor: float = 0.0) -> float:
+        """Seconds until `amount` can be taken while staying above `floor` (0 if now)"""
+        self._refill()
+        # A single request larger than the usable bucket waits for a full bucket instead of forever
+        amount = min(amount, self.capacity - floor)
+        deficit = amount - (self.tokens - floor)
+        return 0.0 if deficit <= 0 else deficit / self.per_second
+
+    def take(self, amount: float):
+        self._refill()
+        self.tokens -= min(amount, self.capacity)
+
+
+class _Waiter:
+    __slots__ = ("priority", "cost", "future", "enqueued")
+
+    def __init__(self, priority: Priority, cost: float, future: asyncio.Future):
+        self.priority = priority
+        self.cost = cost
+        self.future = future
+        self.enqueued = time.perf_counter()
+
+
+class ProviderLimiter:
+    """Concurrency cap plus request/token buckets for one provider, granted by priority"""
+
+    def __init__(self, name: str, max_concurrency: int, rpm: float, tpm: float,
+                 reserved_slots: int, reserved_fraction: float):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.reserved_slots = min(reserved_slots, max_concurrency - 1)
+        self.reserved_fraction = reserved_fraction
+        self.requests = TokenBucket(rpm, rpm / 60)
+        self.tokens = TokenBucket(tpm, tpm / 60)
+        self.in_flight = 0
+        self._heap: List = []
+        self._sequence = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        SCHEDULER_IN_FLIGHT.set_function(lambda: self.in_flight, provider=name)
+        for priority in Priority:
+            QUEUE_DEPTH.set_function(
+                lambda p=priority: self.queued(p), queue=f"llm_{name}_{priority.name.lower()}"
+            )
+
+    def queued(self, priority: Optional[Priority] = None) -> int:
+        return sum(1 for _, _, w in self._heap
+                   if not w.future.done() and (priority is None or w.priority == priority))
+
+    def _wait_time(self, waiter: _Waiter) -> Optional[float]:
+        """None if blocked on concurrency, else seconds until the buckets allow it"""
+        slot_limit = self.max_concurrency if _is_live(waiter.priority) else self.max_concurrency - self.reserved_slots
+        if self.in_flight >= slot_limit:
+            return None
+        fraction = 0.0 if _is_live(waiter.priority) else self.reserved_fraction
+        return max(
+            self.requests.wait_time(1, self.requests.capacity * fraction),
+            self.tokens.wait_time(waiter.cost, self.tokens.capacity * fraction),
+        )
+
+    def _dispatch(self):
+        self._timer = None
+        while self._heap:
+            waiter = self._heap[0][2]
+            if waiter.future.done():
+                heapq.heappop(self._heap)
+                continue
+            wait = self._wait_time(waiter)
+            if wait is None:
+                return  # a release() will call us again
+            if wait > 0:
+                self._timer = asyncio.get_running_loop().call_later(wait, self._dispatch)
+                return
+            heapq.heappop(self._heap)
+            self.requests.take(1)
+            self.tokens.take(waiter.cost)
+            self.in_flight += 1
+            waiter.future.set_result(None)
+
+    async def acquire(self, priority: Priority, cost: float):
+        waiter = _Waiter(priority, cost, asyncio.get_running_loop().create_future())
+        heapq.heappush(self._heap, (priority, next(self._sequence), waiter))
+        if self._timer is not None:
+            self._timer.cancel()
+        self._dispatch()
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # Granted just as we were cancelled - hand the slot back
+                self.release()
+            raise
+        finally:
+            SCHEDULER_WAIT.observe(time.perf_counter() - waiter.enqueued,
+                                   provider=self.name, priority=priority.name.lower())
+
+    def release(self):
+        self.in_flight -= 1
+        if self._timer is not None:
+            self._timer.cancel()
+        self._dispatch()
+
+
+class LLMScheduler:
+    """Per-provider limiters behind a single `slot()` context manager"""
+
+    def __init__(self, providers: List[str]):
+        reserved_slots = int(os.getenv("LLM_RESERVED_SLOTS", "4"))
+        reserved_fraction = float(os.getenv("LLM_RESERVED_FRACTION", "0.25"))
+        self.limiters: Dict[str, ProviderLimiter] = {}
+        for name in providers:
+            prefix = name.upper()
+            self.limiters[name] = ProviderLimiter(
+                name,
+                max_concurrency=int(os.getenv(f"{prefix}_MAX_CONCURRENCY", "16")),
+                rpm=float(os.getenv(f"{prefix}_RPM", "600")),
+                tpm=float(os.getenv(f"{prefix}_TPM", "600000")),
+                reserved_slots=reserved_slots,
+                reserved_fraction=reserved_fraction,
+            )
+
+    @asynccontextmanager
+    async def slot(self, provider: str, priority: Priority, cost: float,
+                   timeout: Optional[float] = None) -> AsyncIterator[None]:
+        """Hold one of the provider's request slots; raises asyncio.TimeoutError if none frees in time"""
+        limiter = self.limiters[provider]
+        try:
+            await asyncio.wait_for(limiter.acquire(priority, cost), timeout)
+        except asyncio.TimeoutError:
+            SCHEDULER_REJECTED.inc(provider=provider, priority=priority.name.lower())
+            raise
+        try:
+            yield
+        finally:
+            limiter.release()
+
+    def snapshot(self) -> Dict[str, Dict]:
+        return {
+            name: {
+                "in_flight": limiter.in_flight,
+                "queued": {p.name.lower(): limiter.queued(p) for p in Priority},
+            }
+            for name, limiter in self.limiters.items()
+        }
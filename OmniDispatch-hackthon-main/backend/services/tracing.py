@@ -0,0 +1,121 @@
+"""
+Per-Stage Latency Tracing
+=========================
+Lightweight spans around pipeline stages (LLM calls, Places, dispatch, TTS,
+Chroma queries, broadcasts). Every span feeds the Prometheus histograms in
+services.metrics and, inside a request trace, is collected so handlers can
+report their own stage timings.
+"""
+
+import functools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional
+
+from .metrics import PROVIDER_REQUESTS, STAGE_DURATION, STAGE_ERRORS, STAGE_IN_FLIGHT
+
+_current_trace: ContextVar[Optional[List[Dict]]] = ContextVar("omnidispatch_trace", default=None)
+
+
+class Span:
+    """A single timed stage; attributes end up in the request trace"""
+
+    def __init__(self, stage: str, provider: str = "", **attributes):
+        self.stage = stage
+        self.provider = provider
+        self.attributes = attributes
+        self.error: Optional[str] = None
+        self.started = time.perf_counter()
+        self.duration_ms = 0.0
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def fail(self, error: str):
+        """Mark the span as failed without raising (e.g. a non-200 response)"""
+        self.error = error
+
+    def to_dict(self) -> Dict:
+        record = {
+            "stage": self.stage,
+            "duration_ms": round(self.duration_ms, 2),
+            "status": "error" if self.error else "ok",
+        }
+        if self.provider:
+            record["provider"] = self.provider
+        if self.error:
+            record["error"] = self.error
+        record.update(self.attributes)
+        return record
+
+
+@contextmanager
+def trace_span(stage: str, provider: str = "", **attributes) -> Iterator[Span]:
+    """Time a block as a pipeline stage"""
+    span = Span(stage, provider, **attributes)
+    STAGE_IN_FLIGHT.inc(stage=stage)
+    try:
+        yield span
+    except BaseException as e:
+        span.fail(type(e).__name__)
+        raise
+    finally:
+        span.duration_ms = (time.perf_counter() - span.started) * 1000
+        STAGE_IN_FLIGHT.dec(stage=stage)
+        STAGE_DURATION.observe(span.duration_ms / 1000, stage=stage, provider=provider)
+        if span.error:
+            STAGE_ERRORS.inc(stage=stage, provider=provider)
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.append(span.to_dict())
+
+
+def traced(stage: str):
+    """Decorator: run an async function inside a trace_span"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            with trace_span(stage):
+                return await fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def record_provider_result(provider: str, status_code: Optional[int] = None, error: Optional[str] = None):
+    """Count an outbound provider request by HTTP status or exception type"""
+    if error is not None:
+        status = error
+    elif status_code == 429:
+        status = "rate_limited"
+    elif status_code is not None and status_code < 400:
+        status = "ok"
+    else:
+        status = f"http_{status_code}"
+    PROVIDER_REQUESTS.inc(provider=provider, status=status)
+
+
+@contextmanager
+def request_trace() -> Iterator[List[Dict]]:
+    """Collect every span finished in this context (including child tasks)"""
+    spans: List[Dict] = []
+    token = _current_trace.set(spans)
+    try:
+        yield spans
+    finally:
+        _current_trace.reset(token)
+
+
+def current_trace() -> List[Dict]:
+    """Spans collected so far in the active request trace (empty outside one)"""
+    trace = _current_trace.get()
+    return trace if trace is not None else []
+
+
+def summarize_trace(spans: List[Dict]) -> Dict[str, float]:
+    """Total milliseconds per stage, keyed as stage or stage:provider"""
+    totals: Dict[str, float] = {}
+    for span in spans:
+        key = f"{span['stage']}:{span['provider']}" if span.get("provider") else span["stage"]
+        totals[key] = round(totals.get(key, 0.0) + span["duration_ms"], 2)
+    return totals
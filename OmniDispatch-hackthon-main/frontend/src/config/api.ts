@@ -38,4 +38,8 @@ export const API_ENDPOINTS = {
   GUARDIAN_SEARCH: (baseUrl: string) => `${baseUrl}/api/guardian/search-location`,
   GUARDIAN_BUILDING: (baseUrl: string) => `${baseUrl}/api/guardian/building-details`,
   CHRONOS_ANALYZE: (baseUrl: string) => `${baseUrl}/api/chronos/analyze`,
+  CHRONOS_JOBS: (baseUrl: string) => `${baseUrl}/api/chronos/jobs`,
+  CHRONOS_JOB: (baseUrl: string, jobId: string) => `${baseUrl}/api/chronos/jobs/${jobId}`,
+  CHRONOS_ZONES: (baseUrl: string, south: number, west: number, north: number, east: number) =>
+    `${baseUrl}/api/chronos/zones?south=${south}&west=${west}&north=${north}&east=${east}`,
 };